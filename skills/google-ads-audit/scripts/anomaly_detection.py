@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Anomaly detection for many daily series at once (e.g. conversion actions).
+
+The long rows (date, series, value) are pivoted into one date x series
+matrix, with days missing from the API result filled with 0 (the API leaves
+out days without conversions, and those are exactly the days that matter).
+Baselines and scales are then rolling statistics over the whole matrix, so
+every series is scored in the same pass; 50 actions over 365 days is a
+single 365 x 50 rolling window, not 50 loops.
+
+Each day is compared with the trailing window before it (the day itself is
+not part of its own baseline):
+
+  baseline  rolling median of the previous `window` days
+  scale     1.4826 x rolling median absolute deviation from the baseline,
+            at least sqrt(baseline) (count noise) and 1, so quiet series do
+            not flag every small change
+  z         (value - baseline) / scale, a robust z-score
+
+Days with |z| >= threshold are anomalies ('spike' or 'drop'). Separately, a
+series whose last min_zero_days or more days are all 0 after a baseline of
+at least min_baseline per day has 'stopped', the usual sign of a broken tag.
+
+Conversions are reported against the click date, so the last lag_days always
+read low until late conversions arrive. Drops on those days are marked
+provisional, and a series only counts as stopped when its zero run covers
+the whole lag window plus min_zero_days settled days; a shorter run that
+reaches into the lag window is provisional rather than stopped.
+"""
+
+import numpy as np
+import pandas as pd
+
+MAD_SCALE = 1.4826  # MAD -> standard deviation for normal data
+
+
+def daily_matrix(dates, series, values, start=None, end=None):
+    """Sum values into a date x series frame over every day from start to end, 0 where missing."""
+    dates = pd.to_datetime(pd.Series(dates).reset_index(drop=True))
+    frame = pd.DataFrame({'date': dates, 'series': pd.Series(series).reset_index(drop=True),
+                          'value': pd.Series(values).reset_index(drop=True).astype(float)})
+    matrix = frame.pivot_table(index='date', columns='series', values='value', aggfunc='sum', fill_value=0.0)
+    start = pd.Timestamp(start) if start is not None else matrix.index.min()
+    end = pd.Timestamp(end) if end is not None else matrix.index.max()
+    return matrix.reindex(pd.date_range(start, end, freq='D'), fill_value=0.0)
+
+
+def robust_scores(matrix, window=14, min_periods=7):
+    """(baseline, scale, z) frames shaped like matrix."""
+    history = matrix.shift(1)
+    baseline = history.rolling(window, min_periods=min_periods).median()
+    deviation = (matrix - baseline).abs()
+    mad = deviation.shift(1).rolling(window, min_periods=min_periods).median()
+    floor = np.maximum(np.sqrt(baseline.clip(lower=0)), 1.0)
+    scale = np.maximum(MAD_SCALE * mad, floor)
+    return baseline, scale, (matrix - baseline) / scale
+
+
+def find_anomalies(matrix, window=14, min_periods=7, threshold=3.5, lag_days=0):
+    """
+    Long frame of anomalous days: date, series, value, baseline, z, kind and
+    provisional (a drop within the last lag_days); newest first.
+    """
+    baseline, _, z = robust_scores(matrix, window, min_periods)
+    flagged = (z.abs() >= threshold).to_numpy()
+    rows, columns = np.nonzero(flagged)
+    z_values = z.to_numpy()[rows, columns]
+    anomalies = pd.DataFrame({
+        'date': matrix.index[rows],
+        'series': matrix.columns[columns],
+        'value': matrix.to_numpy()[rows, columns],
+        'baseline': baseline.to_numpy()[rows, columns],
+        'z': z_values,
+        'kind': np.where(z_values > 0, 'spike', 'drop'),
+        'provisional': (rows >= len(matrix) - lag_days) & (z_values < 0),
+    })
+    order = np.lexsort((-np.abs(z_values), -rows))  # newest day first, strongest first within a day
+    return anomalies.take(order).reset_index(drop=True)
+
+
+def series_health(matrix, window=14, min_periods=7, min_zero_days=3, min_baseline=1.0, lag_days=0):
+    """
+    One row per series: total, last_nonzero date, zero_days (trailing run of
+    0 days), baseline (median per day over the window before that run),
+    stopped and provisional (0 lately, but the run is too short to rule out
+    conversion lag).
+    """
+    if matrix.empty:
+        return pd.DataFrame(columns=['total', 'last_nonzero', 'zero_days', 'baseline', 'stopped', 'provisional'])
+    values = matrix.to_numpy()
+    days = len(values)
+    zero_days = np.cumprod(values[::-1] == 0, axis=0).sum(axis=0)
+    has_value = zero_days < days
+
+    # Baseline on the first day of the trailing zero run, i.e. from the days before it
+    baseline, _, _ = robust_scores(matrix, window, min_periods)
+    run_start = np.minimum(days - zero_days, days - 1)
+    before_run = np.nan_to_num(baseline.to_numpy()[run_start, np.arange(matrix.shape[1])])
+    before_run = np.where(has_value, before_run, 0.0)
+    quiet = (zero_days >= min_zero_days) & (before_run >= min_baseline)
+    stopped = quiet & (zero_days >= lag_days + min_zero_days)
+
+    return pd.DataFrame({
+        'total': values.sum(axis=0),
+        'last_nonzero': pd.Series(matrix.index[np.where(has_value, days - 1 - zero_days, 0)],
+                                  index=matrix.columns).where(has_value),
+        'zero_days': zero_days,
+        'baseline': before_run,
+        'stopped': stopped,
+        'provisional': quiet & ~stopped,
+    }, index=matrix.columns)
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Chart renderers for the audit report.
+
+Each chart is an independent task: a renderer gets only the small frame or
+values it draws, plus the styling (account name, currency symbol, brand
+colours, target ROAS), and writes one PNG or SVG (picked by the output
+path's suffix). Renderers run on the Agg backend
+and apply CHART_STYLE through an rc_context, so they can run side by side in
+worker processes without touching global pyplot state.
+
+chart_key() fingerprints a task (data, styling and renderer version), so an
+unchanged chart can be reused from a cache instead of rendered again.
+"""
+
+import hashlib
+import json
+import re
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.dates as mdates
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from scipy.interpolate import make_interp_spline
+
+# Bump when any renderer's output changes, so cached charts are not reused
+CHART_RENDERER_VERSION = 1
+
+# Chart styling - clean axes, grid, no box
+CHART_STYLE = {
+    'axes.facecolor': 'white',
+    'axes.edgecolor': '#333333',
+    'axes.linewidth': 1.5,
+    'axes.spines.top': False,
+    'axes.spines.right': False,
+    'grid.color': '#e0e0e0',
+    'grid.linewidth': 0.5,
+    'grid.alpha': 0.7,
+    'font.family': 'sans-serif',
+    # SVG output: keep text as text (much smaller) and make ids reproducible
+    'svg.fonttype': 'none',
+    'svg.hashsalt': 'google-ads-audit',
+}
+CHART_DPI = 150
+CHART_FORMATS = ('png', 'svg')
+
+
+def init_chart_worker():
+    """Process pool initializer: Agg backend and chart styling for this worker."""
+    matplotlib.use('Agg')
+    matplotlib.rcParams.update(CHART_STYLE)
+
+
+def compact_svg(svg):
+    """
+    Shrink matplotlib SVG output for embedding: drop the XML prolog and
+    metadata, collapse whitespace and round coordinates to 2 decimals.
+    """
+    svg = svg[svg.index('<svg'):]
+    svg = re.sub(r'<metadata>.*?</metadata>', '', svg, flags=re.S)
+    svg = re.sub(r'\s*\n\s*', ' ', svg)
+    svg = re.sub(r'>\s+<', '><', svg)
+    return re.sub(r'(\d\.\d\d)\d+', r'\1', svg)
+
+
+def _save(fig, path):
+    if str(path).endswith('.svg'):
+        # No creation date, so unchanged charts produce identical files
+        fig.savefig(path, facecolor='white', metadata={'Date': None})
+        path.write_text(compact_svg(path.read_text(encoding='utf-8')), encoding='utf-8')
+    else:
+        fig.savefig(path, dpi=CHART_DPI, facecolor='white')
+    plt.close(fig)
+
+
+def render_daily_conversions(data, style, path):
+    """Daily conversions and cost (curved, thicker lines). data: date, conversions, cost."""
+    df = data
+    primary_color, secondary_color = style['primary_color'], style['secondary_color']
+
+    fig, ax1 = plt.subplots(figsize=(12, 5))
+    ax1.set_xlabel('Date')
+    ax1.set_ylabel('Conversions', color=primary_color)
+    ax1.grid(True, alpha=0.3)
+
+    # Smooth interpolation for conversions
+    if len(df) > 3:
+        x_num = mdates.date2num(df['date'])
+        x_smooth = np.linspace(x_num.min(), x_num.max(), 200)
+        spl = make_interp_spline(x_num, df['conversions'], k=3)
+        y_smooth = spl(x_smooth)
+        ax1.plot(mdates.num2date(x_smooth), y_smooth, color=primary_color, linewidth=2.5)
+        ax1.scatter(df['date'], df['conversions'], color=primary_color, s=30, zorder=5)
+    else:
+        ax1.plot(df['date'], df['conversions'], color=primary_color, linewidth=2.5, marker='o', markersize=4)
+
+    ax1.tick_params(axis='y', labelcolor=primary_color)
+
+    ax2 = ax1.twinx()
+    ax2.set_ylabel(f"Cost ({style['cs']})", color=secondary_color)
+
+    # Smooth interpolation for cost
+    if len(df) > 3:
+        spl2 = make_interp_spline(x_num, df['cost'], k=3)
+        y_smooth2 = spl2(x_smooth)
+        ax2.plot(mdates.num2date(x_smooth), y_smooth2, color=secondary_color, linewidth=2.5, alpha=0.8)
+        ax2.scatter(df['date'], df['cost'], color=secondary_color, s=30, zorder=5, alpha=0.8)
+    else:
+        ax2.plot(df['date'], df['cost'], color=secondary_color, linewidth=2.5, alpha=0.8, marker='o', markersize=4)
+
+    ax2.tick_params(axis='y', labelcolor=secondary_color)
+    ax2.spines['right'].set_visible(True)
+
+    ax1.xaxis.set_major_formatter(mdates.DateFormatter('%b %d'))
+    ax2.set_title(f"Daily Performance - {style['account_name']}", fontweight='bold', fontsize=14)
+    fig.tight_layout()
+    _save(fig, path)
+
+
+def render_conversion_actions(data, style, path):
+    """Conversions per action over time (multi-line, curved). data: date, action, conversions."""
+    df = data
+    fig, ax = plt.subplots(figsize=(12, 6))
+
+    actions = df['action'].unique()
+    colors = plt.cm.tab10(np.linspace(0, 1, len(actions)))
+
+    ax.grid(True, alpha=0.3)
+    for action, color in zip(actions, colors):
+        action_df = df[df['action'] == action].sort_values('date')
+        label = action[:30] if len(action) > 30 else action
+        # Smooth line
+        if len(action_df) > 3:
+            x_num = mdates.date2num(action_df['date'])
+            x_smooth = np.linspace(x_num.min(), x_num.max(), 100)
+            try:
+                spl = make_interp_spline(x_num, action_df['conversions'], k=3)
+                y_smooth = spl(x_smooth)
+                ax.plot(mdates.num2date(x_smooth), y_smooth, linewidth=2, label=label, color=color)
+                ax.scatter(action_df['date'], action_df['conversions'], color=color, s=20, zorder=5)
+            except:
+                ax.plot(action_df['date'], action_df['conversions'], linewidth=2, label=label, color=color, marker='o', markersize=3)
+        else:
+            ax.plot(action_df['date'], action_df['conversions'], linewidth=2, label=label, color=color, marker='o', markersize=3)
+
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Conversions')
+    ax.set_title(f"Conversion Actions Over Time - {style['account_name']}", fontweight='bold', fontsize=14)
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %d'))
+
+    if len(actions) <= 10:
+        ax.legend(loc='upper left', fontsize=8, framealpha=0.9)
+
+    fig.tight_layout()
+    _save(fig, path)
+
+
+def render_campaign_spend(data, style, path):
+    """Top campaigns by spend. data: name, cost."""
+    df = data
+    cs = style['cs']
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.grid(True, alpha=0.3, axis='x')
+    bars = ax.barh(df['name'], df['cost'], color=style['primary_color'], edgecolor='white', linewidth=0.5)
+    ax.set_xlabel(f'Cost ({cs})')
+    ax.set_title(f"Top Campaigns by Spend - {style['account_name']}", fontweight='bold', fontsize=14)
+    ax.invert_yaxis()
+
+    for bar, val in zip(bars, df['cost']):
+        ax.text(bar.get_width() + max(df['cost']) * 0.01, bar.get_y() + bar.get_height()/2,
+               f'{cs}{val:,.0f}', va='center', fontsize=9)
+
+    fig.tight_layout()
+    _save(fig, path)
+
+
+def render_roas_by_campaign(data, style, path):
+    """ROAS by campaign against the account target. data: name, roas."""
+    df = data
+    target_roas = style['target_roas']
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.grid(True, alpha=0.3, axis='x')
+    # More subtle colors matching table styling
+    colors = ['#5cb85c' if r >= target_roas else '#f0ad4e' if r >= target_roas * 0.7 else '#d9534f' for r in df['roas']]
+    bars = ax.barh(df['name'], df['roas'], color=colors, edgecolor='white', linewidth=0.5, alpha=0.85)
+    ax.set_xlabel('ROAS')
+    ax.set_title(f"ROAS by Campaign - {style['account_name']}", fontweight='bold', fontsize=14)
+    ax.axvline(x=target_roas, color='#dc3545', linestyle='--', alpha=0.7, linewidth=2, label=f'Target ({target_roas}x)')
+    ax.invert_yaxis()
+    ax.legend(loc='lower right')
+
+    for bar, val in zip(bars, df['roas']):
+        ax.text(bar.get_width() + 0.1, bar.get_y() + bar.get_height()/2,
+               f'{val:.1f}x', va='center', fontsize=9)
+
+    fig.tight_layout()
+    _save(fig, path)
+
+
+def render_forecast(data, style, path):
+    """
+    Cumulative spend and daily bars, actual then forecast.
+    data: {'actual': date, cost (sorted); 'forecast': date, cost}.
+    """
+    df, forecast_df = data['actual'], data['forecast']
+    primary_color, secondary_color, cs = style['primary_color'], style['secondary_color'], style['cs']
+
+    cumulative_cost = df['cost'].cumsum()
+    forecast_dates = list(forecast_df['date'])
+    forecast_costs = list(forecast_df['cost'])
+    forecast_cumulative = cumulative_cost.iloc[-1] + forecast_df['cost'].cumsum()
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    # Cumulative line chart - smooth the actual, keep forecast wiggly
+    ax1.grid(True, alpha=0.3)
+
+    # Smooth actual cumulative
+    if len(df) > 3:
+        x_num = mdates.date2num(df['date'])
+        x_smooth = np.linspace(x_num.min(), x_num.max(), 100)
+        spl = make_interp_spline(x_num, cumulative_cost, k=3)
+        y_smooth = spl(x_smooth)
+        ax1.plot(mdates.num2date(x_smooth), y_smooth, color=primary_color, linewidth=2.5, label='Actual')
+        ax1.scatter(df['date'], cumulative_cost, color=primary_color, s=20, zorder=5)
+    else:
+        ax1.plot(df['date'], cumulative_cost, color=primary_color, linewidth=2.5, marker='o', markersize=4, label='Actual')
+
+    # Forecast cumulative - show the wiggly pattern from daily forecasts
+    ax1.plot(forecast_dates, forecast_cumulative, color=secondary_color, linewidth=2, marker='o', markersize=3, alpha=0.8, label='Forecast')
+    ax1.set_xlabel('Date')
+    ax1.set_ylabel(f'Cumulative Cost ({cs})')
+    ax1.set_title('Cumulative Spend + Forecast', fontweight='bold')
+    ax1.xaxis.set_major_formatter(mdates.DateFormatter('%b %d'))
+    ax1.legend()
+
+    # Daily bar chart with variable forecast heights
+    colors = [primary_color] * len(df) + [secondary_color] * min(10, len(forecast_costs))
+    all_dates = list(df['date']) + forecast_dates[:10]
+    all_costs = list(df['cost']) + forecast_costs[:10]
+
+    ax2.grid(True, alpha=0.3, axis='y')
+    ax2.bar(all_dates, all_costs, color=colors[:len(all_dates)], edgecolor='white', linewidth=0.5)
+    ax2.set_xlabel('Date')
+    ax2.set_ylabel(f'Daily Cost ({cs})')
+    ax2.set_title('Daily Spend + Forecast', fontweight='bold')
+    ax2.xaxis.set_major_formatter(mdates.DateFormatter('%b %d'))
+    plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45, ha='right')
+
+    fig.tight_layout()
+    _save(fig, path)
+
+
+def render_period_comparison(data, style, path):
+    """Previous vs current bars per metric. data: [(metric, current, previous), ...]."""
+    cs = style['cs']
+
+    # Normalize for display (different scales)
+    fig, axes = plt.subplots(1, len(data), figsize=(14, 4))
+
+    for ax, (metric, current, previous) in zip(axes, data):
+        ax.grid(True, alpha=0.3, axis='y')
+
+        x = [0, 1]
+        heights = [previous, current]
+        colors_bar = [style['secondary_color'], style['primary_color']]
+        labels = ['Previous', 'Current']
+
+        bars = ax.bar(x, heights, color=colors_bar, width=0.6, edgecolor='white')
+        ax.set_xticks(x)
+        ax.set_xticklabels(labels, fontsize=9)
+        ax.set_title(metric, fontweight='bold', fontsize=11)
+
+        # Add value labels on bars
+        for bar, val in zip(bars, heights):
+            if metric == 'ROAS':
+                label = f'{val:.1f}x'
+            elif metric == 'Conversions':
+                label = f'{val:,.0f}'
+            else:
+                label = f'{cs}{val:,.0f}'
+            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(heights)*0.02,
+                   label, ha='center', va='bottom', fontsize=8)
+
+        # Calculate and show delta
+        if previous > 0:
+            delta = ((current - previous) / previous) * 100
+            delta_color = '#28a745' if delta >= 0 else '#dc3545'
+            arrow = '↑' if delta >= 0 else '↓'
+            ax.text(0.5, -0.15, f'{arrow} {abs(delta):.1f}%', transform=ax.transAxes,
+                   ha='center', fontsize=9, color=delta_color, fontweight='bold')
+
+    fig.tight_layout()
+    _save(fig, path)
+
+
+CHART_RENDERERS = {
+    'daily-conversions': render_daily_conversions,
+    'conversion-actions': render_conversion_actions,
+    'campaign-spend': render_campaign_spend,
+    'roas-by-campaign': render_roas_by_campaign,
+    'forecast': render_forecast,
+    'period-comparison': render_period_comparison,
+}
+
+
+def _hash_data(digest, data):
+    if isinstance(data, pd.DataFrame):
+        digest.update(json.dumps([list(map(str, data.columns)), list(map(str, data.dtypes))]).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    elif isinstance(data, dict):
+        for key in sorted(data):
+            digest.update(str(key).encode('utf-8'))
+            _hash_data(digest, data[key])
+    else:
+        digest.update(json.dumps(data, default=str).encode('utf-8'))
+
+
+def chart_key(name, data, style, chart_format='png'):
+    """Cache key for a chart: its data, styling, format, renderer version and matplotlib version."""
+    digest = hashlib.sha256()
+    header = [CHART_RENDERER_VERSION, matplotlib.__version__, CHART_DPI, CHART_STYLE, name, chart_format, style]
+    digest.update(json.dumps(header, sort_keys=True, default=str).encode('utf-8'))
+    _hash_data(digest, data)
+    return digest.hexdigest()
+
+
+def render_chart(name, data, style, path):
+    """Render one chart to path. Returns None, or the error message if it failed."""
+    try:
+        with matplotlib.rc_context(CHART_STYLE):
+            CHART_RENDERERS[name](data, style, path)
+        return None
+    except Exception as e:
+        plt.close('all')
+        return str(e)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Shared in-memory view of one audit's query results.
+
+Each query result is parsed once with a fixed dtype schema and then shared by
+insights, charts and report writers. Derived columns that several stages need
+(cost in currency, CPC, parsed dates) are computed once per dataset.
+
+Results can be stored as CSV (the default) or in a compressed columnar
+format (Parquet or Feather, via pyarrow) that keeps column types and loads
+much faster for large search-term tables. Columnar data directories can also
+keep a CSV copy of each result for humans (export_csv).
+
+Frames returned here are shared: treat them as read-only and use
+`df.assign(...)` or `.copy()` before adding columns.
+
+With chunk_rows, the results named in chunk_queries are never held whole:
+they are filtered and stored chunk by chunk, and chunks() reads them back in
+pieces of at most chunk_rows rows, so memory stays flat for results of
+millions of rows.
+"""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from run_metrics import profile_stage
+
+# Fixed dtypes for columns that appear across AUDIT_QUERIES results. Text
+# columns are left to pandas, except ids that must compare equal across files.
+COLUMN_DTYPES = {
+    'metrics.impressions': 'int64',
+    'metrics.clicks': 'int64',
+    'metrics.cost_micros': 'int64',
+    'metrics.conversions': 'float64',
+    'metrics.conversions_value': 'float64',
+    'metrics.ctr': 'float64',
+    'metrics.average_cpc': 'float64',
+    'metrics.cost_per_conversion': 'float64',
+    'ad_group_ad_asset_view.performance_label': 'float64',
+    'campaign.id': 'str',
+    'segments.product_item_id': 'str',
+    'segments.date': 'str',
+}
+
+
+# data_format -> file suffix; lookups fall back through this order
+DATA_FORMATS = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'feather': '.feather',
+}
+COLUMNAR_COMPRESSION = 'zstd'
+
+
+def columnar_available():
+    """True if pyarrow is installed (needed for parquet/feather)."""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def read_query_csv(path):
+    """Read a query result CSV with COLUMN_DTYPES, falling back to inference."""
+    try:
+        return pd.read_csv(path, dtype=COLUMN_DTYPES, low_memory=False)
+    except (ValueError, TypeError):
+        # e.g. a metric column with blanks; keep going with inferred types
+        return pd.read_csv(path, low_memory=False)
+
+
+def read_query_file(path):
+    path = Path(path)
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path)
+    if path.suffix == '.feather':
+        return pd.read_feather(path)
+    return read_query_csv(path)
+
+
+def read_query_csv_chunks(path, chunk_rows, columns=None):
+    """Read a query result CSV in frames of at most chunk_rows rows, with COLUMN_DTYPES."""
+    usecols = None if columns is None else (lambda column: column in columns)
+    return pd.read_csv(path, dtype=COLUMN_DTYPES, chunksize=chunk_rows, usecols=usecols)
+
+
+class AuditDataset:
+    def __init__(self, data_dir, data_format='csv', export_csv=False, metrics=None, chunk_rows=None,
+                 chunk_queries=()):
+        if data_format not in DATA_FORMATS:
+            raise ValueError(f'Unknown data format: {data_format}')
+        self.data_dir = Path(data_dir)
+        self.data_format = data_format
+        self.export_csv = export_csv
+        self.metrics = metrics  # RunMetrics: record each file load as a stage
+        self.chunk_rows = chunk_rows
+        self.chunk_queries = set(chunk_queries)
+        self._frames = {}
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    def raw_path(self, name):
+        """Where query.js writes the raw CSV for a query result."""
+        return self.data_dir / f'{name}.csv'
+
+    def path(self, name):
+        """Stored file for a query result, preferring this dataset's format."""
+        formats = [self.data_format] + [fmt for fmt in DATA_FORMATS if fmt != self.data_format]
+        for fmt in formats:
+            candidate = self.data_dir / f'{name}{DATA_FORMATS[fmt]}'
+            if candidate.exists():
+                return candidate
+        return self.data_dir / f'{name}{DATA_FORMATS[self.data_format]}'
+
+    def has(self, name):
+        return name in self._frames or self.path(name).exists()
+
+    def __getitem__(self, name):
+        """Return the frame for a query result, loading it on first use."""
+        with self._lock:
+            if name not in self._frames:
+                path = self.path(name)
+                with profile_stage(self.metrics, 'load', name, bytes=path.stat().st_size) as stage:
+                    self._frames[name] = read_query_file(path)
+                    stage['rows'] = len(self._frames[name])
+            return self._frames[name]
+
+    def store(self, name, df):
+        """
+        Save a processed query result in this dataset's format and keep it in
+        memory, so later stages do not parse it again. Returns the row count.
+
+        For columnar formats the raw CSV from query.js is replaced, unless
+        export_csv is set, in which case it is rewritten with the processed rows.
+        """
+        df = df.reset_index(drop=True)
+        if self.data_format == 'parquet':
+            df.to_parquet(self.data_dir / f'{name}.parquet', compression=COLUMNAR_COMPRESSION, index=False)
+        elif self.data_format == 'feather':
+            df.to_feather(self.data_dir / f'{name}.feather', compression=COLUMNAR_COMPRESSION)
+
+        if self.data_format == 'csv' or self.export_csv:
+            df.to_csv(self.raw_path(name), index=False)
+        else:
+            self.raw_path(name).unlink(missing_ok=True)
+
+        with self._lock:
+            self._frames[name] = df
+            self._derived = {key: value for key, value in self._derived.items() if key[0] != name}
+        return len(df)
+
+    def chunked(self, name):
+        """True if this result is read and written in chunks rather than held in memory."""
+        return self.chunk_rows is not None and name in self.chunk_queries and name not in self._frames
+
+    def chunks(self, name, columns=None):
+        """
+        Yield a query result as frames of at most chunk_rows rows, or as one
+        frame if it is not chunked. columns limits the columns read (those
+        missing from the result are left out).
+        """
+        if not self.chunked(name):
+            df = self[name]
+            yield df if columns is None else df[[column for column in columns if column in df.columns]]
+            return
+
+        path = self.path(name)
+        with profile_stage(self.metrics, 'load', name, bytes=path.stat().st_size, chunked=True) as stage:
+            stage['rows'] = 0
+            if path.suffix == '.csv':
+                pieces = read_query_csv_chunks(path, self.chunk_rows, columns)
+            else:
+                pieces = self._arrow_chunks(path, columns)
+            for chunk in pieces:
+                stage['rows'] += len(chunk)
+                yield chunk
+
+    def _arrow_chunks(self, path, columns):
+        import pyarrow as pa
+        import pyarrow.ipc
+        import pyarrow.parquet as pq
+
+        if path.suffix == '.parquet':
+            parquet = pq.ParquetFile(path)
+            wanted = None if columns is None else [name for name in parquet.schema_arrow.names if name in columns]
+            batches = parquet.iter_batches(batch_size=self.chunk_rows, columns=wanted)
+        else:
+            reader = pa.ipc.open_file(pa.memory_map(str(path)))
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        for batch in batches:
+            if columns is not None:
+                batch = batch.select([column for column in batch.schema.names if column in columns])
+            for start in range(0, batch.num_rows, self.chunk_rows):
+                yield batch.slice(start, self.chunk_rows).to_pandas()
+
+    def store_chunks(self, name, chunks):
+        """
+        Like store(), for a result given as an iterable of frames: each is
+        written as it arrives and none is kept in memory. Returns the row count.
+        """
+        columnar_path = self.data_dir / f'{name}{DATA_FORMATS[self.data_format]}' if self.data_format != 'csv' else None
+        csv_path = self.raw_path(name) if self.data_format == 'csv' or self.export_csv else None
+        # Written to temp files and swapped in at the end; the raw CSV may be the file being read
+        temp = {path: tempfile.mkstemp(dir=self.data_dir, suffix='.tmp') for path in (columnar_path, csv_path) if path}
+        for fd, _ in temp.values():
+            os.close(fd)
+
+        rows = 0
+        writer = schema = None
+        try:
+            for chunk in chunks:
+                chunk = chunk.reset_index(drop=True)
+                if csv_path:
+                    chunk.to_csv(temp[csv_path][1], mode='a' if rows else 'w', header=not rows, index=False)
+                if columnar_path:
+                    import pyarrow as pa
+                    import pyarrow.ipc
+                    import pyarrow.parquet as pq
+
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        schema = table.schema
+                        if self.data_format == 'parquet':
+                            writer = pq.ParquetWriter(temp[columnar_path][1], schema, compression=COLUMNAR_COMPRESSION)
+                        else:
+                            writer = pa.ipc.new_file(temp[columnar_path][1], schema,
+                                                     options=pa.ipc.IpcWriteOptions(compression=COLUMNAR_COMPRESSION))
+                    writer.write_table(table.cast(schema))
+                rows += len(chunk)
+            if writer is not None:
+                writer.close()
+                writer = None
+        except BaseException:
+            if writer is not None:
+                writer.close()
+            for _, tmp_path in temp.values():
+                Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        for path, (_, tmp_path) in temp.items():
+            os.replace(tmp_path, path)
+        if not csv_path:
+            self.raw_path(name).unlink(missing_ok=True)
+
+        with self._lock:
+            self._frames.pop(name, None)
+            self._derived = {key: value for key, value in self._derived.items() if key[0] != name}
+        return rows
+
+    def _cached(self, key, compute):
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = compute()
+            return self._derived[key]
+
+    def cost(self, name):
+        """Cost in account currency (cost_micros / 1,000,000)."""
+        return self._cached((name, 'cost'), lambda: self[name]['metrics.cost_micros'] / 1_000_000)
+
+    def cpc(self, name):
+        """Cost per click in account currency (inf/NaN where clicks are 0)."""
+        return self._cached((name, 'cpc'), lambda: self.cost(name) / self[name]['metrics.clicks'])
+
+    def dates(self, name):
+        """segments.date parsed to datetimes."""
+        return self._cached((name, 'dates'), lambda: pd.to_datetime(self[name]['segments.date']))
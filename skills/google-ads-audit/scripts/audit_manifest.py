@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Stage graph and completion manifest for one audit directory.
+
+An audit is a chain of stage groups, each depending on the ones before it:
+
+    queries -> insights -> charts -> report
+
+Every stage (one per query, insights, one per chart, one per report file)
+is recorded in audit-manifest.json with its status, a fingerprint of its
+inputs and a digest of its output. Query inputs are the final GAQL; the
+insights input is the digest of every query result plus the account config;
+chart inputs are their content keys; report inputs are the insights digest,
+the chart files and the report options. A stage is fresh when it finished,
+its inputs are unchanged and its outputs still exist.
+
+With resume, fresh stages are skipped and their checkpoints (data files,
+insights.json, chart files) are used instead. With only, stage groups outside
+the selection are not run at all and must already have checkpoints.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = 'audit-manifest.json'
+INSIGHTS_CHECKPOINT = 'insights.json'
+FRAME_KEY = '__frame__'  # marks a DataFrame in the insights checkpoint
+STAGE_GROUPS = ['queries', 'insights', 'charts', 'report']
+
+# Bump when a stage's output format changes, so older checkpoints are rebuilt
+MANIFEST_VERSION = 3
+
+
+class MissingCheckpoint(Exception):
+    """A stage that was not selected to run has no usable output from an earlier run."""
+
+
+def fingerprint(*parts):
+    payload = json.dumps([MANIFEST_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def encode_insight(value):
+    """
+    json.dump default for the insights checkpoint. A DataFrame is stored as
+    its columns, each with its dtype and values (floats in full precision,
+    datetimes as integers in their own unit), so decode_insight rebuilds it
+    exactly and charts drawn from it keep their content keys. NumPy scalars
+    become Python ones.
+    """
+    if isinstance(value, pd.DataFrame):
+        columns = []
+        for name, series in value.items():
+            if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'mM':
+                values = series.to_numpy().view('int64').tolist()
+            else:
+                values = series.astype(object).where(series.notna(), None).tolist()
+            columns.append({'name': name, 'dtype': str(series.dtype), 'values': values})
+        return {FRAME_KEY: columns}
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def decode_column(column):
+    try:
+        dtype = np.dtype(column['dtype'])
+    except TypeError:
+        dtype = None  # a pandas extension dtype, e.g. 'str'
+    if dtype is not None and dtype.kind in 'mM':
+        return pd.Series(np.array(column['values'], dtype='int64').view(dtype))
+    return pd.Series(column['values'], dtype=object).astype(column['dtype'])
+
+
+def decode_insight(obj):
+    """json.load object_hook undoing encode_insight."""
+    if len(obj) == 1 and FRAME_KEY in obj:
+        return pd.DataFrame({column['name']: decode_column(column) for column in obj[FRAME_KEY]})
+    return obj
+
+
+def parse_stage_groups(text):
+    """'charts,report' -> ['charts', 'report'] (argparse type)."""
+    groups = [group.strip() for group in text.split(',') if group.strip()]
+    unknown = [group for group in groups if group not in STAGE_GROUPS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown stage(s) {', '.join(unknown)}; choose from {', '.join(STAGE_GROUPS)}")
+    return groups
+
+
+class AuditManifest:
+    def __init__(self, audit_dir, resume=False, only=None):
+        self.audit_dir = Path(audit_dir)
+        self.path = self.audit_dir / MANIFEST_NAME
+        self.resume = resume
+        self.only = set(only or STAGE_GROUPS)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self.data = json.load(f)
+            if self.data.get('version') != MANIFEST_VERSION:
+                raise ValueError('old manifest')
+        except (OSError, ValueError):
+            self.data = {'version': MANIFEST_VERSION, 'stages': {}}
+
+    def entry(self, stage):
+        return self.data['stages'].get(stage)
+
+    def output(self, stage):
+        """Output digest of a finished stage, or None."""
+        entry = self.entry(stage)
+        return entry.get('output') if entry and entry['status'] == 'done' else None
+
+    def fresh(self, stage, inputs, *outputs):
+        entry = self.entry(stage)
+        return (entry is not None and entry['status'] == 'done' and entry.get('inputs') == inputs
+                and all(Path(output).exists() for output in outputs))
+
+    def selected(self, group):
+        return group in self.only
+
+    def should_run(self, stage, inputs, *outputs):
+        """True if the stage's group is selected and, when resuming, the stage is not fresh."""
+        if not self.selected(stage.split('/')[0]):
+            return False
+        return not (self.resume and self.fresh(stage, inputs, *outputs))
+
+    def record(self, stage, status, inputs=None, output=None, **fields):
+        """Record a stage as 'done' or 'failed' and save the manifest straight away."""
+        entry = {'status': status, 'inputs': inputs, 'output': output, 'finished_at': time.time(), **fields}
+        with self._lock:
+            self.data['stages'][stage] = entry
+            self._save()
+
+    def _save(self):
+        self.audit_dir.mkdir(parents=True, exist_ok=True)
+        self.data['updated_at'] = time.time()
+        with tempfile.NamedTemporaryFile('w', dir=self.audit_dir, suffix='.tmp', delete=False) as f:
+            json.dump(self.data, f, indent=2, sort_keys=True, default=str)
+        os.replace(f.name, self.path)
+
+    def save_insights(self, insights):
+        """Checkpoint insights as JSON for later --resume/--only runs. Returns its digest."""
+        path = self.audit_dir / INSIGHTS_CHECKPOINT
+        with tempfile.NamedTemporaryFile('w', dir=self.audit_dir, suffix='.tmp', delete=False) as f:
+            json.dump(insights, f, default=encode_insight)
+        os.replace(f.name, path)
+        return file_digest(path)
+
+    def load_insights(self):
+        path = self.audit_dir / INSIGHTS_CHECKPOINT
+        if not path.exists() or self.output('insights') is None:
+            raise MissingCheckpoint(f'No insights checkpoint in {self.audit_dir}; run the insights stage first')
+        with open(path) as f:
+            return json.load(f, object_hook=decode_insight)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Benchmark the audit pipeline on synthetic accounts.
+
+For each scale (search-term rows; 1k, 100k and 1M by default) every
+AUDIT_QUERIES query is generated with synthetic_data, written as the raw
+query CSV and loaded through process_query_result, exactly like a live run.
+Then each benchmark is timed on that dataset:
+
+  calculate_insights            full insight pass (dataset preloaded)
+  calculate_advanced_forecast   account forecast from daily-conv-91d
+  calculate_campaign_forecasts  per-campaign forecasts from campaigns-daily-91d
+  generate_charts               every chart, no chart cache
+  generate_html_report          report.html with all data tables
+  summarize_csv                 csv-analyzer on the search-terms CSV
+  transform_file                demo transformer on search terms as JSON
+
+Each benchmark runs --repeat times; the fastest wall time is the headline
+number. Results are written to data/google-ads/benchmarks/{timestamp}.json.
+--save-baseline also writes baseline.json, and every run is compared to the
+baseline with the same scale and benchmark. Timings are machine-specific, so
+keep one baseline per machine.
+
+Usage:
+    python3 benchmark.py [--scales 1k,100k,1m] [--repeat 3] [--only insights,charts]
+                         [--save-baseline] [--check] [--threshold 1.25]
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from audit_dataset import AuditDataset
+from run_audit import (AUDIT_QUERIES, DATA_BASE, build_query, calculate_advanced_forecast, calculate_campaign_forecasts,
+                       calculate_insights, generate_charts, generate_html_report, process_query_result,
+                       report_data_tables)
+from run_metrics import measure, rss_peak_mb
+from synthetic_data import BRAND, parse_scale, synthetic_result
+
+SKILLS_DIR = Path(__file__).parent.parent.parent
+CSV_ANALYZER = SKILLS_DIR / 'csv-analyzer' / 'scripts' / 'analyze.py'
+DEMO_TRANSFORMER = SKILLS_DIR / 'demo-google-ads-campaign-audit' / 'transform_data.py'
+BENCHMARK_DIR = DATA_BASE / 'benchmarks'
+
+DEFAULT_SCALES = '1k,100k,1m'
+DEFAULT_THRESHOLD = 1.25
+DAYS = 30
+
+SYNTHETIC_ACCOUNT = {
+    'id': '0000000000',
+    'name': 'Synthetic Account',
+    'currency': 'USD',
+    'timezone': 'UTC',
+    'target_roas': 4.0,
+    'brand_strings': [BRAND],
+}
+
+
+def scale_label(rows):
+    if rows >= 1_000_000 and rows % 1_000_000 == 0:
+        return f'{rows // 1_000_000}m'
+    if rows >= 1_000 and rows % 1_000 == 0:
+        return f'{rows // 1_000}k'
+    return str(rows)
+
+
+def load_module(name, path):
+    """Import a sibling skill's script by path (they are not packages)."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_dataset(data_dir, rows, seed):
+    """Write a raw CSV per audit query and load each one like a live run. Returns {query: rows}."""
+    dataset = AuditDataset(data_dir)
+    sizes = {}
+    for query_name in AUDIT_QUERIES:
+        gaql = build_query(query_name, SYNTHETIC_ACCOUNT, DAYS)
+        synthetic_result(gaql, rows, seed).to_csv(dataset.raw_path(query_name), index=False)
+        sizes[query_name] = process_query_result(query_name, dataset)
+    return sizes
+
+
+def preloaded_dataset(data_dir):
+    """A fresh dataset (no derived-value cache) with every query already read from disk."""
+    dataset = AuditDataset(data_dir)
+    for query_name in AUDIT_QUERIES:
+        if dataset.has(query_name):
+            dataset[query_name]
+    return dataset
+
+
+def quietly(fn, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def summarize_csv_in(analyzer, work_dir, path):
+    """csv-analyzer writes its charts to the working directory, so run it in a scratch one."""
+    previous = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        return analyzer.summarize_csv(str(path))
+    finally:
+        os.chdir(previous)
+
+
+def benchmarks(audit_dir, data_dir, chart_workers):
+    """{name: (setup, fn)}: setup() runs untimed before each repeat and returns fn's arguments."""
+    insights = {}
+
+    def insight_args():
+        return (preloaded_dataset(data_dir), SYNTHETIC_ACCOUNT, DAYS)
+
+    def with_insights():
+        dataset = preloaded_dataset(data_dir)
+        if not insights:
+            insights.update(quietly(calculate_insights, dataset, SYNTHETIC_ACCOUNT, DAYS))
+        return dataset, insights
+
+    def chart_args():
+        dataset, insights = with_insights()
+        return (audit_dir, SYNTHETIC_ACCOUNT['name'], SYNTHETIC_ACCOUNT, insights, dataset, chart_workers)
+
+    def report_args():
+        dataset, insights = with_insights()
+        return (audit_dir, SYNTHETIC_ACCOUNT['name'], SYNTHETIC_ACCOUNT, DAYS, insights, 'png', 'inline', None,
+                report_data_tables(dataset, insights))
+
+    def analyzer_args():
+        analyzer = load_module('csv_analyzer', CSV_ANALYZER)
+        return (analyzer, audit_dir, AuditDataset(data_dir).raw_path('search-terms'))
+
+    def transform_args():
+        path = audit_dir / 'search-terms.json'
+        if not path.exists():
+            AuditDataset(data_dir)['search-terms'].to_json(path, orient='records')
+        return (load_module('demo_transform', DEMO_TRANSFORMER), path)
+
+    return {
+        'calculate_insights': (insight_args, calculate_insights),
+        'calculate_advanced_forecast': (
+            lambda: (AuditDataset(data_dir)['daily-conv-91d'], 30), calculate_advanced_forecast),
+        'calculate_campaign_forecasts': (
+            lambda: (AuditDataset(data_dir)['campaigns-daily-91d'], AuditDataset(data_dir)['budgets'], 30, 15),
+            calculate_campaign_forecasts),
+        'generate_charts': (chart_args, generate_charts),
+        'generate_html_report': (report_args, generate_html_report),
+        'summarize_csv': (analyzer_args, summarize_csv_in),
+        'transform_file': (transform_args, lambda transformer, path: transformer.transform_file(path)),
+    }
+
+
+def time_benchmark(setup, fn, repeat):
+    """Run fn(*setup()) repeat times; timings of every run plus the fastest run's CPU and the RSS peak."""
+    samples = []
+    for _ in range(repeat):
+        args = setup()
+        _, sample = measure(False, quietly, fn, *args)
+        samples.append(sample)
+    walls = [sample['wall_seconds'] for sample in samples]
+    fastest = min(samples, key=lambda sample: sample['wall_seconds'])
+    return {
+        'seconds': fastest['wall_seconds'],
+        'median_seconds': round(statistics.median(walls), 4),
+        'cpu_seconds': fastest['cpu_seconds'],
+        'rss_peak_mb': rss_peak_mb(),
+        'runs': walls,
+    }
+
+
+def run_scale(rows, args):
+    label = scale_label(rows)
+    print(f"\nScale {label}: generating synthetic account...")
+    with tempfile.TemporaryDirectory(prefix=f'audit-benchmark-{label}-') as tmp:
+        audit_dir = Path(tmp)
+        data_dir = audit_dir / 'data'
+        data_dir.mkdir()
+        started = time.perf_counter()
+        sizes = build_dataset(data_dir, rows, args.seed)
+        print(f"  {len(sizes)} queries, {sizes.get('search-terms', 0):,} search terms, "
+              f"{sum(sizes.values()):,} rows in {time.perf_counter() - started:.1f}s")
+
+        results = {}
+        for name, (setup, fn) in benchmarks(audit_dir, data_dir, args.chart_workers).items():
+            if args.only and not any(part in name for part in args.only):
+                continue
+            try:
+                results[name] = time_benchmark(setup, fn, args.repeat)
+                print(f"  {name:<30} {results[name]['seconds']:>9.3f}s")
+            except Exception as e:
+                # e.g. csv-analyzer needs seaborn, which the audit itself does not
+                results[name] = {'skipped': f'{type(e).__name__}: {e}'}
+                print(f"  {name:<30}   skipped ({type(e).__name__}: {e})")
+    return {'rows': rows, 'query_rows': sizes, 'benchmarks': results}
+
+
+def compare(results, baseline, threshold):
+    """Print each benchmark against the baseline; return the regressions as (scale, name, ratio)."""
+    regressions = []
+    print(f"\nCompared to baseline ({baseline.get('created_at')}, threshold {threshold:.2f}x):")
+    for label, scale in results['scales'].items():
+        base_scale = baseline.get('scales', {}).get(label)
+        if not base_scale:
+            print(f"  {label}: no baseline")
+            continue
+        for name, result in scale['benchmarks'].items():
+            base = base_scale['benchmarks'].get(name, {})
+            if 'seconds' not in result or 'seconds' not in base:
+                continue
+            ratio = result['seconds'] / base['seconds'] if base['seconds'] > 0 else 1.0
+            flag = ''
+            if ratio > threshold:
+                flag = '  REGRESSION'
+                regressions.append((label, name, ratio))
+            elif ratio < 1 / threshold:
+                flag = '  faster'
+            print(f"  {label:>5} {name:<30} {result['seconds']:>9.3f}s  baseline {base['seconds']:>9.3f}s  "
+                  f"{ratio:>5.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the audit pipeline on synthetic accounts')
+    parser.add_argument('--scales', default=DEFAULT_SCALES,
+                        help=f'Comma-separated search-term row counts, k/m suffixes allowed (default: {DEFAULT_SCALES})')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark; the fastest counts (default: 3)')
+    parser.add_argument('--only', type=lambda text: [part.strip() for part in text.split(',') if part.strip()],
+                        help='Run only benchmarks whose name contains one of these (e.g. insights,charts)')
+    parser.add_argument('--seed', type=int, default=0, help='Synthetic data seed (default: 0)')
+    parser.add_argument('--chart-workers', dest='chart_workers', type=int, default=1,
+                        help='Chart worker processes (default: 1, for stable timings)')
+    parser.add_argument('--save-baseline', dest='save_baseline', action='store_true',
+                        help='Also save these results as the baseline for later runs')
+    parser.add_argument('--check', action='store_true',
+                        help='Exit with status 1 if any benchmark is slower than baseline by more than --threshold')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Slowdown ratio that counts as a regression (default: {DEFAULT_THRESHOLD})')
+    args = parser.parse_args()
+
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'machine': {
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpus': os.cpu_count(),
+            'python': sys.version.split()[0],
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+        },
+        'options': {'repeat': args.repeat, 'seed': args.seed, 'chart_workers': args.chart_workers},
+        'scales': {},
+    }
+    for rows in [parse_scale(scale) for scale in args.scales.split(',') if scale.strip()]:
+        results['scales'][scale_label(rows)] = run_scale(rows, args)
+
+    BENCHMARK_DIR.mkdir(parents=True, exist_ok=True)
+    output_path = BENCHMARK_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2, default=str)
+    print(f"\nResults: {output_path}")
+
+    baseline_path = BENCHMARK_DIR / 'baseline.json'
+    regressions = []
+    if baseline_path.exists() and not args.save_baseline:
+        with open(baseline_path) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+    if args.save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"Baseline saved: {baseline_path}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.2f}x")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Compiled brand matcher for classifying text columns as brand or non-brand.
+
+A text is brand if it contains any of the account's brand_strings,
+case-insensitively: is_brand() checks one text, matches() a whole column. The
+brand strings are merged into one trie-shaped regex, so each position of a text is
+checked against all of them in a single pass no matter how many variants
+there are, e.g. ['acme', 'acme shoes', 'acmeshoes', 'acne'] becomes
+'ac(?:me|ne)'. Longer strings that start with a shorter brand string are
+dropped, since the shorter one already matches.
+
+Columns are matched on their distinct values only (keywords and campaign
+names repeat a lot), and with pandas' pyarrow-backed strings the regex runs
+in pyarrow's RE2 engine rather than Python's.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+def trie_pattern(strings):
+    """One regex matching any of strings, shared prefixes merged (strings are matched literally)."""
+    trie = {}
+    for text in strings:
+        node = trie
+        for char in text:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        if '' in node:
+            return ''  # a whole string ends here; anything after it matches anyway
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+    return build(trie) if trie else None
+
+
+class BrandMatcher:
+    def __init__(self, brand_strings):
+        self.terms = sorted({str(term).strip().lower() for term in brand_strings or [] if str(term).strip()})
+        self.pattern = trie_pattern(self.terms)
+        self.regex = re.compile(self.pattern) if self.pattern else None
+        self.key = tuple(self.terms)
+
+    def __bool__(self):
+        return self.regex is not None
+
+    def is_brand(self, text):
+        """True if one text contains a brand term."""
+        if self.regex is None or pd.isna(text):
+            return False
+        return self.regex.search(str(text).lower()) is not None
+
+    def matches(self, values):
+        """Boolean array: which values contain a brand term (missing values are non-brand)."""
+        values = pd.Series(values)
+        result = np.zeros(len(values), dtype=bool)
+        if self.regex is None or len(values) == 0:
+            return result
+        codes, uniques = pd.factorize(values)
+        if len(uniques) == 0:
+            return result
+        texts = pd.Series(uniques).astype(str).str.lower()
+        hits = texts.str.contains(self.pattern, regex=True).to_numpy(dtype=bool)
+        found = codes >= 0
+        result[found] = hits[codes[found]]
+        return result
+
+
+@lru_cache(maxsize=32)
+def _matcher(terms):
+    return BrandMatcher(terms)
+
+
+def brand_matcher(brand_strings):
+    """The BrandMatcher for an account's brand_strings, compiled once per process."""
+    return _matcher(tuple(brand_strings or ()))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Per-account local store of date-segmented query results, partitioned by day.
+
+Each table holds one date-segmented GAQL query (e.g. daily conversions or
+search terms by day) as one file per day plus a manifest recording which days
+are complete. Days inside the conversion-lag window are stored but never
+marked complete, because late conversions can still change them, so every
+run fetches them again. An audit then only asks the API for missing or recent
+days and assembles its windows from the stored partitions.
+
+Layout: {root}/{table}/{YYYY-MM-DD}.{csv|parquet|feather} + manifest.json
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from audit_dataset import DATA_FORMATS, read_query_file
+
+DEFAULT_LAG_DAYS = 7
+
+
+def date_runs(days):
+    """Group sorted 'YYYY-MM-DD' strings into contiguous (start, end) runs."""
+    runs = []
+    for day in sorted(days):
+        current = date.fromisoformat(day)
+        if runs and date.fromisoformat(runs[-1][1]) + timedelta(days=1) == current:
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+
+def days_between(start_date, end_date):
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+class DailyWarehouse:
+    def __init__(self, root, data_format='csv', lag_days=DEFAULT_LAG_DAYS):
+        self.root = Path(root)
+        self.data_format = data_format
+        self.lag_days = lag_days
+        self._lock = threading.Lock()
+
+    def _table_dir(self, table):
+        return self.root / table
+
+    def _manifest(self, table):
+        try:
+            with open(self._table_dir(table) / 'manifest.json') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'days': {}}
+
+    def _save_manifest(self, table, manifest):
+        table_dir = self._table_dir(table)
+        with tempfile.NamedTemporaryFile('w', dir=table_dir, suffix='.tmp', delete=False) as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(f.name, table_dir / 'manifest.json')
+
+    def days_to_fetch(self, table, start_date, end_date):
+        """Days in the window that are missing, incomplete or inside the lag window."""
+        complete = {day for day, entry in self._manifest(table)['days'].items() if entry.get('complete')}
+        return [day for day in days_between(start_date, end_date)
+                if day not in complete or not self._partition_path(table, day)]
+
+    def _partition_path(self, table, day):
+        for suffix in DATA_FORMATS.values():
+            path = self._table_dir(table) / f'{day}{suffix}'
+            if path.exists():
+                return path
+        return None
+
+    def write_days(self, table, df_daily, days, end_date):
+        """
+        Store one partition per requested day (empty days included, so they
+        count as fetched) and update the manifest. Days within lag_days of
+        end_date are stored but left incomplete.
+        """
+        table_dir = self._table_dir(table)
+        table_dir.mkdir(parents=True, exist_ok=True)
+        lag_start = (date.fromisoformat(end_date) - timedelta(days=self.lag_days - 1)).isoformat()
+
+        by_day = dict(tuple(df_daily.groupby(df_daily['segments.date'].astype(str), sort=False)))
+        empty = df_daily.iloc[0:0]
+        entries = {}
+        for day in days:
+            partition = by_day.get(day, empty).reset_index(drop=True)
+            self._write_partition(table_dir, day, partition)
+            entries[day] = {'complete': day < lag_start, 'rows': len(partition), 'fetched_at': time.time()}
+
+        with self._lock:
+            manifest = self._manifest(table)
+            manifest['days'].update(entries)
+            self._save_manifest(table, manifest)
+
+    def _write_partition(self, table_dir, day, df):
+        for suffix in DATA_FORMATS.values():
+            (table_dir / f'{day}{suffix}').unlink(missing_ok=True)
+        if self.data_format == 'parquet':
+            df.to_parquet(table_dir / f'{day}.parquet', index=False)
+        elif self.data_format == 'feather':
+            df.to_feather(table_dir / f'{day}.feather')
+        else:
+            df.to_csv(table_dir / f'{day}.csv', index=False)
+
+    def read(self, table, start_date, end_date):
+        """Concatenate stored partitions for the window (missing days are skipped)."""
+        frames = []
+        for day in days_between(start_date, end_date):
+            path = self._partition_path(table, day)
+            if path is not None:
+                frames.append(read_query_file(path))
+        frames = [df for df in frames if len(df)] or frames[:1]
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        df['segments.date'] = df['segments.date'].astype(str)
+        return df
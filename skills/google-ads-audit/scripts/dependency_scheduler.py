@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Run tasks as soon as everything they depend on has arrived.
+
+Inputs are plain names. Callers announce external inputs (e.g. a query
+result that just finished) with arrive(); a task that has run counts as an
+arrived input under its own name, so tasks can depend on other tasks. Ready
+tasks run in the calling thread, in the order they were added, so a caller
+that announces arrivals from its main loop keeps all task code on one thread
+while I/O continues elsewhere.
+"""
+
+
+class DependencyScheduler:
+    def __init__(self):
+        self._tasks = {}  # name -> (inputs, fn), in the order added
+        self._arrived = set()
+
+    def add(self, name, inputs, fn):
+        """Register fn() to run once every name in inputs has arrived."""
+        self._tasks[name] = (set(inputs), fn)
+
+    def arrive(self, *names):
+        """Mark names as arrived and run every task that is now ready. Returns the tasks run."""
+        self._arrived.update(names)
+        ran = []
+        ready = True
+        while ready:
+            ready = [name for name, (inputs, _) in self._tasks.items() if inputs <= self._arrived]
+            for name in ready:
+                _, fn = self._tasks.pop(name)
+                fn()
+                self._arrived.add(name)
+                ran.append(name)
+        return ran
+
+    def pending(self):
+        """Tasks still waiting, with the inputs each is missing."""
+        return {name: sorted(inputs - self._arrived) for name, (inputs, _) in self._tasks.items()}
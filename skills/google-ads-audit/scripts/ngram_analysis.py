@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+N-gram totals over search terms, for finding spread-out waste.
+
+Zero-conversion spend is usually a long tail of terms that share words
+("free", "jobs", "how to"), none of which looks expensive alone. ngram_totals()
+credits each search term's metrics to every 1..max_n word sequence it
+contains, so those shared words add up.
+
+Everything after tokenizing is array work: each distinct term is split into
+words once, words become integer ids, and an n-gram is numbered from the id
+of its (n-1)-gram prefix and its last word, so there are no per-n-gram
+Python objects. The term x n-gram pairs form a sparse matrix held as two
+index arrays (an n-gram repeated within a term counts once), and totals are
+bincounts over it. N-gram text is joined from the vocabulary as whole string
+columns. 500k search terms take a few seconds.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def ngram_totals(terms, metrics, max_n=3):
+    """
+    One row per distinct n-gram (n = 1..max_n) across terms.
+
+    terms is a sequence of search terms and metrics a DataFrame of numeric
+    columns aligned with it (e.g. cost, clicks, conversions). Columns: ngram,
+    n, terms (number of distinct terms containing it) and the sum of each
+    metric column over those terms.
+    """
+    metrics = metrics.reset_index(drop=True)
+    term_codes, uniques = pd.factorize(pd.Series(terms).reset_index(drop=True))
+    found = term_codes >= 0
+    # Sum repeated terms (same term in several ad groups) before crediting n-grams
+    term_metrics = {
+        column: np.bincount(term_codes[found], weights=np.nan_to_num(metrics[column].to_numpy(dtype=float))[found],
+                            minlength=len(uniques))
+        for column in metrics.columns
+    }
+
+    words = pd.Series(uniques).astype(str).str.lower().str.split().explode().dropna()
+    word_terms = words.index.to_numpy(dtype=np.int64)  # which term each word belongs to
+    word_ids, vocabulary = pd.factorize(words.to_numpy())
+    word_ids = word_ids.astype(np.int64)
+    positions = len(word_ids)
+
+    # ids[i]: id of the n-gram starting at word i, or -1 where it would run past its term.
+    # An n-gram's id comes from its (n-1)-gram prefix id and its last word.
+    ids = word_ids
+    pairs_term, pairs_ngram, ngram_n, ngram_start = [], [], [], []
+    offset = 0
+    for n in range(1, max_n + 1):
+        if n > 1:
+            head = positions - n + 1  # start words with room for n words
+            valid = np.zeros(positions, dtype=bool)
+            valid[:head] = (ids[:head] >= 0) & (word_terms[n - 1:] == word_terms[:head])
+            extended = np.full(positions, -1, dtype=np.int64)
+            extended[valid] = pd.factorize(ids[valid] * len(vocabulary) + word_ids[n - 1:][valid[:head]])[0]
+            ids = extended
+        starts = np.flatnonzero(ids >= 0)
+        if len(starts) == 0:
+            break
+        count = int(ids[starts].max()) + 1
+        pairs_term.append(word_terms[starts])
+        pairs_ngram.append(ids[starts] + offset)
+        ngram_n.append(np.full(count, n))
+        ngram_start.append(starts[np.unique(ids[starts], return_index=True)[1]])  # where each first occurs
+        offset += count
+
+    if offset == 0:
+        return pd.DataFrame(columns=['ngram', 'n', 'terms', *metrics.columns])
+
+    # A term counts once per n-gram ("shoes shoes" is one term for "shoes")
+    pairs = pd.unique(np.concatenate(pairs_term) * offset + np.concatenate(pairs_ngram))
+    pair_term, pair_ngram = pairs // offset, pairs % offset
+
+    n = np.concatenate(ngram_n)
+    start = np.concatenate(ngram_start)
+    vocabulary = pd.Series(vocabulary, dtype='string')
+    text = vocabulary.take(word_ids[start]).reset_index(drop=True)
+    for k in range(1, max_n):
+        longer = n > k
+        text[longer] = text[longer] + ' ' + vocabulary.take(word_ids[start[longer] + k]).to_numpy()
+
+    table = pd.DataFrame({'ngram': text, 'n': n, 'terms': np.bincount(pair_ngram, minlength=offset)})
+    for column, values in term_metrics.items():
+        table[column] = np.bincount(pair_ngram, weights=values[pair_term], minlength=offset)
+    return table
+
+
+def wasted_ngrams(table, top=20, min_terms=2):
+    """
+    The top n-grams by cost with no conversions, shared by at least min_terms
+    search terms (an n-gram in one term is just that term). N-grams that say
+    the same thing as one already listed are skipped: a longer one containing
+    it (if "free" never converts, neither does "free shipping"), or a shorter
+    one inside it that matches exactly the same terms.
+    """
+    candidates = table[(table['conversions'] == 0) & (table['cost'] > 0) & (table['terms'] >= min_terms)]
+    candidates = candidates.sort_values(['cost', 'n'], ascending=False)
+    kept, rows = [], []
+    for index, text, terms in zip(candidates.index, candidates['ngram'], candidates['terms']):
+        padded = f' {text} '
+        if any(other in padded or (padded in other and terms == other_terms) for other, other_terms in kept):
+            continue
+        kept.append((padded, terms))
+        rows.append(index)
+        if len(rows) == top:
+            break
+    return table.loc[rows]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Entity-level period-over-period comparison.
+
+compare_periods() hashes the entity key of both periods' rows once, numbers
+each distinct entity and sums every metric per entity and period with one
+bincount, so the two periods are joined in a single pass rather than by a
+lookup per entity. Previous values and changes are whole columns. Every
+entity in either period gets a row and a status:
+
+  new        only in the current period
+  lost       only in the previous period
+  grown      in both, status metric up
+  declined   in both, status metric down
+  unchanged  in both, status metric the same
+"""
+
+import numpy as np
+import pandas as pd
+
+STATUSES = ['new', 'lost', 'grown', 'declined', 'unchanged']
+
+
+def compare_periods(current, previous, keys, metrics, labels=(), status_metric=None):
+    """
+    One row per entity found in either frame, keyed by the keys columns.
+
+    For each metric there is its current value, '{metric}_prev',
+    '{metric}_change' and '{metric}_change_pct' (NaN when the previous value
+    is 0); an entity missing from a period counts as 0 there. labels are
+    descriptive columns (e.g. a product title), taken from the current
+    period where the entity has one. status is decided by status_metric
+    (default: the first metric). Rows are sorted by the status metric,
+    current then previous, descending.
+    """
+    keys, metrics, labels = list(keys), list(metrics), list(labels)
+    status_metric = status_metric or metrics[0]
+
+    # Number every entity once across both periods; the rest is array maths on those codes
+    both = pd.concat([current[keys + labels], previous[keys + labels]], ignore_index=True)
+    codes = both.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+    first_rows = pd.Series(codes).drop_duplicates().index.to_numpy()
+    entity_count = len(first_rows)
+    current_codes, previous_codes = codes[:len(current)], codes[len(current):]
+
+    result = both[keys].take(first_rows).reset_index(drop=True)
+    if labels:
+        result[labels] = both[labels].groupby(codes).first().reset_index(drop=True)
+
+    for metric in metrics:
+        now = np.bincount(current_codes, weights=np.nan_to_num(current[metric].to_numpy(dtype=float)),
+                          minlength=entity_count)
+        before = np.bincount(previous_codes, weights=np.nan_to_num(previous[metric].to_numpy(dtype=float)),
+                             minlength=entity_count)
+        change = now - before
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_pct = np.where(before > 0, change / before * 100, np.nan)
+        result[metric] = now
+        result[f'{metric}_prev'] = before
+        result[f'{metric}_change'] = change
+        result[f'{metric}_change_pct'] = change_pct
+
+    in_current = np.bincount(current_codes, minlength=entity_count) > 0
+    in_previous = np.bincount(previous_codes, minlength=entity_count) > 0
+    change = result[f'{status_metric}_change'].to_numpy()
+    result['status'] = np.select([~in_previous, ~in_current, change > 0, change < 0], STATUSES[:4], STATUSES[4])
+
+    order = np.lexsort((-result[f'{status_metric}_prev'].to_numpy(), -result[status_metric].to_numpy()))
+    return result.take(order).reset_index(drop=True)
+
+
+def summarize_comparison(comparison, metric):
+    """{status: {'count', 'current', 'previous', 'change'}} of metric, for every status."""
+    grouped = comparison.groupby('status')[[metric, f'{metric}_prev', f'{metric}_change']].agg(['size', 'sum'])
+    summary = {}
+    for status in STATUSES:
+        if status in grouped.index:
+            row = grouped.loc[status]
+            summary[status] = {
+                'count': int(row[(metric, 'size')]),
+                'current': float(row[(metric, 'sum')]),
+                'previous': float(row[(f'{metric}_prev', 'sum')]),
+                'change': float(row[(f'{metric}_change', 'sum')]),
+            }
+        else:
+            summary[status] = {'count': 0, 'current': 0.0, 'previous': 0.0, 'change': 0.0}
+    return summary
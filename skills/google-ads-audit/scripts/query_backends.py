@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Offline query backends for `run_audit.py --query-backend`.
+
+Each backend has the QueryWorker interface (run() returning a reply dict,
+close()), so run_gaql sends queries to it instead of the node worker:
+
+  record     run queries live and also save each result as a fixture
+  replay     serve recorded fixtures, with simulated latency and failures
+  synthetic  generate results from the GAQL (synthetic_data), with the same
+             latency and failure simulation
+
+Fixtures are stored per customer under a key of the GAQL with its dates
+made relative to the day it ran ('2025-10-19' -> {today-1}), so a recording
+replays on later days for the same windows. Dates written literally in the
+.gaql files (fixed_dates) are not audit windows and stay absolute in the key. A query that matched no rows
+is recorded as an empty fixture and replays as query.js's no-results
+error. Replay and synthetic runs let
+the executor, caches, pipeline and portfolio modes run without API access.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from datetime import date
+from pathlib import Path
+
+from query_worker import NO_RESULTS
+from synthetic_data import synthetic_result
+
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+def relative_gaql(gaql, today=None, fixed_dates=()):
+    """GAQL with each date except fixed_dates replaced by its offset from today, e.g. {today-30}."""
+    today = today or date.today()
+
+    def relative(match):
+        if match.group() in fixed_dates:
+            return match.group()
+        return f'{{today-{(today - date.fromisoformat(match.group())).days}}}'
+
+    return DATE_PATTERN.sub(relative, gaql)
+
+
+def fixture_key(customer_id, gaql, today=None, fixed_dates=()):
+    payload = json.dumps([str(customer_id), ' '.join(relative_gaql(gaql, today, fixed_dates).split())])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class FixtureStore:
+    def __init__(self, fixtures_dir, fixed_dates=()):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.fixed_dates = frozenset(fixed_dates)
+
+    def _paths(self, customer_id, gaql):
+        folder = self.fixtures_dir / str(customer_id)
+        key = fixture_key(customer_id, gaql, fixed_dates=self.fixed_dates)
+        return folder / f'{key}.csv', folder / f'{key}.json'
+
+    def save(self, customer_id, gaql, src_path, **meta):
+        """Save src_path as the fixture for this query; src_path None saves an empty one (no rows)."""
+        data_path, meta_path = self._paths(customer_id, gaql)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=data_path.parent, suffix='.tmp')
+        os.close(fd)
+        if src_path is not None:
+            shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, data_path)
+        with open(meta_path, 'w') as f:
+            json.dump({'gaql': gaql, 'recorded_at': time.time(), **meta}, f, indent=2)
+
+    def load(self, customer_id, gaql, dest_path):
+        """
+        Copy the fixture for this query to dest_path. Returns False if there is
+        none, None if it is empty (the query matched no rows).
+        """
+        data_path, _ = self._paths(customer_id, gaql)
+        if not data_path.exists():
+            return False
+        if data_path.stat().st_size == 0:
+            return None
+        shutil.copyfile(data_path, dest_path)
+        return True
+
+
+class SimulatedNetwork:
+    """
+    Latency and failure injection shared by the offline backends.
+
+    Each call waits about `latency` seconds (log-normal, so some queries are
+    much slower than others, like the API). A query fails when its GAQL
+    contains fail_match, or at random with probability failure_rate.
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0, fail_match=None, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.fail_match = fail_match
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def call(self, gaql, timeout):
+        """Wait like a network call; returns an error message if this call should fail."""
+        with self._lock:
+            delay = self.latency * self._random.lognormvariate(0.0, 0.5) if self.latency > 0 else 0.0
+            fail = self._random.random() < self.failure_rate
+        if delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f'query timed out after {timeout}s')
+        time.sleep(delay)
+        if self.fail_match and self.fail_match in gaql:
+            return f'injected failure (query matches {self.fail_match!r})'
+        if fail:
+            return 'injected failure'
+        return None
+
+
+class RecordingBackend:
+    """Run queries with `run` (QueryWorker.run or equivalent) and save every success as a fixture."""
+
+    def __init__(self, fixtures_dir, run, close=None, fixed_dates=()):
+        self.store = FixtureStore(fixtures_dir, fixed_dates)
+        self._run = run
+        self._close = close
+
+    def run(self, customer_id, login_customer_id, query, output_path, timeout=120):
+        reply = self._run(customer_id, login_customer_id, query, output_path, timeout=timeout)
+        if reply.get('ok'):
+            self.store.save(customer_id, query, output_path, login_customer_id=str(login_customer_id))
+        elif NO_RESULTS in (reply.get('error') or ''):
+            self.store.save(customer_id, query, None, login_customer_id=str(login_customer_id))
+        return reply
+
+    def close(self):
+        if self._close is not None:
+            self._close()
+
+
+class ReplayBackend:
+    """Serve recorded fixtures; a query without one fails like an API error."""
+
+    def __init__(self, fixtures_dir, network=None, fixed_dates=()):
+        self.store = FixtureStore(fixtures_dir, fixed_dates)
+        self.network = network or SimulatedNetwork()
+
+    def run(self, customer_id, login_customer_id, query, output_path, timeout=120):
+        error = self.network.call(query, timeout)
+        if error:
+            return {'ok': False, 'error': error}
+        loaded = self.store.load(customer_id, query, output_path)
+        if loaded is None:
+            return {'ok': False, 'error': NO_RESULTS}
+        if not loaded:
+            return {'ok': False, 'error': f'no fixture for this query in {self.store.fixtures_dir / str(customer_id)}'}
+        return {'ok': True}
+
+    def close(self):
+        pass
+
+
+class SyntheticBackend:
+    """Generate each result with synthetic_data at `rows` search-term rows."""
+
+    def __init__(self, rows=1000, seed=0, network=None):
+        self.rows = rows
+        self.seed = seed
+        self.network = network or SimulatedNetwork()
+
+    def run(self, customer_id, login_customer_id, query, output_path, timeout=120):
+        error = self.network.call(query, timeout)
+        if error:
+            return {'ok': False, 'error': error}
+        # Each customer gets its own (but repeatable) account
+        df = synthetic_result(query, self.rows, self.seed ^ zlib.crc32(str(customer_id).encode()))
+        if len(df) == 0:
+            return {'ok': False, 'error': NO_RESULTS}
+        df.to_csv(output_path, index=False)
+        return {'ok': True, 'rows': len(df)}
+
+    def close(self):
+        pass
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Persistent client for `query.js --worker`.
+
+Starts one long-lived node process and sends it GAQL jobs over a JSON-lines
+stdin/stdout protocol, so Node startup, module loading and Google Ads client
+auth are paid once per run instead of once per query. Safe to call from
+multiple threads; jobs are matched to replies by id.
+"""
+
+import itertools
+import json
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import Future, TimeoutError
+
+NO_RESULTS = 'Query returned no results'  # query.js error for a query that matched no rows
+
+
+class QueryWorkerError(RuntimeError):
+    """Raised when the worker process dies or cannot be reached."""
+
+
+class QueryWorker:
+    def __init__(self, query_script):
+        self.query_script = query_script
+        self._process = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stderr_tail = deque(maxlen=20)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _ensure_started(self):
+        """Start the worker on first use, or restart it if it has exited."""
+        if self._process is not None and self._process.poll() is None:
+            return
+
+        self._process = subprocess.Popen(
+            ['node', str(self.query_script), '--worker'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        threading.Thread(target=self._read_replies, args=(self._process,), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self._process,), daemon=True).start()
+
+    def _read_replies(self, process):
+        for line in process.stdout:
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                future = self._pending.pop(reply.get('id'), None)
+            if future is not None:
+                future.set_result(reply)
+
+        # Worker exited: fail every job still waiting on this process
+        detail = ' | '.join(self._stderr_tail) or f'exit code {process.wait()}'
+        with self._lock:
+            orphaned = [job_id for job_id, future in self._pending.items()
+                        if getattr(future, 'process', None) is process]
+            futures = [self._pending.pop(job_id) for job_id in orphaned]
+        for future in futures:
+            future.set_exception(QueryWorkerError(f'query worker exited: {detail}'))
+
+    def _read_stderr(self, process):
+        for line in process.stderr:
+            self._stderr_tail.append(line.rstrip())
+
+    def run(self, customer_id, login_customer_id, query, output_path, timeout=120):
+        """
+        Run one query through the worker and wait for its reply.
+
+        Returns the reply dict ({'ok': True, 'rows': n, ...} or
+        {'ok': False, 'error': ...}). Raises TimeoutError or QueryWorkerError.
+        """
+        future = Future()
+        with self._lock:
+            self._ensure_started()
+            job_id = next(self._ids)
+            future.process = self._process
+            self._pending[job_id] = future
+            job = {
+                'id': job_id,
+                'customer_id': str(customer_id),
+                'login_customer_id': str(login_customer_id),
+                'query': query,
+                'output': str(output_path),
+            }
+            try:
+                self._process.stdin.write(json.dumps(job) + '\n')
+                self._process.stdin.flush()
+            except OSError as e:
+                self._pending.pop(job_id, None)
+                raise QueryWorkerError(f'cannot send job to query worker: {e}') from e
+
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            with self._lock:
+                self._pending.pop(job_id, None)
+            raise TimeoutError(f'query timed out after {timeout}s')
+
+    def close(self, timeout=10):
+        """Close stdin so the worker drains in-flight jobs and exits."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
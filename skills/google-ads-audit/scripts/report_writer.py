@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Streaming HTML report writer.
+
+The report layout lives in templates/report.html.j2. Jinja2 compiles it to
+Python once per process and renders it chunk by chunk straight into the
+output file, so the page is never held in memory as one string. Table rows
+can be passed as iterators: full tables of tens of thousands of search terms
+or keywords are formatted one row at a time as they are written, and the
+full search-term, keyword and product data can be embedded as compressed
+chunks for the page's virtual-scrolling tables.
+"""
+
+import base64
+import gzip
+import json
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+from markupsafe import Markup
+
+TEMPLATE_DIR = Path(__file__).parent.parent / 'templates'
+STREAM_BUFFER_CHUNKS = 256
+DATA_TABLE_CHUNK_ROWS = 5000
+
+_environment = None
+
+
+def format_number(value, spec=''):
+    """Template filter: format(value, spec), e.g. {{ cost|num(',.0f') }}."""
+    return format(value, spec)
+
+
+def template_environment():
+    """One Environment per process, so each template is compiled only once."""
+    global _environment
+    if _environment is None:
+        _environment = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIR),
+            autoescape=True,
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+        _environment.filters['num'] = format_number
+    return _environment
+
+
+def table_rows(df, columns):
+    """
+    Yield each row of df[columns] as a tuple of display strings.
+
+    columns is a list of (column, format_spec, max_length) entries. Rows are
+    produced lazily, so a template can stream a table of any length.
+    """
+    names = [column for column, _, _ in columns]
+    specs = [(spec, max_length) for _, spec, max_length in columns]
+    for values in df[names].itertuples(index=False, name=None):
+        row = []
+        for value, (spec, max_length) in zip(values, specs):
+            text = format(value, spec) if spec else str(value)
+            row.append(text[:max_length] if max_length else text)
+        yield row
+
+
+def data_table_chunks(df, columns, chunk_rows=DATA_TABLE_CHUNK_ROWS):
+    """
+    Yield df[columns] as base64-encoded, gzip-compressed JSON chunks of up to
+    chunk_rows rows each (a list of row arrays, missing values as null).
+
+    The report's virtual tables decode the chunks in the browser, so the page
+    carries the full data without a DOM node per row. Chunks are encoded one
+    at a time as the template writes them.
+    """
+    for start in range(0, len(df), chunk_rows):
+        chunk = df[columns].iloc[start:start + chunk_rows].astype(object)
+        rows = chunk.where(chunk.notna(), None).values.tolist()
+        payload = json.dumps(rows, separators=(',', ':'), default=str).encode('utf-8')
+        yield base64.b64encode(gzip.compress(payload, mtime=0)).decode('ascii')
+
+
+def write_report(path, template_name, context):
+    """Render template_name with context straight into path (UTF-8)."""
+    template = template_environment().get_template(template_name)
+    stream = template.stream(context)
+    stream.enable_buffering(STREAM_BUFFER_CHUNKS)
+    with open(path, 'w', encoding='utf-8') as f:
+        stream.dump(f)
+    return path
+
+
+def safe(html):
+    """Mark trusted HTML (charts, delta badges) so the template does not escape it."""
+    return Markup(html)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for GAQL query results.
+
+Entries are keyed by customer id, login customer id, the final GAQL text
+(after {DATE_RANGE} substitution) and CACHE_SCHEMA_VERSION, so any change to
+the query or its date window is a different entry. Each entry is a raw CSV
+plus a small JSON sidecar; the sidecar records when the result was fetched
+(for the TTL) and its mtime is bumped on every hit (for LRU eviction).
+
+The same store also holds other content-addressed files (e.g. rendered
+charts) when created with a different suffix and callers supply their own
+keys.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+# Bump when the cached CSV layout or its post-processing changes
+CACHE_SCHEMA_VERSION = 1
+
+DEFAULT_TTL_HOURS = 24
+DEFAULT_MAX_MB = 500
+
+
+class ResultCache:
+    def __init__(self, cache_dir, ttl_hours=DEFAULT_TTL_HOURS, max_mb=DEFAULT_MAX_MB, read=True, suffix='.csv'):
+        self.cache_dir = Path(cache_dir)
+        self.suffix = suffix
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_bytes = max_mb * 1024 * 1024
+        self.read = read  # False = refresh: skip lookups but still store new results
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(customer_id, login_customer_id, gaql):
+        payload = json.dumps([CACHE_SCHEMA_VERSION, str(customer_id), str(login_customer_id), gaql])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        return self.cache_dir / f'{key}{self.suffix}', self.cache_dir / f'{key}.json'
+
+    def fetch(self, key, dest_path):
+        """Copy a fresh cached result to dest_path. Returns True on a hit."""
+        if not self.read:
+            return False
+
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if time.time() - meta['created_at'] > self.ttl_seconds:
+                return False
+            shutil.copyfile(data_path, dest_path)
+            os.utime(meta_path)  # mark as recently used
+            return True
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def store(self, key, src_path, **meta):
+        """Add a query result to the cache. Failures are ignored."""
+        data_path, meta_path = self._paths(key)
+        meta = {'created_at': time.time(), 'schema_version': CACHE_SCHEMA_VERSION, **meta}
+        try:
+            self._atomic_copy(src_path, data_path)
+            with tempfile.NamedTemporaryFile('w', dir=self.cache_dir, suffix='.tmp', delete=False) as f:
+                json.dump(meta, f)
+            os.replace(f.name, meta_path)
+        except OSError:
+            pass
+
+    def _atomic_copy(self, src_path, dest_path):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(src_path, tmp_path)
+            os.replace(tmp_path, dest_path)
+        except OSError:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_mb."""
+        entries = []
+        now = time.time()
+        for meta_path in self.cache_dir.glob('*.json'):
+            data_path = meta_path.with_suffix(self.suffix)
+            try:
+                with open(meta_path) as f:
+                    created_at = json.load(f)['created_at']
+                size = data_path.stat().st_size
+                last_used = meta_path.stat().st_mtime
+            except (OSError, ValueError, KeyError):
+                self._remove(meta_path)
+                continue
+
+            if now - created_at > self.ttl_seconds:
+                self._remove(meta_path)
+            else:
+                entries.append((last_used, size, meta_path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, meta_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(meta_path)
+            total -= size
+
+    def _remove(self, meta_path):
+        meta_path.unlink(missing_ok=True)
+        meta_path.with_suffix(self.suffix).unlink(missing_ok=True)
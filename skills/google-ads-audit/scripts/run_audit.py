@@ -7,25 +7,54 @@ and conversion tracking health.
 """
 
 import argparse
+import contextlib
+import hashlib
 import json
+import os
+import re
 import subprocess
 import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 from calendar import monthrange
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 import numpy as np
 from zoneinfo import ZoneInfo
-from scipy.interpolate import make_interp_spline
+
+from audit_charts import CHART_FORMATS, chart_key, init_chart_worker, render_chart
+from audit_dataset import DATA_FORMATS, AuditDataset, columnar_available, read_query_csv, read_query_csv_chunks
+from anomaly_detection import daily_matrix, find_anomalies, series_health
+from audit_manifest import (INSIGHTS_CHECKPOINT, STAGE_GROUPS, AuditManifest, MissingCheckpoint, file_digest,
+                            fingerprint, parse_stage_groups)
+from brand_matcher import brand_matcher
+from daily_warehouse import DEFAULT_LAG_DAYS, DailyWarehouse, date_runs, days_between
+from dependency_scheduler import DependencyScheduler
+from ngram_analysis import ngram_totals, wasted_ngrams
+from period_comparison import compare_periods, summarize_comparison
+from query_backends import DATE_PATTERN, RecordingBackend, ReplayBackend, SimulatedNetwork, SyntheticBackend
+from query_worker import NO_RESULTS, QueryWorker
+from report_writer import data_table_chunks, safe, table_rows, write_report
+from result_cache import DEFAULT_MAX_MB, DEFAULT_TTL_HOURS, ResultCache
+from run_metrics import RunMetrics, measure, profile_stage
+from streaming_aggregates import RunningTotals, TopRows
+from synthetic_data import parse_scale
 
 # Paths
 REPO_ROOT = Path(__file__).parent.parent.parent.parent.parent
 ACCOUNTS_FILE = REPO_ROOT / '.claude' / 'accounts.json'
 QUERY_SCRIPT = REPO_ROOT / '.claude' / 'skills' / 'google-ads' / 'scripts' / 'query.js'
 DATA_BASE = REPO_ROOT / 'data' / 'google-ads'
+QUERY_CACHE_DIR = DATA_BASE / '.cache' / 'queries'
+QUERY_FIXTURES_DIR = DATA_BASE / '.fixtures'
+QUERY_BACKENDS = ['live', 'record', 'replay', 'synthetic']
+CHART_CACHE_DIR = DATA_BASE / '.cache' / 'charts'
+CHART_CACHE_TTL_HOURS = 24 * 30  # keys are content hashes, so this only bounds disk use
+CHART_CACHE_MAX_MB = 200
 
 # Audit queries
 AUDIT_QUERIES = {
@@ -33,10 +62,12 @@ AUDIT_QUERIES = {
     'campaigns-prev': {'file': 'campaigns-performance.gaql', 'needs_date': True, 'previous': True},
     'keywords': {'file': 'keywords-by-cost.gaql', 'needs_date': True},
     'keywords-7d': {'file': 'keywords-by-cost.gaql', 'needs_date': True, 'days': 7},
+    'keywords-prev': {'file': 'keywords-by-cost.gaql', 'needs_date': True, 'previous': True},
     'search-terms': {'file': 'search-terms.gaql', 'needs_date': True},
     'search-terms-7d': {'file': 'search-terms.gaql', 'needs_date': True, 'days': 7},
     'daily-conv': {'file': 'daily-conversions.gaql', 'needs_date': True},
     'daily-conv-91d': {'file': 'daily-conversions.gaql', 'needs_date': True, 'days': 91},  # For forecasting
+    'campaigns-daily-91d': {'file': 'campaign-daily-performance.gaql', 'needs_date': True, 'days': 91},  # Campaign pacing
     'conv-actions-daily': {'file': 'conversion-actions-daily.gaql', 'needs_date': True},
     'assets': {'file': 'asset-performance.gaql', 'needs_date': True},
     'budgets': {'file': 'campaign-budgets-and-targets.gaql', 'needs_date': False},
@@ -45,6 +76,10 @@ AUDIT_QUERIES = {
     'products-prev': {'file': 'shopping-products.gaql', 'needs_date': True, 'previous': True},
 }
 
+# Results that can run to millions of rows; with --chunk-rows they are
+# processed and read in chunks instead of being loaded whole
+CHUNKED_QUERIES = ['keywords', 'keywords-7d', 'keywords-prev', 'search-terms', 'search-terms-7d']
+
 
 def load_accounts():
     with open(ACCOUNTS_FILE) as f:
@@ -119,34 +154,117 @@ def get_date_range(days, timezone, previous=False):
     return start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
 
 
-def run_query(query_name, account_config, days, output_path):
-    gaql = load_gaql(query_name)
+def query_window(query_name, account_config, days):
+    """Return the (start, end) date strings an audit query covers, or None if undated."""
     config = AUDIT_QUERIES[query_name]
+    if not config['needs_date']:
+        return None
     timezone = account_config.get('timezone', 'Australia/Sydney')
+    return get_date_range(config.get('days', days), timezone, config.get('previous', False))
 
-    # Determine date range
-    query_days = config.get('days', days)
-    is_previous = config.get('previous', False)
 
-    if config['needs_date']:
-        start_date, end_date = get_date_range(query_days, timezone, is_previous)
+def build_query(query_name, account_config, days):
+    """Return the final GAQL for an audit query, with {DATE_RANGE} filled in."""
+    gaql = load_gaql(query_name)
+    window = query_window(query_name, account_config, days)
+
+    if window:
+        start_date, end_date = window
         date_range = f"BETWEEN '{start_date}' AND '{end_date}'"
         gaql = gaql.replace('{DATE_RANGE}', date_range)
 
+    return gaql
+
+
+def query_reply(gaql, account_config, output_path, worker=None):
+    """
+    Run a GAQL query to CSV. Returns the reply dict: {'ok': True, ...} or
+    {'ok': False, 'error': ...}.
+
+    With a QueryWorker the query is sent to the long-lived node worker;
+    without one, a fresh `node query.js` process is started for the query.
+    """
+    customer_id = account_config['id']
+    login_customer_id = account_config.get('login_customer_id', customer_id)
+
+    if worker is not None:
+        try:
+            return worker.run(customer_id, login_customer_id, gaql, output_path, timeout=120)
+        except Exception as e:
+            print(f"  Exception: {e}")
+            return {'ok': False, 'error': str(e)}
+
     cmd = [
         'node', str(QUERY_SCRIPT),
-        f'--customer-id={account_config["id"]}',
-        f'--login-customer-id={account_config.get("login_customer_id", account_config["id"])}',
+        f'--customer-id={customer_id}',
+        f'--login-customer-id={login_customer_id}',
         f'--query={gaql}',
         f'--output={output_path}'
     ]
 
     try:
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-        return result.returncode == 0
+        if result.returncode == 0:
+            return {'ok': True}
+        return {'ok': False, 'error': result.stderr.strip()}
     except Exception as e:
         print(f"  Exception: {e}")
-        return False
+        return {'ok': False, 'error': str(e)}
+
+
+def query_fingerprint(query_name, account_config, days):
+    """
+    Manifest input fingerprint of a query's stage (account and final GAQL).
+    None if the GAQL cannot be built; the query then runs, fails and is
+    recorded as failed like any other.
+    """
+    try:
+        gaql = build_query(query_name, account_config, days)
+    except Exception:
+        return None  # execute_query reports the error
+    return fingerprint(account_config['id'], account_config.get('login_customer_id'), gaql)
+
+
+def run_gaql(gaql, account_config, output_path, worker=None, allow_empty=False):
+    """
+    Run a GAQL query to CSV. Returns True on success.
+
+    query.js reports a query that matches no rows as an error. With
+    allow_empty that counts as success instead, and output_path gets a CSV
+    with just the selected fields as its header.
+    """
+    reply = query_reply(gaql, account_config, output_path, worker)
+    if not reply['ok'] and allow_empty and NO_RESULTS in (reply.get('error') or ''):
+        pd.DataFrame(columns=select_fields(gaql)).to_csv(output_path, index=False)
+        return True
+    return reply['ok']
+
+
+def run_query(query_name, account_config, days, output_path, worker=None):
+    """Run one audit query to CSV. Returns True on success."""
+    return run_gaql(build_query(query_name, account_config, days), account_config, output_path, worker)
+
+
+def fetch_gaql(gaql, account_config, output_path, worker=None, cache=None, label=None):
+    """
+    Run a GAQL query to CSV, going through the result cache when given one.
+
+    A fresh cached result for the same account and final GAQL is used instead
+    of calling the API; new results are stored raw (before filtering) so they
+    can be post-processed again on a hit. Returns (fetched, cached).
+    """
+    cache_key = None
+    if cache is not None:
+        customer_id = account_config['id']
+        login_customer_id = account_config.get('login_customer_id', customer_id)
+        cache_key = cache.key(customer_id, login_customer_id, gaql)
+        if cache.fetch(cache_key, output_path):
+            return True, True
+
+    fetched = run_gaql(gaql, account_config, output_path, worker)
+    if fetched and cache_key:
+        cache.store(cache_key, output_path, customer_id=str(account_config['id']), query_name=label)
+    return fetched, False
 
 
 def filter_zero_impressions(df):
@@ -155,132 +273,498 @@ def filter_zero_impressions(df):
     return df
 
 
-def is_brand(text, brand_strings):
-    """Check if text contains any brand string."""
-    if not brand_strings or not text:
+def filter_query_result(query_name, df):
+    if query_name in ['budgets', 'campaigns-prev']:
+        return df
+    return filter_zero_impressions(df)
+
+
+def process_query_result(query_name, dataset, metrics=None):
+    """Drop zero-impression rows from a raw query CSV and store it in the dataset. Returns row count."""
+    raw_path = dataset.raw_path(query_name)
+    if dataset.chunked(query_name):
+        with profile_stage(metrics, 'load', query_name, bytes=raw_path.stat().st_size, chunked=True) as stage:
+            chunks = read_query_csv_chunks(raw_path, dataset.chunk_rows)
+            stage['rows'] = dataset.store_chunks(query_name, (filter_query_result(query_name, df) for df in chunks))
+        return stage['rows']
+    with profile_stage(metrics, 'load', query_name, bytes=raw_path.stat().st_size) as stage:
+        df = read_query_csv(raw_path)
+        stage['rows'] = len(df)
+    return dataset.store(query_name, filter_query_result(query_name, df))
+
+
+def execute_query(query_name, account_config, days, dataset, worker=None, cache=None, metrics=None):
+    """Run one audit query and post-process its result into the dataset. Never raises."""
+    output_path = dataset.raw_path(query_name)
+    started = time.monotonic()
+    status = {'status': 'failed', 'rows': None, 'cached': False, 'derived': False}
+
+    with profile_stage(metrics, 'query', query_name) as stage:
+        try:
+            gaql = build_query(query_name, account_config, days)
+            fetched, status['cached'] = fetch_gaql(gaql, account_config, output_path, worker, cache, query_name)
+        except Exception as e:
+            print(f"  Exception: {e}")
+            fetched = False
+
+        if fetched:
+            stage['bytes'] = output_path.stat().st_size
+            try:
+                status.update(status='ok', rows=process_query_result(query_name, dataset, metrics))
+            except Exception:
+                status.update(status='done', rows=None)
+        stage.update(status=status['status'], rows=status['rows'], cached=status['cached'])
+
+    status['seconds'] = time.monotonic() - started
+    return status
+
+
+# Ratio metrics that cannot be summed across days: (numerator, denominator)
+RATIO_METRICS = {
+    'metrics.ctr': ('metrics.clicks', 'metrics.impressions'),
+    'metrics.average_cpc': ('metrics.cost_micros', 'metrics.clicks'),
+    'metrics.cost_per_conversion': ('metrics.cost_micros', 'metrics.conversions'),
+}
+
+
+def window_families(include_daily=False):
+    """
+    Group dated AUDIT_QUERIES that share a GAQL file and differ only by window.
+
+    With include_daily, queries already segmented by segments.date are
+    returned as single-member families too, so the daily warehouse covers them.
+    """
+    families = {}
+    for query_name, config in AUDIT_QUERIES.items():
+        if config['needs_date']:
+            families.setdefault(config['file'], []).append(query_name)
+    return {
+        file: names for file, names in families.items()
+        if len(names) > 1 or (include_daily and is_daily_query(names[0]))
+    }
+
+
+def is_daily_query(query_name):
+    """
+    True if a query's GAQL is already segmented by segments.date. False if it
+    cannot be read, so the query runs on its own and only it fails.
+    """
+    try:
+        return 'segments.date' in select_fields(load_gaql(query_name))
+    except Exception:
         return False
-    text_lower = str(text).lower()
-    return any(brand.lower() in text_lower for brand in brand_strings)
 
 
-def calculate_advanced_forecast(df_91d, forecast_days=30):
+def select_fields(gaql):
+    match = re.search(r'SELECT\s+(.*?)\s+FROM\s', gaql, re.IGNORECASE | re.DOTALL)
+    return [field.strip() for field in match.group(1).split(',')] if match else []
+
+
+def build_daily_query(query_name, start_date, end_date):
+    """GAQL for a query's file over an explicit window, segmented by segments.date."""
+    gaql = load_gaql(query_name)
+    date_range = f"BETWEEN '{start_date}' AND '{end_date}'"
+    if '{DATE_RANGE}' in gaql:
+        gaql = gaql.replace('{DATE_RANGE}', date_range)
+    else:
+        gaql = re.sub(r'segments\.date\s+(BETWEEN\s+\S+\s+AND\s+\S+|DURING\s+\w+)',
+                      f'segments.date {date_range}', gaql, count=1, flags=re.IGNORECASE)
+
+    if 'segments.date' not in select_fields(gaql):
+        gaql = re.sub(r'SELECT\s+', 'SELECT\n  segments.date,\n  ', gaql, count=1, flags=re.IGNORECASE)
+    return gaql
+
+
+def sort_like_gaql(df, gaql):
+    """Apply a GAQL ORDER BY clause to a locally aggregated frame."""
+    match = re.search(r'ORDER\s+BY\s+(.+?)(?:\s+LIMIT\s+\d+)?\s*$', gaql, re.IGNORECASE | re.DOTALL)
+    if not match:
+        return df
+
+    columns, ascending = [], []
+    for part in match.group(1).split(','):
+        tokens = part.split()
+        if tokens and tokens[0] in df.columns:
+            columns.append(tokens[0])
+            ascending.append(not (len(tokens) > 1 and tokens[1].upper() == 'DESC'))
+    if not columns:
+        return df
+    return df.sort_values(columns, ascending=ascending, kind='stable')
+
+
+def derive_window(df_daily, dates, start_date, end_date, keep_date, order_gaql):
     """
-    Calculate advanced forecast using:
-    1. Day-of-week seasonality (13 weeks of data)
-    2. Linear trend detection
-    3. Exponential weighted moving average for recency
+    Aggregate a date-segmented frame down to one window.
+
+    Rows are selected with a vectorized date mask, additive metrics are summed
+    per entity and ratio metrics are recomputed from the summed totals.
     """
-    from scipy import stats
-
-    df = df_91d.copy()
-    df['date'] = pd.to_datetime(df['segments.date'])
-    df = df.sort_values('date')
-    df['cost'] = df['metrics.cost_micros'] / 1_000_000
-    df['conversions'] = df['metrics.conversions']
-    df['value'] = df['metrics.conversions_value']
-    df['weekday'] = df['date'].dt.dayofweek  # 0=Monday, 6=Sunday
-
-    # 1. Day-of-week seasonality - average by weekday
-    weekday_avg_cost = df.groupby('weekday')['cost'].mean().to_dict()
-    weekday_avg_conv = df.groupby('weekday')['conversions'].mean().to_dict()
-    weekday_avg_value = df.groupby('weekday')['value'].mean().to_dict()
-
-    # 2. Linear trend detection
-    x = np.arange(len(df))
-    slope_cost, intercept_cost, _, _, _ = stats.linregress(x, df['cost'])
-    slope_conv, intercept_conv, _, _, _ = stats.linregress(x, df['conversions'])
-    slope_value, intercept_value, _, _, _ = stats.linregress(x, df['value'])
-
-    # Calculate trend multiplier (how much the trend changes per day relative to mean)
-    mean_cost = df['cost'].mean()
-    trend_multiplier_cost = 1 + (slope_cost / mean_cost) if mean_cost > 0 else 1
-    mean_conv = df['conversions'].mean()
-    trend_multiplier_conv = 1 + (slope_conv / mean_conv) if mean_conv > 0 else 1
-    mean_value = df['value'].mean()
-    trend_multiplier_value = 1 + (slope_value / mean_value) if mean_value > 0 else 1
-
-    # 3. Recency weighting using EWMA
-    # Calculate recent adjustment factor (last 7 days vs overall average)
-    ewma_span = 7
-    ewma_cost = df['cost'].ewm(span=ewma_span).mean().iloc[-1]
-    ewma_conv = df['conversions'].ewm(span=ewma_span).mean().iloc[-1]
-    ewma_value = df['value'].ewm(span=ewma_span).mean().iloc[-1]
-
-    recency_factor_cost = ewma_cost / mean_cost if mean_cost > 0 else 1
-    recency_factor_conv = ewma_conv / mean_conv if mean_conv > 0 else 1
-    recency_factor_value = ewma_value / mean_value if mean_value > 0 else 1
-
-    # Blend recency with decay (strong for near-term, fades for long-term)
-    # Generate forecasts for next N days
-    last_date = df['date'].max()
-    forecasts = []
-
-    for i in range(1, forecast_days + 1):
-        forecast_date = last_date + timedelta(days=i)
-        weekday = forecast_date.dayofweek
-
-        # Recency decay - strong influence for first week, fading after
-        recency_decay = 0.9 ** (i / 7)  # Halves roughly every 2 weeks
-
-        # Blend weekday average with recency and trend
-        base_cost = weekday_avg_cost.get(weekday, mean_cost)
-        base_conv = weekday_avg_conv.get(weekday, mean_conv)
-        base_value = weekday_avg_value.get(weekday, mean_value)
-
-        # Apply recency factor with decay
-        adjusted_recency_cost = 1 + (recency_factor_cost - 1) * recency_decay
-        adjusted_recency_conv = 1 + (recency_factor_conv - 1) * recency_decay
-        adjusted_recency_value = 1 + (recency_factor_value - 1) * recency_decay
-
-        # Apply trend (cumulative from end of historical data)
-        trend_adj_cost = trend_multiplier_cost ** i
-        trend_adj_conv = trend_multiplier_conv ** i
-        trend_adj_value = trend_multiplier_value ** i
-
-        # Final forecast
-        forecast_cost = base_cost * adjusted_recency_cost * trend_adj_cost
-        forecast_conv = base_conv * adjusted_recency_conv * trend_adj_conv
-        forecast_value = base_value * adjusted_recency_value * trend_adj_value
-
-        forecasts.append({
-            'date': forecast_date,
-            'cost': forecast_cost,
-            'conversions': forecast_conv,
-            'value': forecast_value,
-            'weekday': weekday
-        })
+    window = df_daily[(dates >= start_date) & (dates <= end_date)]
+    if keep_date:
+        return sort_like_gaql(window.reset_index(drop=True), order_gaql)
+
+    columns = [col for col in df_daily.columns if col != 'segments.date']
+    metrics = [col for col in columns if col.startswith('metrics.')]
+    additive = [col for col in metrics if col not in RATIO_METRICS]
+    dims = [col for col in columns if col not in metrics]
+
+    if dims:
+        df = window.groupby(dims, dropna=False, sort=False)[additive].sum().reset_index()
+    else:
+        df = window[additive].sum().to_frame().T
+
+    for col in metrics:
+        if col in RATIO_METRICS:
+            numerator, denominator = RATIO_METRICS[col]
+            if numerator in df.columns and denominator in df.columns:
+                df[col] = (df[numerator] / df[denominator].where(df[denominator] > 0)).fillna(0)
+
+    return sort_like_gaql(df[columns], order_gaql)
+
+
+def warehouse_table(query_name):
+    """Warehouse table name for a query's daily GAQL; changes whenever the GAQL does."""
+    template = build_daily_query(query_name, '{START}', '{END}')
+    digest = hashlib.sha256(template.encode('utf-8')).hexdigest()[:10]
+    return f"{Path(AUDIT_QUERIES[query_name]['file']).stem}-{digest}"
+
+
+def fetch_daily_incremental(query_name, start_date, end_date, account_config, warehouse, worker=None):
+    """
+    Bring a warehouse table up to date for a window by fetching only missing,
+    incomplete or conversion-lag days (one query per contiguous run of days).
+    A run that matches no rows (a quiet account, or no activity in the lag
+    days) is stored as empty days, like any other.
+
+    Returns (df_daily, days_fetched); df_daily is None if a fetch failed.
+    """
+    table = warehouse_table(query_name)
+    to_fetch = warehouse.days_to_fetch(table, start_date, end_date)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for run_start, run_end in date_runs(to_fetch):
+            delta_path = Path(tmp) / f'{run_start}.csv'
+            gaql = build_daily_query(query_name, run_start, run_end)
+            if not run_gaql(gaql, account_config, delta_path, worker, allow_empty=True):
+                return None, len(to_fetch)
+            warehouse.write_days(table, read_query_csv(delta_path), days_between(run_start, run_end), end_date)
+
+    return warehouse.read(table, start_date, end_date), len(to_fetch)
+
+
+def execute_window_family(query_names, account_config, days, dataset, worker=None, cache=None, warehouse=None,
+                          metrics=None):
+    """
+    Fetch a family of same-GAQL queries once over the union of their windows
+    (segmented by date) and build each member's result locally. Never raises.
+
+    With a DailyWarehouse, only days the warehouse does not already hold as
+    complete are fetched; the union window is then read back from the store.
+
+    Returns {query_name: status} for every member.
+    """
+    started = time.monotonic()
+    windows = {name: query_window(name, account_config, days) for name in query_names}
+    union_start = min(start for start, _ in windows.values())
+    union_end = max(end for _, end in windows.values())
+    statuses = {name: {'status': 'failed', 'rows': None, 'cached': False, 'derived': True, 'delta_days': None}
+                for name in query_names}
+
+    df_daily, cached, delta_days = None, False, None
+    label = f"{Path(AUDIT_QUERIES[query_names[0]]['file']).stem}-daily"
+    with profile_stage(metrics, 'query', '+'.join(query_names)) as stage:
+        try:
+            gaql = build_daily_query(query_names[0], union_start, union_end)
+            keep_date = 'segments.date' in select_fields(build_query(query_names[0], account_config, days))
+            if warehouse is not None:
+                df_daily, delta_days = fetch_daily_incremental(
+                    query_names[0], union_start, union_end, account_config, warehouse, worker)
+            else:
+                with tempfile.TemporaryDirectory() as tmp:
+                    daily_path = Path(tmp) / 'daily.csv'
+                    fetched, cached = fetch_gaql(gaql, account_config, daily_path, worker, cache, label)
+                    if fetched:
+                        stage['bytes'] = daily_path.stat().st_size
+                        with profile_stage(metrics, 'load', label, bytes=stage['bytes']) as load:
+                            df_daily = read_query_csv(daily_path)
+                            load['rows'] = len(df_daily)
+
+            if df_daily is not None:
+                dates = df_daily['segments.date'].astype(str)
+                for name, (start_date, end_date) in windows.items():
+                    df = derive_window(df_daily, dates, start_date, end_date, keep_date, gaql)
+                    rows = dataset.store(name, filter_query_result(name, df))
+                    statuses[name].update(status='ok', rows=rows)
+        except Exception as e:
+            print(f"  Exception: {e}")
+        stage.update(rows={name: status['rows'] for name, status in statuses.items()}, cached=cached,
+                     delta_days=delta_days, daily_rows=None if df_daily is None else len(df_daily))
+
+    elapsed = time.monotonic() - started
+    for status in statuses.values():
+        status.update(cached=cached, delta_days=delta_days, seconds=elapsed)
+    return statuses
+
+
+def run_queries(account_config, days, dataset, max_parallel=4, worker=None, cache=None, derive_windows=False,
+                warehouse=None, metrics=None, skip=None, on_result=None):
+    """
+    Run all AUDIT_QUERIES with bounded concurrency.
+
+    Each query is a separate node subprocess, so a thread pool is enough to
+    overlap API latency. A failed query is recorded and never cancels the
+    others, so total time is close to the slowest query.
+
+    With derive_windows, queries that share a GAQL file (e.g. 'keywords' and
+    'keywords-7d') are fetched once over their union window and split locally.
+    With a DailyWarehouse, those families (plus queries that are already daily)
+    are fetched incrementally, only for days the warehouse is missing.
+
+    skip is {query_name: rows} for results already in the dataset from an
+    earlier run (--resume); they are reported as resumed and not fetched. A
+    window family is fetched again unless all of its members are skipped.
+
+    on_result(query_name, result) is called from this thread as each result
+    arrives (resumed ones first), while the remaining queries keep running.
+
+    Returns {query_name: {'status', 'rows', 'cached', 'derived', 'seconds', ...}}
+    in AUDIT_QUERIES order.
+    """
+    skip = skip or {}
+    families = window_families(include_daily=warehouse is not None) if derive_windows or warehouse else {}
+    families = {file: names for file, names in families.items() if not all(name in skip for name in names)}
+    derived = {name for names in families.values() for name in names}
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+        futures = {}
+        for query_name in AUDIT_QUERIES:
+            if query_name in skip and query_name not in derived:
+                results[query_name] = {'status': 'ok', 'rows': skip[query_name], 'cached': False, 'derived': False,
+                                       'resumed': True, 'seconds': 0.0}
+            elif query_name not in derived:
+                future = pool.submit(execute_query, query_name, account_config, days, dataset, worker, cache, metrics)
+                futures[future] = query_name
+        for query_names in families.values():
+            future = pool.submit(execute_window_family, query_names, account_config, days, dataset, worker, cache,
+                                 warehouse, metrics)
+            futures[future] = None
+
+        for query_name, result in list(results.items()):
+            print(f"  - {query_name}... {result['rows']} rows (resumed)")
+            if on_result is not None:
+                on_result(query_name, result)
+
+        for future in as_completed(futures):
+            query_name = futures[future]
+            batch = {query_name: future.result()} if query_name else future.result()
+
+            for query_name, result in batch.items():
+                results[query_name] = result
+                if result['status'] == 'ok':
+                    outcome = f"{result['rows']} rows"
+                else:
+                    outcome = result['status']
+                source = ('cached, ' if result['cached'] else '') + ('derived, ' if result['derived'] else '')
+                if result.get('delta_days') is not None:
+                    source += f"+{result['delta_days']} days, "
+                print(f"  - {query_name}... {outcome} ({source}{result['seconds']:.1f}s)")
+                if on_result is not None:
+                    on_result(query_name, result)
 
-    forecast_df = pd.DataFrame(forecasts)
+    return {query_name: results[query_name] for query_name in AUDIT_QUERIES}
+
+
+FORECAST_EWMA_SPAN = 7
+FORECAST_RECENCY_DECAY = 0.9  # per week; recency influence roughly halves every 2 weeks
+
+
+def forecast_kernel(history, weekdays, horizon_weekdays):
+    """
+    Vectorized forecast for any number of daily series at once.
+
+    history is a (series, days) array, oldest day first; weekdays gives the
+    weekday of each history day and horizon_weekdays that of each forecast
+    day (0=Monday). Each series is forecast from:
+    1. Day-of-week seasonality (its mean per weekday, or its overall mean for
+       weekdays missing from the history)
+    2. Linear trend, compounded per forecast day
+    3. EWMA recency factor, fading with the forecast horizon
+
+    Returns (forecast (series, horizon), trend_multiplier (series,),
+    recency_factor (series,), weekday_mean (series, 7)).
+    """
+    history = np.asarray(history, dtype=float)
+    n_days = history.shape[1]
+    present = ~np.isnan(history)
+    values = np.where(present, history, 0.0)
+    weekday_onehot = (np.asarray(weekdays)[:, None] == np.arange(7)).astype(float)  # (days, 7)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = values.sum(axis=1) / present.sum(axis=1)
+
+        # 1. Day-of-week seasonality - mean by weekday, skipping missing values
+        weekday_mean = (values @ weekday_onehot) / (present @ weekday_onehot)
+
+        # 2. Linear trend (least squares slope against the day index, over each series' own days)
+        x = np.arange(n_days, dtype=float)
+        dx = np.where(present, x - ((present @ x) / present.sum(axis=1))[:, None], 0.0)
+        ssx = (dx * dx).sum(axis=1)
+        sxy = (dx * (values - mean[:, None])).sum(axis=1)
+        slope = np.where(ssx > 0, sxy / np.where(ssx > 0, ssx, 1.0), 0.0)
+        trend_multiplier = np.where(mean > 0, 1 + slope / mean, 1.0)
+
+        # 3. Recency weighting using EWMA (pandas ewm(span).mean(), last value)
+        alpha = 2 / (FORECAST_EWMA_SPAN + 1)
+        ewma_weights = (1 - alpha) ** np.arange(n_days - 1, -1, -1, dtype=float)
+        ewma = (values @ ewma_weights) / (present @ ewma_weights)
+        recency_factor = np.where(mean > 0, ewma / mean, 1.0)
+
+    # Weekdays with no history at all fall back to the overall mean
+    has_weekday = weekday_onehot.sum(axis=0) > 0
+    base = np.where(has_weekday, weekday_mean, mean[:, None])[:, np.asarray(horizon_weekdays)]
+
+    horizon = np.arange(1, len(horizon_weekdays) + 1, dtype=float)
+    recency_decay = FORECAST_RECENCY_DECAY ** (horizon / 7)
+    adjusted_recency = 1 + (recency_factor[:, None] - 1) * recency_decay
+    trend_adjustment = trend_multiplier[:, None] ** horizon
+
+    forecast = base * adjusted_recency * trend_adjustment
+    return forecast, trend_multiplier, recency_factor, np.where(has_weekday, weekday_mean, np.nan)
+
+
+def calculate_advanced_forecast(df_91d, forecast_days=30):
+    """
+    Forecast daily cost, conversions and value for the next forecast_days
+    from daily history, using forecast_kernel() on all three metrics at once.
+    """
+    dates = pd.to_datetime(df_91d['segments.date']).sort_values()
+    df = df_91d.loc[dates.index]
+    history = np.vstack([
+        df['metrics.cost_micros'].to_numpy(dtype=float) / 1_000_000,
+        df['metrics.conversions'].to_numpy(dtype=float),
+        df['metrics.conversions_value'].to_numpy(dtype=float),
+    ])
+
+    forecast_dates = dates.max() + pd.to_timedelta(np.arange(1, forecast_days + 1), unit='D')
+    forecast_weekdays = forecast_dates.dayofweek.to_numpy()
+    forecast, trend_multiplier, recency_factor, weekday_mean = forecast_kernel(
+        history, dates.dt.dayofweek.to_numpy(), forecast_weekdays)
+
+    forecast_df = pd.DataFrame({
+        'date': forecast_dates,
+        'cost': forecast[0],
+        'conversions': forecast[1],
+        'value': forecast[2],
+        'weekday': forecast_weekdays,
+    })
 
     return {
         'forecast_df': forecast_df,
-        'weekday_avg_cost': weekday_avg_cost,
-        'trend_multiplier_cost': trend_multiplier_cost,
-        'recency_factor_cost': recency_factor_cost,
+        'weekday_avg_cost': {weekday: float(avg) for weekday, avg in enumerate(weekday_mean[0]) if not np.isnan(avg)},
+        'trend_multiplier_cost': float(trend_multiplier[0]),
+        'recency_factor_cost': float(recency_factor[0]),
         'total_forecast_cost': forecast_df['cost'].sum(),
         'total_forecast_conv': forecast_df['conversions'].sum(),
         'total_forecast_value': forecast_df['value'].sum(),
     }
 
 
-def calculate_insights(audit_dir, account_config, days):
-    insights = {}
+# Forecast daily spend as a % of daily budget
+PACING_LIMITED_PCT = 95
+PACING_UNDERSPEND_PCT = 50
+
+
+def calculate_campaign_forecasts(df_daily, df_budgets=None, forecast_days=30, days_remaining=0):
+    """
+    Forecast every campaign at once from campaign-segmented daily history.
+
+    Campaign x day history is scattered into (metric, campaign, day) arrays.
+    From a campaign's first row on, days it has no row for count as zero
+    (e.g. while paused); days before it are missing (NaN), so a campaign
+    launched mid-window is forecast from its own days only. All campaigns'
+    cost, conversions and value go through forecast_kernel() as one batch.
+    Forecast spend is compared with each campaign's daily budget for pacing.
+
+    Returns a list of per-campaign dicts, highest forecast spend first.
+    """
+    dates = pd.to_datetime(df_daily['segments.date'])
+    all_dates = pd.date_range(dates.min(), dates.max())
+    day_index = (dates - all_dates[0]).dt.days.to_numpy()
+    campaign_ids, campaign_index = np.unique(df_daily['campaign.id'].astype(str).to_numpy(), return_inverse=True)
+
+    history = np.zeros((3, len(campaign_ids), len(all_dates)))
+    metrics = [
+        df_daily['metrics.cost_micros'].to_numpy(dtype=float) / 1_000_000,
+        df_daily['metrics.conversions'].to_numpy(dtype=float),
+        df_daily['metrics.conversions_value'].to_numpy(dtype=float),
+    ]
+    for metric, values in enumerate(metrics):
+        np.add.at(history[metric], (campaign_index, day_index), values)
+    first_day = np.full(len(campaign_ids), len(all_dates))
+    np.minimum.at(first_day, campaign_index, day_index)
+    history[:, np.arange(len(all_dates)) < first_day[:, None]] = np.nan
+
+    forecast_dates = all_dates[-1] + pd.to_timedelta(np.arange(1, forecast_days + 1), unit='D')
+    forecast, trend_multiplier, recency_factor, _ = forecast_kernel(
+        history.reshape(3 * len(campaign_ids), -1), all_dates.dayofweek.to_numpy(),
+        forecast_dates.dayofweek.to_numpy())
+    forecast = forecast.reshape(3, len(campaign_ids), forecast_days)
+
+    names = (df_daily.assign(_id=df_daily['campaign.id'].astype(str))
+             .sort_values('segments.date').groupby('_id')['campaign.name'].last())
+    budgets = pd.Series(dtype=float)
+    if df_budgets is not None and len(df_budgets) > 0:
+        budgets = (pd.to_numeric(df_budgets['campaign_budget.amount_micros'], errors='coerce') / 1_000_000).set_axis(
+            df_budgets['campaign.id'].astype(str))
+        budgets = budgets[~budgets.index.duplicated()]
+
+    pacing = pd.DataFrame({
+        'campaign_id': campaign_ids,
+        'campaign': names.reindex(campaign_ids).to_numpy(),
+        'daily_budget': budgets.reindex(campaign_ids).to_numpy(),
+        'avg_daily_spend_7d': np.nanmean(history[0, :, -7:], axis=1),
+        'forecast_daily_spend': forecast[0].mean(axis=1),
+        'forecast_30d_cost': forecast[0].sum(axis=1),
+        'forecast_30d_conv': forecast[1].sum(axis=1),
+        'forecast_30d_value': forecast[2].sum(axis=1),
+        'forecast_month_cost': forecast[0, :, :days_remaining].sum(axis=1),
+        # Kernel rows are metric-major, so the first block is cost
+        'trend_multiplier': trend_multiplier[:len(campaign_ids)],
+        'recency_factor': recency_factor[:len(campaign_ids)],
+    })
+    has_budget = pacing['daily_budget'] > 0
+    pacing['budget_used_pct'] = (pacing['forecast_daily_spend'] / pacing['daily_budget'] * 100).where(has_budget)
+    pacing['status'] = np.select(
+        [~has_budget, pacing['budget_used_pct'] >= PACING_LIMITED_PCT, pacing['budget_used_pct'] < PACING_UNDERSPEND_PCT],
+        ['no_budget', 'budget_limited', 'underspending'],
+        'on_track',
+    )
+
+    pacing = pacing.sort_values('forecast_30d_cost', ascending=False)
+    return [
+        {key: (None if isinstance(value, float) and np.isnan(value) else value) for key, value in row.items()}
+        for row in pacing.to_dict('records')
+    ]
+
+
+def insights_periods(dataset, account_config, days, insights):
+    """Currency symbol and the current and previous date ranges."""
     currency = account_config.get('currency', 'AUD')
-    cs = {'AUD': 'A$', 'USD': '$', 'GBP': '£'}.get(currency, '$')
-    insights['currency_symbol'] = cs
-    brand_strings = account_config.get('brand_strings', [])
+    insights['currency_symbol'] = {'AUD': 'A$', 'USD': '$', 'GBP': '£'}.get(currency, '$')
 
-    # Get date ranges for display
     timezone = account_config.get('timezone', 'Australia/Sydney')
     start_date, end_date = get_date_range(days, timezone)
     prev_start, prev_end = get_date_range(days, timezone, previous=True)
     insights['current_period'] = f"{start_date} to {end_date}"
     insights['previous_period'] = f"{prev_start} to {prev_end}"
 
-    # Current period totals
+
+def insights_totals(dataset, account_config, days, insights):
+    """Current period totals and ratios."""
     try:
-        df = pd.read_csv(audit_dir / 'data' / 'campaigns.csv')
-        insights['total_cost'] = df['metrics.cost_micros'].sum() / 1_000_000
+        df = dataset['campaigns']
+        insights['total_cost'] = dataset.cost('campaigns').sum()
         insights['total_conversions'] = df['metrics.conversions'].sum()
         insights['total_value'] = df['metrics.conversions_value'].sum()
         insights['roas'] = insights['total_value'] / insights['total_cost'] if insights['total_cost'] > 0 else 0
@@ -294,10 +778,12 @@ def calculate_insights(audit_dir, account_config, days):
     except:
         pass
 
-    # Previous period comparison
+
+def insights_previous_period(dataset, account_config, days, insights):
+    """Previous period totals and deltas against the current period."""
     try:
-        df_prev = pd.read_csv(audit_dir / 'data' / 'campaigns-prev.csv')
-        insights['prev_cost'] = df_prev['metrics.cost_micros'].sum() / 1_000_000
+        df_prev = dataset['campaigns-prev']
+        insights['prev_cost'] = dataset.cost('campaigns-prev').sum()
         insights['prev_conversions'] = df_prev['metrics.conversions'].sum()
         insights['prev_value'] = df_prev['metrics.conversions_value'].sum()
         insights['prev_roas'] = insights['prev_value'] / insights['prev_cost'] if insights['prev_cost'] > 0 else 0
@@ -323,10 +809,11 @@ def calculate_insights(audit_dir, account_config, days):
     except:
         pass
 
-    # Advanced Forecasting using 91-day data
+
+def insights_forecast(dataset, account_config, days, insights):
+    """Advanced forecast from 91 days of daily data, or a simple daily-average fallback."""
     try:
-        df_91d = pd.read_csv(audit_dir / 'data' / 'daily-conv-91d.csv')
-        forecast_result = calculate_advanced_forecast(df_91d, forecast_days=30)
+        forecast_result = calculate_advanced_forecast(dataset['daily-conv-91d'], forecast_days=30)
 
         insights['forecast_30d_cost'] = forecast_result['total_forecast_cost']
         insights['forecast_30d_conv'] = forecast_result['total_forecast_conv']
@@ -375,62 +862,82 @@ def calculate_insights(audit_dir, account_config, days):
         except:
             pass
 
-    # Highest CPC keywords with campaign info
+
+def insights_campaign_pacing(dataset, account_config, days, insights):
+    """Campaign-level forecasts and budget pacing."""
+    insights['campaign_pacing'] = []
+    try:
+        df_budgets = dataset['budgets'] if dataset.has('budgets') else None
+        insights['campaign_pacing'] = calculate_campaign_forecasts(
+            dataset['campaigns-daily-91d'], df_budgets, forecast_days=30,
+            days_remaining=insights.get('days_remaining', 0))
+    except:
+        pass
+
+
+def highest_cpc_row(dataset, query_name, text_column):
+    """The row with the highest CPC among rows with clicks (read chunk by chunk), or None."""
+    top = TopRows(1, 'cpc')
+    for chunk in dataset.chunks(query_name, [text_column, 'campaign.name', 'metrics.clicks', 'metrics.cost_micros']):
+        chunk = chunk[chunk['metrics.clicks'] > 0]
+        top.add(chunk.assign(cpc=chunk['metrics.cost_micros'] / 1_000_000 / chunk['metrics.clicks']))
+    rows = top.result()
+    return rows.iloc[0] if len(rows) > 0 else None
+
+
+def insights_highest_cpc_keywords(dataset, account_config, days, insights):
+    """Highest CPC keywords (30 and 7 days) with campaign info."""
     try:
-        df_kw = pd.read_csv(audit_dir / 'data' / 'keywords.csv')
-        df_kw['cpc'] = df_kw['metrics.cost_micros'] / df_kw['metrics.clicks'] / 1_000_000
-        df_kw = df_kw[df_kw['metrics.clicks'] > 0]
-        if len(df_kw) > 0:
-            top_cpc = df_kw.nlargest(1, 'cpc').iloc[0]
+        top_cpc = highest_cpc_row(dataset, 'keywords', 'ad_group_criterion.keyword.text')
+        if top_cpc is not None:
             insights['highest_cpc_kw_30d'] = top_cpc['ad_group_criterion.keyword.text']
             insights['highest_cpc_kw_30d_value'] = top_cpc['cpc']
             insights['highest_cpc_kw_30d_campaign'] = top_cpc.get('campaign.name', 'N/A')
 
-        df_kw7 = pd.read_csv(audit_dir / 'data' / 'keywords-7d.csv')
-        df_kw7['cpc'] = df_kw7['metrics.cost_micros'] / df_kw7['metrics.clicks'] / 1_000_000
-        df_kw7 = df_kw7[df_kw7['metrics.clicks'] > 0]
-        if len(df_kw7) > 0:
-            top_cpc7 = df_kw7.nlargest(1, 'cpc').iloc[0]
+        top_cpc7 = highest_cpc_row(dataset, 'keywords-7d', 'ad_group_criterion.keyword.text')
+        if top_cpc7 is not None:
             insights['highest_cpc_kw_7d'] = top_cpc7['ad_group_criterion.keyword.text']
             insights['highest_cpc_kw_7d_value'] = top_cpc7['cpc']
             insights['highest_cpc_kw_7d_campaign'] = top_cpc7.get('campaign.name', 'N/A')
     except:
         pass
 
-    # Highest CPC search terms with campaign info
+
+def insights_highest_cpc_search_terms(dataset, account_config, days, insights):
+    """Highest CPC search terms (30 and 7 days) with campaign info."""
     try:
-        df_st = pd.read_csv(audit_dir / 'data' / 'search-terms.csv')
-        df_st['cpc'] = df_st['metrics.cost_micros'] / df_st['metrics.clicks'] / 1_000_000
-        df_st = df_st[df_st['metrics.clicks'] > 0]
-        if len(df_st) > 0:
-            top_st = df_st.nlargest(1, 'cpc').iloc[0]
+        top_st = highest_cpc_row(dataset, 'search-terms', 'search_term_view.search_term')
+        if top_st is not None:
             insights['highest_cpc_st_30d'] = top_st['search_term_view.search_term']
             insights['highest_cpc_st_30d_value'] = top_st['cpc']
             insights['highest_cpc_st_30d_campaign'] = top_st.get('campaign.name', 'N/A')
 
-        df_st7 = pd.read_csv(audit_dir / 'data' / 'search-terms-7d.csv')
-        df_st7['cpc'] = df_st7['metrics.cost_micros'] / df_st7['metrics.clicks'] / 1_000_000
-        df_st7 = df_st7[df_st7['metrics.clicks'] > 0]
-        if len(df_st7) > 0:
-            top_st7 = df_st7.nlargest(1, 'cpc').iloc[0]
+        top_st7 = highest_cpc_row(dataset, 'search-terms-7d', 'search_term_view.search_term')
+        if top_st7 is not None:
             insights['highest_cpc_st_7d'] = top_st7['search_term_view.search_term']
             insights['highest_cpc_st_7d_value'] = top_st7['cpc']
             insights['highest_cpc_st_7d_campaign'] = top_st7.get('campaign.name', 'N/A')
     except:
         pass
 
-    # Top 5 zero conversion search terms
+
+def insights_zero_conversion_terms(dataset, account_config, days, insights):
+    """Zero-conversion search terms: count, cost, share of spend and the top 5 by cost."""
     try:
-        df_st = pd.read_csv(audit_dir / 'data' / 'search-terms.csv')
-        zero_conv = df_st[(df_st['metrics.conversions'] == 0) & (df_st['metrics.cost_micros'] > 0)]
-        insights['zero_conv_terms'] = len(zero_conv)
-        insights['zero_conv_cost'] = zero_conv['metrics.cost_micros'].sum() / 1_000_000
+        totals = RunningTotals(['metrics.cost_micros'])
+        top5_zero = TopRows(5, 'metrics.cost_micros')
+        for df_st in dataset.chunks('search-terms', ['search_term_view.search_term', 'campaign.name', 'metrics.clicks',
+                                                     'metrics.cost_micros', 'metrics.conversions']):
+            zero_conv = df_st[(df_st['metrics.conversions'] == 0) & (df_st['metrics.cost_micros'] > 0)]
+            totals.add(zero_conv)
+            top5_zero.add(zero_conv)
+        insights['zero_conv_terms'] = totals.count
+        insights['zero_conv_cost'] = totals.sums['metrics.cost_micros'] / 1_000_000
         insights['zero_conv_pct'] = (insights['zero_conv_cost'] / insights['total_cost'] * 100) if insights.get('total_cost', 0) > 0 else 0
 
         # Top 5 by cost
-        top5_zero = zero_conv.nlargest(5, 'metrics.cost_micros')
         insights['top5_zero_conv'] = []
-        for _, row in top5_zero.iterrows():
+        for _, row in top5_zero.result().iterrows():
             insights['top5_zero_conv'].append({
                 'term': row['search_term_view.search_term'],
                 'cost': row['metrics.cost_micros'] / 1_000_000,
@@ -440,16 +947,91 @@ def calculate_insights(audit_dir, account_config, days):
     except:
         pass
 
-    # Conversion actions count
+
+def insights_ngram_waste(dataset, account_config, days, insights):
+    """1- to 3-word n-grams shared by search terms that spent without converting."""
+    if dataset.chunked('search-terms'):
+        return  # needs every term at once; not run with --chunk-rows
+    try:
+        df_st = dataset['search-terms']
+        table = ngram_totals(df_st['search_term_view.search_term'], pd.DataFrame({
+            'cost': dataset.cost('search-terms'),
+            'clicks': df_st['metrics.clicks'],
+            'impressions': df_st['metrics.impressions'],
+            'conversions': df_st['metrics.conversions'],
+        }))
+        insights['wasted_ngrams'] = []
+        for _, row in wasted_ngrams(table, top=20).iterrows():
+            insights['wasted_ngrams'].append({
+                'ngram': row['ngram'],
+                'words': int(row['n']),
+                'terms': int(row['terms']),
+                'cost': row['cost'],
+                'clicks': int(row['clicks']),
+                'impressions': int(row['impressions']),
+            })
+    except:
+        pass
+
+
+def insights_conversion_actions(dataset, account_config, days, insights):
+    """
+    Number of conversion actions, and per-action tracking health and daily
+    anomalies. The last DEFAULT_LAG_DAYS are still receiving late conversions,
+    so zeros and drops there are only provisional.
+    """
     try:
-        df_ca = pd.read_csv(audit_dir / 'data' / 'conv-actions-daily.csv')
+        df_ca = dataset['conv-actions-daily']
         insights['conv_action_count'] = df_ca['segments.conversion_action_name'].nunique()
+
+        start_date, end_date = query_window('conv-actions-daily', account_config, days)
+        matrix = daily_matrix(dataset.dates('conv-actions-daily'), df_ca['segments.conversion_action_name'],
+                              df_ca['metrics.conversions'], start_date, end_date)
+        health = series_health(matrix, lag_days=DEFAULT_LAG_DAYS)
+        anomalies = find_anomalies(matrix, lag_days=DEFAULT_LAG_DAYS)
+        recent_start = pd.Timestamp(end_date) - pd.Timedelta(days=DEFAULT_LAG_DAYS + 7)
+        insights['conversion_lag_days'] = DEFAULT_LAG_DAYS
+        anomaly_counts = anomalies['series'].value_counts()
+
+        insights['conversion_tracking'] = []
+        for action, row in health.sort_values('total', ascending=False).iterrows():
+            anomaly_count = int(anomaly_counts.get(action, 0))
+            if row['stopped']:
+                status = 'stopped'
+            elif row['provisional']:
+                status = 'provisional'
+            else:
+                status = 'anomalies' if anomaly_count else 'healthy'
+            insights['conversion_tracking'].append({
+                'action': action,
+                'conversions': row['total'],
+                'last_conversion': row['last_nonzero'].strftime('%Y-%m-%d') if pd.notna(row['last_nonzero']) else None,
+                'zero_days': int(row['zero_days']),
+                'baseline': row['baseline'],
+                'anomalies': anomaly_count,
+                'status': status,
+            })
+        insights['conversion_anomalies'] = [
+            {
+                'date': row['date'].strftime('%Y-%m-%d'),
+                'action': row['series'],
+                'conversions': row['value'],
+                'baseline': row['baseline'],
+                'z_score': row['z'],
+                'type': row['kind'],
+                'recent': bool(row['date'] > recent_start),
+                'provisional': bool(row['provisional']),
+            }
+            for _, row in anomalies.iterrows()
+        ]
     except:
         pass
 
-    # Asset performance (enum values: 2=GOOD, 3=BEST, 4=EXCELLENT, 5=UNSPECIFIED, 6=LOW)
+
+def insights_assets(dataset, account_config, days, insights):
+    """Asset performance labels and the best and lowest performing text assets."""
     try:
-        df_assets = pd.read_csv(audit_dir / 'data' / 'assets.csv')
+        df_assets = dataset['assets']
         if 'ad_group_ad_asset_view.performance_label' in df_assets.columns:
             insights['assets_best'] = len(df_assets[df_assets['ad_group_ad_asset_view.performance_label'].isin([3.0, 4.0])])
             insights['assets_good'] = len(df_assets[df_assets['ad_group_ad_asset_view.performance_label'] == 2.0])
@@ -481,15 +1063,21 @@ def calculate_insights(audit_dir, account_config, days):
     except:
         pass
 
-    # Top non-brand keywords (sorted by cost desc)
+
+BRAND_SPLIT_METRICS = ['metrics.cost_micros', 'metrics.clicks', 'metrics.conversions', 'metrics.conversions_value']
+
+
+def insights_top_nonbrand_keywords(dataset, account_config, days, insights):
+    """Top converting non-brand keywords by cost."""
+    matcher = brand_matcher(account_config.get('brand_strings', []))
     try:
-        df_kw = pd.read_csv(audit_dir / 'data' / 'keywords.csv')
-        df_kw = df_kw[df_kw['metrics.conversions'] > 0]
-        # Filter out brand
-        df_kw['is_brand'] = df_kw['ad_group_criterion.keyword.text'].apply(lambda x: is_brand(x, brand_strings))
-        df_nonbrand = df_kw[~df_kw['is_brand']].nlargest(5, 'metrics.cost_micros')  # Sort by cost desc
+        df_nonbrand = TopRows(5, 'metrics.cost_micros')  # Sort by cost desc
+        for df_kw in dataset.chunks('keywords', ['ad_group_criterion.keyword.text'] + BRAND_SPLIT_METRICS):
+            # Filter out brand
+            brand = matcher.matches(df_kw['ad_group_criterion.keyword.text'])
+            df_nonbrand.add(df_kw[(df_kw['metrics.conversions'] > 0) & ~brand])
         insights['top_nonbrand_kw'] = []
-        for _, row in df_nonbrand.iterrows():
+        for _, row in df_nonbrand.result().iterrows():
             insights['top_nonbrand_kw'].append({
                 'keyword': row['ad_group_criterion.keyword.text'],
                 'conversions': row['metrics.conversions'],
@@ -499,36 +1087,128 @@ def calculate_insights(audit_dir, account_config, days):
     except:
         pass
 
-    # Top products with period comparison
+
+# Entity -> (query result, text column matched against brand_strings)
+BRAND_SPLIT_ENTITIES = {
+    'campaigns': ('campaigns', 'campaign.name'),
+    'keywords': ('keywords', 'ad_group_criterion.keyword.text'),
+    'search_terms': ('search-terms', 'search_term_view.search_term'),
+    'products': ('products', 'segments.product_title'),
+}
+
+
+def insights_brand_split(dataset, account_config, days, insights):
+    """Brand vs non-brand totals for campaigns, keywords, search terms and products."""
+    matcher = brand_matcher(account_config.get('brand_strings', []))
+    insights['brand_split'] = {}
+    if not matcher:
+        return
+    for entity, (query_name, column) in BRAND_SPLIT_ENTITIES.items():
+        try:
+            totals = {'brand': RunningTotals(BRAND_SPLIT_METRICS), 'non_brand': RunningTotals(BRAND_SPLIT_METRICS)}
+            for df in dataset.chunks(query_name, [column] + BRAND_SPLIT_METRICS):
+                brand = matcher.matches(df[column])
+                totals['brand'].add(df, brand)
+                totals['non_brand'].add(df, ~brand)
+            total_cost = sum(side.sums['metrics.cost_micros'] for side in totals.values()) / 1_000_000
+            split = {}
+            for side, side_totals in totals.items():
+                sums = side_totals.sums
+                side_cost = sums['metrics.cost_micros'] / 1_000_000
+                value = sums['metrics.conversions_value']
+                split[side] = {
+                    'count': side_totals.count,
+                    'cost': side_cost,
+                    'clicks': int(sums['metrics.clicks']),
+                    'conversions': sums['metrics.conversions'],
+                    'value': value,
+                    'roas': value / side_cost if side_cost > 0 else 0,
+                    'cost_share': side_cost / total_cost * 100 if total_cost > 0 else 0,
+                }
+            insights['brand_split'][entity] = split
+        except:
+            pass
+
+
+# Entity -> (current query, previous query, key columns, label columns, column naming it in the report)
+PERIOD_COMPARISONS = {
+    'campaigns': ('campaigns', 'campaigns-prev', ['campaign.id'], ['campaign.name'], 'campaign.name'),
+    'keywords': ('keywords', 'keywords-prev',
+                 ['ad_group_criterion.keyword.text', 'ad_group_criterion.keyword.match_type'], ['campaign.name'],
+                 'ad_group_criterion.keyword.text'),
+    'products': ('products', 'products-prev', ['segments.product_item_id'],
+                 ['segments.product_title', 'segments.product_image_url'], 'segments.product_title'),
+}
+COMPARISON_METRICS = ['cost', 'clicks', 'conversions', 'value']
+
+
+def comparison_input(dataset, query_name, keys, labels):
+    """A query result's entity columns with cost, clicks, conversions and value."""
+    df = dataset[query_name]
+    return df[keys + labels].assign(
+        cost=dataset.cost(query_name),
+        clicks=df['metrics.clicks'],
+        conversions=df['metrics.conversions'],
+        value=df['metrics.conversions_value'])
+
+
+def insights_period_comparison(dataset, account_config, days, insights):
+    """
+    Every campaign, keyword and product compared with the previous period.
+    The full tables go to data/{entity}-comparison; insights keep the
+    per-status totals and the biggest movers.
+    """
+    insights['period_comparison'] = {}
+    for entity, (query_name, prev_name, keys, labels, name) in PERIOD_COMPARISONS.items():
+        if dataset.chunked(query_name) or dataset.chunked(prev_name):
+            continue  # needs both periods whole; not compared with --chunk-rows
+        try:
+            labels = [label for label in labels
+                      if label in dataset[query_name].columns and label in dataset[prev_name].columns]
+            comparison = compare_periods(comparison_input(dataset, query_name, keys, labels),
+                                         comparison_input(dataset, prev_name, keys, labels),
+                                         keys, COMPARISON_METRICS, labels)
+            name = name if name in comparison.columns else keys[0]
+            movers = comparison.loc[comparison['cost_change'].abs().nlargest(5).index]
+            dataset.store(f'{entity}-comparison', comparison)
+            insights['period_comparison'][entity] = {
+                'statuses': summarize_comparison(comparison, 'cost'),
+                'movers': [
+                    {
+                        'name': str(row[name]),
+                        'status': row['status'],
+                        'cost': row['cost'],
+                        'prev_cost': row['cost_prev'],
+                        'cost_change': row['cost_change'],
+                        'conversions': row['conversions'],
+                        'prev_conversions': row['conversions_prev'],
+                    }
+                    for _, row in movers.iterrows()
+                ],
+            }
+        except:
+            pass
+
+
+def insights_top_products(dataset, account_config, days, insights):
+    """Top products by spend with period comparison."""
     try:
-        df_prod = pd.read_csv(audit_dir / 'data' / 'products.csv')
-        df_prod_prev = pd.read_csv(audit_dir / 'data' / 'products-prev.csv')
+        if 'products' not in insights.get('period_comparison', {}):
+            return
+        comparison = dataset['products-comparison']
 
         # Get top 5 by current spend
-        top_products = df_prod.nlargest(5, 'metrics.cost_micros')
+        top_products = comparison[comparison['status'] != 'lost'].nlargest(5, 'cost')
         insights['top_products'] = []
 
         for _, row in top_products.iterrows():
             product_id = row['segments.product_item_id']
             product_title = row['segments.product_title']
 
-            # Find previous period data for this product
-            prev_row = df_prod_prev[df_prod_prev['segments.product_item_id'] == product_id]
-
-            current_cost = row['metrics.cost_micros'] / 1_000_000
-            current_conv = row['metrics.conversions']
-            current_roas = row['metrics.conversions_value'] / current_cost if current_cost > 0 else 0
-
-            if len(prev_row) > 0:
-                prev_cost = prev_row['metrics.cost_micros'].values[0] / 1_000_000
-                prev_conv = prev_row['metrics.conversions'].values[0]
-                cost_change = ((current_cost - prev_cost) / prev_cost * 100) if prev_cost > 0 else None
-                conv_change = ((current_conv - prev_conv) / prev_conv * 100) if prev_conv > 0 else None
-            else:
-                prev_cost = 0
-                prev_conv = 0
-                cost_change = None
-                conv_change = None
+            current_cost = row['cost']
+            current_roas = row['value'] / current_cost if current_cost > 0 else 0
+            cost_change = row['cost_change_pct']
+            conv_change = row['conversions_change_pct']
 
             # Get image URL if available
             image_url = row.get('segments.product_image_url', '')
@@ -539,321 +1219,409 @@ def calculate_insights(audit_dir, account_config, days):
                 'title': product_title[:50] if product_title else product_id,
                 'id': product_id,
                 'cost': current_cost,
-                'conversions': current_conv,
+                'conversions': row['conversions'],
                 'roas': current_roas,
-                'cost_change': cost_change,
-                'conv_change': conv_change,
+                'cost_change': None if np.isnan(cost_change) else cost_change,
+                'conv_change': None if np.isnan(conv_change) else conv_change,
                 'image_url': str(image_url) if image_url else ''
             })
     except:
         pass
 
+# Insight block -> (function, query results it reads, blocks whose insights it reads).
+# calculate_insights runs them in this order; --pipeline runs each one as soon
+# as its inputs have arrived.
+INSIGHT_BLOCKS = {
+    'periods': (insights_periods, [], []),
+    'totals': (insights_totals, ['campaigns'], []),
+    'previous_period': (insights_previous_period, ['campaigns-prev'], ['totals']),
+    'forecast': (insights_forecast, ['daily-conv-91d'], ['totals']),
+    'campaign_pacing': (insights_campaign_pacing, ['campaigns-daily-91d', 'budgets'], ['forecast']),
+    'highest_cpc_keywords': (insights_highest_cpc_keywords, ['keywords', 'keywords-7d'], []),
+    'highest_cpc_search_terms': (insights_highest_cpc_search_terms, ['search-terms', 'search-terms-7d'], []),
+    'zero_conversion_terms': (insights_zero_conversion_terms, ['search-terms'], ['totals']),
+    'ngram_waste': (insights_ngram_waste, ['search-terms'], []),
+    'conversion_actions': (insights_conversion_actions, ['conv-actions-daily'], []),
+    'assets': (insights_assets, ['assets'], []),
+    'top_nonbrand_keywords': (insights_top_nonbrand_keywords, ['keywords'], []),
+    'brand_split': (insights_brand_split, ['campaigns', 'keywords', 'search-terms', 'products'], []),
+    'period_comparison': (insights_period_comparison,
+                          ['campaigns', 'campaigns-prev', 'keywords', 'keywords-prev', 'products', 'products-prev'], []),
+    'top_products': (insights_top_products, [], ['period_comparison']),
+}
+
+
+def calculate_insights(dataset, account_config, days):
+    insights = {}
+    for block, _, _ in INSIGHT_BLOCKS.values():
+        block(dataset, account_config, days, insights)
     return insights
 
 
-def generate_charts(audit_dir, account_name, account_config, insights):
+def chart_data_daily_conversions(dataset, insights):
+    df = dataset['daily-conv']
+    if len(df) == 0:
+        return None
+    return pd.DataFrame({
+        'date': dataset.dates('daily-conv'),
+        'conversions': df['metrics.conversions'],
+        'cost': dataset.cost('daily-conv'),
+    }).sort_values('date')
+
+
+def chart_data_conversion_actions(dataset, insights):
+    df = dataset['conv-actions-daily']
+    if len(df) == 0 or 'segments.conversion_action_name' not in df.columns:
+        return None
+    return pd.DataFrame({
+        'date': dataset.dates('conv-actions-daily'),
+        'action': df['segments.conversion_action_name'],
+        'conversions': df['metrics.conversions'],
+    })
+
+
+def chart_data_campaign_spend(dataset, insights):
+    df = dataset['campaigns'].assign(cost=dataset.cost('campaigns'))
+    df = df[df['metrics.cost_micros'] > 0].head(10)
+    if len(df) == 0:
+        return None
+    return pd.DataFrame({'name': df['campaign.name'].str[:30], 'cost': df['cost']})
+
+
+def chart_data_roas_by_campaign(dataset, insights):
+    df = dataset['campaigns'].assign(roas=dataset['campaigns']['metrics.conversions_value'] / dataset.cost('campaigns'))
+    df = df[df['metrics.cost_micros'] > 0]
+    df = df.nlargest(10, 'metrics.cost_micros')
+    if len(df) == 0:
+        return None
+    return pd.DataFrame({'name': df['campaign.name'].str[:30], 'roas': df['roas']})
+
+
+def chart_data_forecast(dataset, insights):
+    actual = chart_data_daily_conversions(dataset, insights)
+    if actual is None:
+        return None
+    actual = actual[['date', 'cost']]
+
+    # Advanced forecast if available, otherwise the simple daily average
+    forecast_df = insights.get('forecast_df')
+    if forecast_df is not None and len(forecast_df) > 0:
+        forecast = forecast_df[['date', 'cost']]
+    else:
+        daily_avg = insights.get('daily_avg_cost', actual['cost'].mean())
+        last_date = actual['date'].max()
+        forecast = pd.DataFrame({
+            'date': [last_date + timedelta(days=i) for i in range(1, 31)],
+            'cost': [daily_avg] * 30,
+        })
+    return {'actual': actual, 'forecast': forecast}
+
+
+def chart_data_period_comparison(dataset, insights):
+    return [
+        ('Spend', insights.get('total_cost', 0), insights.get('prev_cost', 0)),
+        ('Conversions', insights.get('total_conversions', 0), insights.get('prev_conversions', 0)),
+        ('Value', insights.get('total_value', 0), insights.get('prev_value', 0)),
+        ('ROAS', insights.get('roas', 0), insights.get('prev_roas', 0)),
+    ]
+
+
+# Chart name -> function returning the slice of data that chart draws (None = skip)
+CHART_DATA = {
+    'daily-conversions': chart_data_daily_conversions,
+    'conversion-actions': chart_data_conversion_actions,
+    'campaign-spend': chart_data_campaign_spend,
+    'roas-by-campaign': chart_data_roas_by_campaign,
+    'forecast': chart_data_forecast,
+    'period-comparison': chart_data_period_comparison,
+}
+
+# Chart name -> (query results its data reads, insight blocks it reads), for --pipeline
+CHART_INPUTS = {
+    'daily-conversions': (['daily-conv'], []),
+    'conversion-actions': (['conv-actions-daily'], []),
+    'campaign-spend': (['campaigns'], []),
+    'roas-by-campaign': (['campaigns'], []),
+    'forecast': (['daily-conv'], ['forecast']),
+    'period-comparison': ([], ['totals', 'previous_period']),
+}
+
+
+def generate_charts(audit_dir, account_name, account_config, insights, dataset, max_workers=None, cache=None,
+                    chart_format='png', metrics=None, manifest=None, names=None):
+    """
+    Render every chart in CHART_DATA to charts/{name}.{chart_format} (png or svg).
+
+    Each chart is an independent task that gets only its own slice of data.
+    Tasks run in a process pool of up to max_workers (default: one per CPU),
+    or in this process with max_workers=1. A failing chart is reported and
+    does not affect the others.
+
+    With a chart cache (a ResultCache of chart files), charts whose data and styling
+    are unchanged are copied from the cache instead of rendered. With RunMetrics,
+    each render is measured where it runs (in the worker process). With an
+    AuditManifest, each chart is recorded as a stage keyed by its content, and
+    when resuming, charts already rendered from the same content are kept.
+    names limits the run to those charts (default: all of CHART_DATA).
+    """
     charts_dir = audit_dir / 'charts'
     charts_dir.mkdir(exist_ok=True)
 
     currency = account_config.get('currency', 'AUD')
-    cs = {'AUD': 'A$', 'USD': '$', 'GBP': '£'}.get(currency, '$')
-    target_roas = account_config.get('target_roas', 3)
-    primary_color = account_config.get('brand_color_primary', '#1a73e8')
-    secondary_color = account_config.get('brand_color_secondary', '#f5a623')
-
-    # Chart styling - clean axes, grid, no box
-    plt.rcParams.update({
-        'axes.facecolor': 'white',
-        'axes.edgecolor': '#333333',
-        'axes.linewidth': 1.5,
-        'axes.spines.top': False,
-        'axes.spines.right': False,
-        'grid.color': '#e0e0e0',
-        'grid.linewidth': 0.5,
-        'grid.alpha': 0.7,
-        'font.family': 'sans-serif',
-    })
+    style = {
+        'account_name': account_name,
+        'cs': {'AUD': 'A$', 'USD': '$', 'GBP': '£'}.get(currency, '$'),
+        'target_roas': account_config.get('target_roas', 3),
+        'primary_color': account_config.get('brand_color_primary', '#1a73e8'),
+        'secondary_color': account_config.get('brand_color_secondary', '#f5a623'),
+    }
 
-    # 1. Daily Conversions Trend (curved, thicker lines)
-    try:
-        df = pd.read_csv(audit_dir / 'data' / 'daily-conv.csv')
-        if len(df) > 0:
-            df['date'] = pd.to_datetime(df['segments.date'])
-            df = df.sort_values('date')
-            df['cost'] = df['metrics.cost_micros'] / 1_000_000
-
-            fig, ax1 = plt.subplots(figsize=(12, 5))
-            ax1.set_xlabel('Date')
-            ax1.set_ylabel('Conversions', color=primary_color)
-            ax1.grid(True, alpha=0.3)
-
-            # Smooth interpolation for conversions
-            if len(df) > 3:
-                x_num = mdates.date2num(df['date'])
-                x_smooth = np.linspace(x_num.min(), x_num.max(), 200)
-                spl = make_interp_spline(x_num, df['metrics.conversions'], k=3)
-                y_smooth = spl(x_smooth)
-                ax1.plot(mdates.num2date(x_smooth), y_smooth, color=primary_color, linewidth=2.5)
-                ax1.scatter(df['date'], df['metrics.conversions'], color=primary_color, s=30, zorder=5)
+    tasks = {}
+    errors = {}
+    for name, chart_data in CHART_DATA.items():
+        if names is not None and name not in names:
+            continue
+        try:
+            data = chart_data(dataset, insights)
+        except Exception as e:
+            errors[name] = str(e)
+            continue
+        if data is not None:
+            tasks[name] = data
+
+    keys = {}
+    cached = set()
+    unchanged = set()
+    if cache is not None or manifest is not None:
+        for name in list(tasks):
+            keys[name] = chart_key(name, tasks[name], style, chart_format)
+            path = charts_dir / f'{name}.{chart_format}'
+            if manifest is not None and not manifest.should_run(f'charts/{name}', keys[name], path):
+                errors[name] = None
+                unchanged.add(name)
+                del tasks[name]
+            elif cache is not None and cache.fetch(keys[name], path):
+                errors[name] = None
+                cached.add(name)
+                del tasks[name]
+
+    call = (measure, metrics.trace_memory, render_chart) if metrics is not None else (render_chart,)
+    results = {}
+    workers = min(len(tasks), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        for name, data in tasks.items():
+            results[name] = call[0](*call[1:], name, data, style, charts_dir / f'{name}.{chart_format}')
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_chart_worker) as pool:
+            futures = {name: pool.submit(*call, name, data, style, charts_dir / f'{name}.{chart_format}')
+                       for name, data in tasks.items()}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    # The worker process itself died
+                    errors[name] = str(e) or type(e).__name__
+
+    for name, result in results.items():
+        if metrics is not None:
+            result, sample = result
+            metrics.record('chart', name, sample, format=chart_format)
+        errors[name] = result
+
+    if cache is not None:
+        for name in tasks:
+            if errors[name] is None:
+                cache.store(keys[name], charts_dir / f'{name}.{chart_format}', chart=name)
+
+    if manifest is not None:
+        for name, error in errors.items():
+            if name not in unchanged:
+                manifest.record(f'charts/{name}', 'failed' if error else 'done', keys.get(name), error=error)
+
+    for name in CHART_DATA:
+        if name in errors:
+            if name in unchanged:
+                print(f"  - {name}.{chart_format} (unchanged)")
+            elif name in cached:
+                print(f"  - {name}.{chart_format} (cached)")
+            elif errors[name] is None:
+                print(f"  - {name}.{chart_format}")
             else:
-                ax1.plot(df['date'], df['metrics.conversions'], color=primary_color, linewidth=2.5, marker='o', markersize=4)
+                print(f"  - {name}.{chart_format} (failed: {errors[name]})")
 
-            ax1.tick_params(axis='y', labelcolor=primary_color)
 
-            ax2 = ax1.twinx()
-            ax2.set_ylabel(f'Cost ({cs})', color=secondary_color)
-
-            # Smooth interpolation for cost
-            if len(df) > 3:
-                spl2 = make_interp_spline(x_num, df['cost'], k=3)
-                y_smooth2 = spl2(x_smooth)
-                ax2.plot(mdates.num2date(x_smooth), y_smooth2, color=secondary_color, linewidth=2.5, alpha=0.8)
-                ax2.scatter(df['date'], df['cost'], color=secondary_color, s=30, zorder=5, alpha=0.8)
-            else:
-                ax2.plot(df['date'], df['cost'], color=secondary_color, linewidth=2.5, alpha=0.8, marker='o', markersize=4)
+def audit_pipeline(audit_dir, account_name, account_config, days, dataset, insights, cache=None, chart_format='png',
+                   metrics=None, manifest=None):
+    """
+    Schedule every insight block and chart on the query results it declares
+    (INSIGHT_BLOCKS, CHART_INPUTS), for --pipeline.
 
-            ax2.tick_params(axis='y', labelcolor=secondary_color)
-            ax2.spines['right'].set_visible(True)
+    Call arrive(query_name) as each result lands: blocks fill `insights` and
+    charts render (in this process) as soon as their inputs are ready, while
+    the remaining queries are still running. A failed query still arrives, so
+    its dependents run and fall back exactly as in calculate_insights.
+    """
+    scheduler = DependencyScheduler()
 
-            ax1.xaxis.set_major_formatter(mdates.DateFormatter('%b %d'))
-            plt.title(f'Daily Performance - {account_name}', fontweight='bold', fontsize=14)
-            fig.tight_layout()
-            plt.savefig(charts_dir / 'daily-conversions.png', dpi=150, facecolor='white')
-            plt.close()
-            print("  - daily-conversions.png")
-    except Exception as e:
-        print(f"  - daily-conversions.png (failed: {e})")
+    def run_block(name, block):
+        with profile_stage(metrics, 'insights', name):
+            block(dataset, account_config, days, insights)
 
-    # 2. Conversion Actions Over Time (multi-line, curved)
-    try:
-        df = pd.read_csv(audit_dir / 'data' / 'conv-actions-daily.csv')
-        if len(df) > 0 and 'segments.conversion_action_name' in df.columns:
-            df['date'] = pd.to_datetime(df['segments.date'])
-
-            fig, ax = plt.subplots(figsize=(12, 6))
-
-            actions = df['segments.conversion_action_name'].unique()
-            colors = plt.cm.tab10(np.linspace(0, 1, len(actions)))
-
-            ax.grid(True, alpha=0.3)
-            for action, color in zip(actions, colors):
-                action_df = df[df['segments.conversion_action_name'] == action].sort_values('date')
-                label = action[:30] if len(action) > 30 else action
-                # Smooth line
-                if len(action_df) > 3:
-                    x_num = mdates.date2num(action_df['date'])
-                    x_smooth = np.linspace(x_num.min(), x_num.max(), 100)
-                    try:
-                        spl = make_interp_spline(x_num, action_df['metrics.conversions'], k=3)
-                        y_smooth = spl(x_smooth)
-                        ax.plot(mdates.num2date(x_smooth), y_smooth, linewidth=2, label=label, color=color)
-                        ax.scatter(action_df['date'], action_df['metrics.conversions'], color=color, s=20, zorder=5)
-                    except:
-                        ax.plot(action_df['date'], action_df['metrics.conversions'], linewidth=2, label=label, color=color, marker='o', markersize=3)
-                else:
-                    ax.plot(action_df['date'], action_df['metrics.conversions'], linewidth=2, label=label, color=color, marker='o', markersize=3)
+    def run_chart(name):
+        generate_charts(audit_dir, account_name, account_config, insights, dataset, 1, cache, chart_format, metrics,
+                        manifest, names=[name])
 
-            ax.set_xlabel('Date')
-            ax.set_ylabel('Conversions')
-            ax.set_title(f'Conversion Actions Over Time - {account_name}', fontweight='bold', fontsize=14)
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %d'))
+    for name, (block, queries, after) in INSIGHT_BLOCKS.items():
+        scheduler.add(f'insights/{name}', queries + [f'insights/{other}' for other in after],
+                      lambda name=name, block=block: run_block(name, block))
+    for name, (queries, after) in CHART_INPUTS.items():
+        scheduler.add(f'charts/{name}', queries + [f'insights/{other}' for other in after],
+                      lambda name=name: run_chart(name))
+    return scheduler
 
-            if len(actions) <= 10:
-                ax.legend(loc='upper left', fontsize=8, framealpha=0.9)
 
-            fig.tight_layout()
-            plt.savefig(charts_dir / 'conversion-actions.png', dpi=150, facecolor='white')
-            plt.close()
-            print("  - conversion-actions.png")
-    except Exception as e:
-        print(f"  - conversion-actions.png (failed: {e})")
+def full_report_tables(dataset, insights):
+    """
+    Unabridged report tables: every zero-conversion search term and every
+    keyword, by cost. Rows are generated lazily while the report is written.
+    """
+    cs = insights.get('currency_symbol', '$')
+    tables = []
 
-    # 3. Campaign Spend Distribution
     try:
-        df = pd.read_csv(audit_dir / 'data' / 'campaigns.csv')
-        df = df[df['metrics.cost_micros'] > 0].head(10)
-        if len(df) > 0:
-            df['cost'] = df['metrics.cost_micros'] / 1_000_000
-            df['name'] = df['campaign.name'].str[:30]
-
-            fig, ax = plt.subplots(figsize=(12, 6))
-            ax.grid(True, alpha=0.3, axis='x')
-            bars = ax.barh(df['name'], df['cost'], color=primary_color, edgecolor='white', linewidth=0.5)
-            ax.set_xlabel(f'Cost ({cs})')
-            ax.set_title(f'Top Campaigns by Spend - {account_name}', fontweight='bold', fontsize=14)
-            ax.invert_yaxis()
-
-            for bar, val in zip(bars, df['cost']):
-                ax.text(bar.get_width() + max(df['cost']) * 0.01, bar.get_y() + bar.get_height()/2,
-                       f'{cs}{val:,.0f}', va='center', fontsize=9)
-
-            plt.tight_layout()
-            plt.savefig(charts_dir / 'campaign-spend.png', dpi=150, facecolor='white')
-            plt.close()
-            print("  - campaign-spend.png")
-    except Exception as e:
-        print(f"  - campaign-spend.png (failed: {e})")
+        df_st = dataset['search-terms'].assign(cost=dataset.cost('search-terms'))
+        zero_conv = df_st[(df_st['metrics.conversions'] == 0) & (df_st['cost'] > 0)]
+        zero_conv = zero_conv.sort_values('cost', ascending=False)
+        columns = [
+            ('Search Term', 'search_term_view.search_term', '', 80),
+            ('Campaign', 'campaign.name', '', 40),
+            ('Ad Group', 'ad_group.name', '', 40),
+            (f'Cost ({cs})', 'cost', ',.2f', None),
+            ('Clicks', 'metrics.clicks', ',', None),
+            ('Impressions', 'metrics.impressions', ',', None),
+        ]
+        columns = [c for c in columns if c[1] in zero_conv.columns]
+        tables.append({
+            'title': 'All Zero-Conversion Search Terms',
+            'description': 'Every search term with spend and no conversions, by cost',
+            'count': len(zero_conv),
+            'columns': [c[0] for c in columns],
+            'rows': table_rows(zero_conv, [c[1:] for c in columns]),
+        })
+    except:
+        pass
 
-    # 4. ROAS by Campaign (using account target)
     try:
-        df = pd.read_csv(audit_dir / 'data' / 'campaigns.csv')
-        df = df[df['metrics.cost_micros'] > 0].copy()
-        df['roas'] = df['metrics.conversions_value'] / (df['metrics.cost_micros'] / 1_000_000)
-        df = df.nlargest(10, 'metrics.cost_micros')
-
-        if len(df) > 0:
-            df['name'] = df['campaign.name'].str[:30]
-
-            fig, ax = plt.subplots(figsize=(12, 6))
-            ax.grid(True, alpha=0.3, axis='x')
-            # More subtle colors matching table styling
-            colors = ['#5cb85c' if r >= target_roas else '#f0ad4e' if r >= target_roas * 0.7 else '#d9534f' for r in df['roas']]
-            bars = ax.barh(df['name'], df['roas'], color=colors, edgecolor='white', linewidth=0.5, alpha=0.85)
-            ax.set_xlabel('ROAS')
-            ax.set_title(f'ROAS by Campaign - {account_name}', fontweight='bold', fontsize=14)
-            ax.axvline(x=target_roas, color='#dc3545', linestyle='--', alpha=0.7, linewidth=2, label=f'Target ({target_roas}x)')
-            ax.invert_yaxis()
-            ax.legend(loc='lower right')
-
-            for bar, val in zip(bars, df['roas']):
-                ax.text(bar.get_width() + 0.1, bar.get_y() + bar.get_height()/2,
-                       f'{val:.1f}x', va='center', fontsize=9)
-
-            plt.tight_layout()
-            plt.savefig(charts_dir / 'roas-by-campaign.png', dpi=150, facecolor='white')
-            plt.close()
-            print("  - roas-by-campaign.png")
-    except Exception as e:
-        print(f"  - roas-by-campaign.png (failed: {e})")
+        df_kw = dataset['keywords'].assign(cost=dataset.cost('keywords'))
+        df_kw = df_kw.assign(roas=np.where(df_kw['cost'] > 0, df_kw['metrics.conversions_value'] / df_kw['cost'], 0.0))
+        df_kw = df_kw.sort_values('cost', ascending=False)
+        columns = [
+            ('Keyword', 'ad_group_criterion.keyword.text', '', 80),
+            ('Campaign', 'campaign.name', '', 40),
+            ('Ad Group', 'ad_group.name', '', 40),
+            (f'Cost ({cs})', 'cost', ',.2f', None),
+            ('Clicks', 'metrics.clicks', ',', None),
+            ('Conversions', 'metrics.conversions', ',.1f', None),
+            ('ROAS', 'roas', '.1f', None),
+        ]
+        columns = [c for c in columns if c[1] in df_kw.columns]
+        tables.append({
+            'title': 'All Keywords',
+            'description': 'Every keyword with impressions in the period, by cost',
+            'count': len(df_kw),
+            'columns': [c[0] for c in columns],
+            'rows': table_rows(df_kw, [c[1:] for c in columns]),
+        })
+    except:
+        pass
+
+    return tables
+
+
+MATCH_TYPES = {2: 'Exact', 3: 'Phrase', 4: 'Broad'}
+
+
+def report_data_tables(dataset, insights):
+    """
+    Full search-term, keyword and product tables for the report's virtual
+    tables, by cost. Each column is (label, values, decimals), with decimals
+    None for text. Rows are encoded in compressed chunks as the report is written.
+    """
+    cs = insights.get('currency_symbol', '$')
+    tables = []
+
+    def add(table_id, title, filter_label, df, columns):
+        frame = pd.DataFrame({label: values for label, values, _ in columns})
+        frame = frame.sort_values(f'Cost ({cs})', ascending=False)
+        tables.append({
+            'id': table_id,
+            'title': title,
+            'description': f'All {len(frame):,} rows, by cost. Click a column to sort, or type to filter.',
+            'filter_label': filter_label,
+            'meta': {
+                'count': len(frame),
+                'columns': [{'label': label, 'decimals': decimals} for label, _, decimals in columns],
+            },
+            'chunks': data_table_chunks(frame, list(frame.columns)),
+        })
+
+    def metrics(df, cost):
+        value = df['metrics.conversions_value']
+        return [
+            ('Impressions', df['metrics.impressions'], 0),
+            ('Clicks', df['metrics.clicks'], 0),
+            (f'Cost ({cs})', cost.round(2), 2),
+            ('Conversions', df['metrics.conversions'].round(2), 1),
+            (f'Value ({cs})', value.round(2), 2),
+            ('ROAS', (value / cost).where(cost > 0, 0).round(2), 2),
+        ]
 
-    # 5. Forecast charts (cumulative + daily bar) with advanced forecasting
     try:
-        df = pd.read_csv(audit_dir / 'data' / 'daily-conv.csv')
-        if len(df) > 0:
-            df['date'] = pd.to_datetime(df['segments.date'])
-            df = df.sort_values('date')
-            df['cost'] = df['metrics.cost_micros'] / 1_000_000
-            df['cumulative_cost'] = df['cost'].cumsum()
-
-            # Get advanced forecast data if available
-            forecast_df = insights.get('forecast_df')
-            if forecast_df is not None and len(forecast_df) > 0:
-                forecast_dates = list(forecast_df['date'])
-                forecast_costs = list(forecast_df['cost'])
-                forecast_cumulative = [df['cumulative_cost'].iloc[-1] + forecast_df['cost'].iloc[:i+1].sum() for i in range(len(forecast_df))]
-            else:
-                # Fallback to simple average
-                daily_avg = insights.get('daily_avg_cost', df['cost'].mean())
-                last_date = df['date'].max()
-                forecast_dates = [last_date + timedelta(days=i) for i in range(1, 31)]
-                forecast_costs = [daily_avg] * 30
-                forecast_cumulative = [df['cumulative_cost'].iloc[-1] + daily_avg * i for i in range(1, 31)]
-
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-
-            # Cumulative line chart - smooth the actual, keep forecast wiggly
-            ax1.grid(True, alpha=0.3)
-
-            # Smooth actual cumulative
-            if len(df) > 3:
-                x_num = mdates.date2num(df['date'])
-                x_smooth = np.linspace(x_num.min(), x_num.max(), 100)
-                spl = make_interp_spline(x_num, df['cumulative_cost'], k=3)
-                y_smooth = spl(x_smooth)
-                ax1.plot(mdates.num2date(x_smooth), y_smooth, color=primary_color, linewidth=2.5, label='Actual')
-                ax1.scatter(df['date'], df['cumulative_cost'], color=primary_color, s=20, zorder=5)
-            else:
-                ax1.plot(df['date'], df['cumulative_cost'], color=primary_color, linewidth=2.5, marker='o', markersize=4, label='Actual')
-
-            # Forecast cumulative - show the wiggly pattern from daily forecasts
-            ax1.plot(forecast_dates, forecast_cumulative, color=secondary_color, linewidth=2, marker='o', markersize=3, alpha=0.8, label='Forecast')
-            ax1.set_xlabel('Date')
-            ax1.set_ylabel(f'Cumulative Cost ({cs})')
-            ax1.set_title('Cumulative Spend + Forecast', fontweight='bold')
-            ax1.xaxis.set_major_formatter(mdates.DateFormatter('%b %d'))
-            ax1.legend()
-
-            # Daily bar chart with variable forecast heights
-            colors = [primary_color] * len(df) + [secondary_color] * min(10, len(forecast_costs))
-            all_dates = list(df['date']) + forecast_dates[:10]
-            all_costs = list(df['cost']) + forecast_costs[:10]
-
-            ax2.grid(True, alpha=0.3, axis='y')
-            ax2.bar(all_dates, all_costs, color=colors[:len(all_dates)], edgecolor='white', linewidth=0.5)
-            ax2.set_xlabel('Date')
-            ax2.set_ylabel(f'Daily Cost ({cs})')
-            ax2.set_title('Daily Spend + Forecast', fontweight='bold')
-            ax2.xaxis.set_major_formatter(mdates.DateFormatter('%b %d'))
-            plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45, ha='right')
-
-            fig.tight_layout()
-            plt.savefig(charts_dir / 'forecast.png', dpi=150, facecolor='white')
-            plt.close()
-            print("  - forecast.png")
-    except Exception as e:
-        print(f"  - forecast.png (failed: {e})")
+        df_st = dataset['search-terms']
+        add('search-terms', 'All Search Terms', 'search terms, campaigns or ad groups', df_st, [
+            ('Search Term', df_st['search_term_view.search_term'], None),
+            ('Campaign', df_st['campaign.name'], None),
+            ('Ad Group', df_st['ad_group.name'], None),
+        ] + metrics(df_st, dataset.cost('search-terms')))
+    except:
+        pass
 
-    # 6. Period comparison chart
     try:
-        metrics = ['Spend', 'Conversions', 'Value', 'ROAS']
-        current_values = [
-            insights.get('total_cost', 0),
-            insights.get('total_conversions', 0),
-            insights.get('total_value', 0),
-            insights.get('roas', 0)
-        ]
-        previous_values = [
-            insights.get('prev_cost', 0),
-            insights.get('prev_conversions', 0),
-            insights.get('prev_value', 0),
-            insights.get('prev_roas', 0)
-        ]
+        df_kw = dataset['keywords']
+        match_type = df_kw['ad_group_criterion.keyword.match_type']
+        add('keywords', 'All Keywords', 'keywords, campaigns or ad groups', df_kw, [
+            ('Keyword', df_kw['ad_group_criterion.keyword.text'], None),
+            ('Match Type', match_type.map(MATCH_TYPES).fillna(match_type.astype(str)), None),
+            ('Campaign', df_kw['campaign.name'], None),
+            ('Ad Group', df_kw['ad_group.name'], None),
+        ] + metrics(df_kw, dataset.cost('keywords')))
+    except:
+        pass
 
-        # Normalize for display (different scales)
-        fig, axes = plt.subplots(1, 4, figsize=(14, 4))
-
-        for i, (metric, current, previous) in enumerate(zip(metrics, current_values, previous_values)):
-            ax = axes[i]
-            ax.grid(True, alpha=0.3, axis='y')
-
-            x = [0, 1]
-            heights = [previous, current]
-            colors_bar = [secondary_color, primary_color]
-            labels = ['Previous', 'Current']
-
-            bars = ax.bar(x, heights, color=colors_bar, width=0.6, edgecolor='white')
-            ax.set_xticks(x)
-            ax.set_xticklabels(labels, fontsize=9)
-            ax.set_title(metric, fontweight='bold', fontsize=11)
-
-            # Add value labels on bars
-            for bar, val in zip(bars, heights):
-                if metric == 'ROAS':
-                    label = f'{val:.1f}x'
-                elif metric == 'Conversions':
-                    label = f'{val:,.0f}'
-                else:
-                    label = f'{cs}{val:,.0f}'
-                ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(heights)*0.02,
-                       label, ha='center', va='bottom', fontsize=8)
+    try:
+        df_prod = dataset['products']
+        add('products', 'All Products', 'products or item IDs', df_prod, [
+            ('Product', df_prod['segments.product_title'], None),
+            ('Item ID', df_prod['segments.product_item_id'].astype(str), None),
+        ] + metrics(df_prod, dataset.cost('products')))
+    except:
+        pass
 
-            # Calculate and show delta
-            if previous > 0:
-                delta = ((current - previous) / previous) * 100
-                delta_color = '#28a745' if delta >= 0 else '#dc3545'
-                arrow = '↑' if delta >= 0 else '↓'
-                ax.text(0.5, -0.15, f'{arrow} {abs(delta):.1f}%', transform=ax.transAxes,
-                       ha='center', fontsize=9, color=delta_color, fontweight='bold')
-
-        plt.tight_layout()
-        plt.savefig(charts_dir / 'period-comparison.png', dpi=150, facecolor='white')
-        plt.close()
-        print("  - period-comparison.png")
-    except Exception as e:
-        print(f"  - period-comparison.png (failed: {e})")
+    return tables
 
 
-def generate_html_report(audit_dir, account_name, account_config, days, insights):
+def generate_html_report(audit_dir, account_name, account_config, days, insights, chart_format='png',
+                         chart_embed='inline', full_tables=None, data_tables=None, metrics=None):
+    """
+    Write report.html (and report.pdf via headless Chrome).
+
+    The page is rendered from templates/report.html.j2 and streamed straight
+    to disk. Charts are embedded inline (PNGs as base64, SVGs as markup) or,
+    with chart_embed='external', linked from the charts/ folder next to the
+    report. full_tables (see full_report_tables) appends unabridged tables
+    whose rows are written as they are generated, and data_tables (see
+    report_data_tables) appends virtual-scrolling tables of the full data.
+    """
     import base64
 
     cs = insights.get('currency_symbol', '$')
@@ -865,11 +1633,17 @@ def generate_html_report(audit_dir, account_name, account_config, days, insights
     # Load chart images
     charts_html = {}
     charts_dir = audit_dir / 'charts'
-    for chart_name in ['daily-conversions', 'conversion-actions', 'campaign-spend', 'roas-by-campaign', 'forecast', 'period-comparison']:
-        chart_path = charts_dir / f'{chart_name}.png'
-        if chart_path.exists():
+    for chart_name in CHART_DATA:
+        chart_path = charts_dir / f'{chart_name}.{chart_format}'
+        if not chart_path.exists():
+            continue
+        if chart_embed == 'external':
+            charts_html[chart_name] = safe(f'<img class="chart" src="charts/{chart_path.name}">')
+        elif chart_format == 'svg':
+            charts_html[chart_name] = safe(f'<div class="chart">{chart_path.read_text(encoding="utf-8")}</div>')
+        else:
             with open(chart_path, 'rb') as f:
-                charts_html[chart_name] = base64.b64encode(f.read()).decode()
+                charts_html[chart_name] = safe(f'<img class="chart" src="data:image/png;base64,{base64.b64encode(f.read()).decode()}">')
 
     def format_delta(value, suffix='%', invert=False):
         if value is None:
@@ -877,59 +1651,17 @@ def generate_html_report(audit_dir, account_name, account_config, days, insights
         is_good = value >= 0 if not invert else value <= 0
         color = '#28a745' if is_good else '#dc3545'
         arrow = '↑' if value >= 0 else '↓'
-        return f'<span style="color:{color};font-weight:bold">{arrow} {abs(value):.1f}{suffix}</span>'
-
-    # Top 5 zero conversion terms HTML
-    zero_conv_html = ''
-    for term in insights.get('top5_zero_conv', []):
-        zero_conv_html += f'''<tr>
-            <td>{term['term'][:50]}</td>
-            <td>{cs}{term['cost']:.2f}</td>
-            <td>{term['clicks']}</td>
-            <td>{term['campaign'][:30]}</td>
-        </tr>'''
-
-    # Top non-brand keywords HTML with ROAS color-coding
-    nonbrand_kw_html = ''
-    for kw in insights.get('top_nonbrand_kw', []):
-        roas_val = kw['roas']
-        roas_color = '#28a745' if roas_val >= target_roas else '#ffc107' if roas_val >= target_roas * 0.7 else '#dc3545'
-        nonbrand_kw_html += f'''<tr>
-            <td>{kw['keyword'][:40]}</td>
-            <td>{kw['conversions']:.0f}</td>
-            <td>{cs}{kw['cost']:.0f}</td>
-            <td style="color:{roas_color};font-weight:bold">{kw['roas']:.1f}x</td>
-        </tr>'''
-
-    # Top products HTML with period comparison and images
-    products_html = ''
-    for prod in insights.get('top_products', []):
-        roas_val = prod['roas']
-        roas_color = '#28a745' if roas_val >= target_roas else '#ffc107' if roas_val >= target_roas * 0.7 else '#dc3545'
-        cost_delta = format_delta(prod['cost_change']) if prod['cost_change'] is not None else '-'
-        conv_delta = format_delta(prod['conv_change']) if prod['conv_change'] is not None else '-'
-        image_html = f'<img src="{prod.get("image_url", "")}" style="width:50px;height:50px;object-fit:cover;border-radius:4px;margin-right:10px;vertical-align:middle;">' if prod.get('image_url') else ''
-        products_html += f'''<tr>
-            <td>{image_html}{prod['title']}</td>
-            <td>{cs}{prod['cost']:.0f} {cost_delta}</td>
-            <td>{prod['conversions']:.0f} {conv_delta}</td>
-            <td style="color:{roas_color};font-weight:bold">{prod['roas']:.1f}x</td>
-        </tr>'''
-
-    # LOW and BEST assets HTML
-    low_assets_html = ''
-    for asset in insights.get('low_assets_list', [])[:5]:
-        low_assets_html += f'''<tr>
-            <td style="color:#dc3545;">{asset['text']}</td>
-            <td>{asset['campaign']}</td>
-        </tr>'''
-
-    best_assets_html = ''
-    for asset in insights.get('best_assets_list', [])[:5]:
-        best_assets_html += f'''<tr>
-            <td style="color:#28a745;">{asset['text']}</td>
-            <td>{asset['campaign']}</td>
-        </tr>'''
+        return safe(f'<span style="color:{color};font-weight:bold">{arrow} {abs(value):.1f}{suffix}</span>')
+
+    def roas_color(roas_val):
+        return '#28a745' if roas_val >= target_roas else '#ffc107' if roas_val >= target_roas * 0.7 else '#dc3545'
+
+    pacing_labels = {
+        'budget_limited': ('Budget limited', '#dc3545'),
+        'underspending': ('Underspending', '#ffc107'),
+        'on_track': ('On track', '#28a745'),
+        'no_budget': ('No budget', '#666'),
+    }
 
     # Generate automated insights
     def generate_insights():
@@ -971,7 +1703,21 @@ def generate_html_report(audit_dir, account_name, account_config, days, insights
 
         # Conversion Tracking insight
         conv_action_count = insights.get('conv_action_count', 0)
-        if conv_action_count == 1:
+        stopped = [a for a in insights.get('conversion_tracking', []) if a['status'] == 'stopped']
+        zero_lately = [a for a in insights.get('conversion_tracking', []) if a['status'] == 'provisional']
+        recent_drops = [a for a in insights.get('conversion_anomalies', [])
+                        if a['recent'] and a['type'] == 'drop' and not a['provisional']]
+        lag_days = insights.get('conversion_lag_days', 0)
+        if stopped:
+            names = ', '.join(a['action'] for a in stopped[:3]) + (f" and {len(stopped) - 3} more" if len(stopped) > 3 else '')
+            ins['tracking'] = f"{len(stopped)} conversion action(s) dropped to zero: {names}. Check these tags are still firing."
+        elif recent_drops:
+            drop = recent_drops[0]
+            ins['tracking'] = f"{len(recent_drops)} unusual drop(s) in the last {lag_days + 7} days, e.g. {drop['action']} recorded {drop['conversions']:.0f} on {drop['date']} against a usual {drop['baseline']:.0f}/day."
+        elif zero_lately:
+            action = zero_lately[0]
+            ins['tracking'] = f"{len(zero_lately)} conversion action(s) recorded nothing lately, e.g. {action['action']} for {action['zero_days']} days. The last {lag_days} days are still receiving late conversions, so check again if they stay at zero."
+        elif conv_action_count == 1:
             ins['tracking'] = "Only 1 conversion action active. Consider if additional conversion types should be tracked."
         elif conv_action_count > 5:
             ins['tracking'] = f"{conv_action_count} conversion actions recording. Review for any that have dropped to zero recently."
@@ -987,6 +1733,13 @@ def generate_html_report(audit_dir, account_name, account_config, days, insights
         else:
             ins['wasted'] = f"Low waste at {zero_conv_pct:.1f}%. Search term coverage is efficient."
 
+        # N-gram waste insight
+        ngrams = insights.get('wasted_ngrams', [])
+        if ngrams:
+            top_ngram = ngrams[0]
+            ngram_cost = sum(n['cost'] for n in ngrams)
+            ins['ngrams'] = f"\"{top_ngram['ngram']}\" appears in {top_ngram['terms']} search terms that spent {cs}{top_ngram['cost']:,.0f} without converting. The top {len(ngrams)} n-grams below cover {cs}{ngram_cost:,.0f}; overlapping terms are counted once per n-gram."
+
         # Products insight
         top_products = insights.get('top_products', [])
         if top_products:
@@ -998,6 +1751,15 @@ def generate_html_report(audit_dir, account_name, account_config, days, insights
             else:
                 ins['products'] = f"{above_target} of 5 top products meeting {target_roas}x ROAS target."
 
+        # Period-over-period insight
+        keyword_changes = insights.get('period_comparison', {}).get('keywords')
+        if keyword_changes:
+            new, lost = keyword_changes['statuses']['new'], keyword_changes['statuses']['lost']
+            if lost['previous'] > new['current']:
+                ins['changes'] = f"{lost['count']} keywords that spent {cs}{lost['previous']:,.0f} last period have stopped serving, more than the {cs}{new['current']:,.0f} on {new['count']} new keywords. Check for paused or limited keywords."
+            else:
+                ins['changes'] = f"{new['count']} new keywords spent {cs}{new['current']:,.0f}; {lost['count']} keywords stopped serving."
+
         # Campaign insight
         current_roas = insights.get('roas', 0)
         if current_roas >= target_roas:
@@ -1019,6 +1781,17 @@ def generate_html_report(audit_dir, account_name, account_config, days, insights
             else:
                 ins['keywords'] = f"{above_target} of {len(nonbrand_kw)} top non-brand keywords meeting {target_roas}x target."
 
+        # Brand vs non-brand insight
+        brand_campaigns = insights.get('brand_split', {}).get('campaigns')
+        if brand_campaigns:
+            brand, non_brand = brand_campaigns['brand'], brand_campaigns['non_brand']
+            if brand['cost_share'] > 50:
+                ins['brand'] = f"Brand campaigns take {brand['cost_share']:.0f}% of spend. Growth depends on scaling non-brand ({non_brand['roas']:.1f}x ROAS)."
+            elif brand['roas'] > 0 and non_brand['roas'] < target_roas:
+                ins['brand'] = f"Brand returns {brand['roas']:.1f}x while non-brand returns {non_brand['roas']:.1f}x, below the {target_roas}x target. Account ROAS leans on brand demand."
+            else:
+                ins['brand'] = f"Non-brand campaigns take {non_brand['cost_share']:.0f}% of spend at {non_brand['roas']:.1f}x ROAS (brand {brand['roas']:.1f}x)."
+
         # Asset performance insight
         assets_best = insights.get('assets_best', 0)
         assets_good = insights.get('assets_good', 0)
@@ -1034,336 +1807,50 @@ def generate_html_report(audit_dir, account_name, account_config, days, insights
 
     auto_insights = generate_insights()
 
-    html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>Account Audit - {account_name}</title>
-    <link rel="preconnect" href="https://fonts.googleapis.com">
-    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Oxanium:wght@400;500;600;700&display=swap" rel="stylesheet">
-    <style>
-        body {{
-            font-family: 'Oxanium', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            max-width: 1000px;
-            margin: 0 auto;
-            padding: 20px;
-            color: #333;
-            background: #f5f5f5;
-        }}
-        .header {{
-            background: white;
-            padding: 20px 30px;
-            border-radius: 2px;
-            margin-bottom: 20px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-        }}
-        .header img {{ max-height: 40px; max-width: 120px; }}
-        .header h1 {{ color: {primary_color}; margin: 0; }}
-        .container {{ background: white; padding: 30px; border-radius: 2px; margin-bottom: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-        h2 {{ color: #333; border-bottom: 3px solid {primary_color}; padding-bottom: 10px; margin-top: 0; }}
-        .period-info {{ background: #f8f9fa; padding: 10px 15px; border-radius: 2px; font-size: 13px; margin-bottom: 15px; }}
-        .summary-grid {{
-            display: grid;
-            grid-template-columns: repeat(4, 1fr);
-            gap: 15px;
-            margin: 20px 0;
-        }}
-        .summary-card {{
-            background: #f8f9fa;
-            padding: 15px;
-            border-radius: 2px;
-            text-align: center;
-        }}
-        .summary-card label {{ display: block; color: #5f6368; font-size: 11px; text-transform: uppercase; }}
-        .summary-card .value {{ font-size: 24px; font-weight: bold; color: {primary_color}; margin: 5px 0; }}
-        .summary-card .delta {{ font-size: 12px; }}
-        .alert {{
-            padding: 15px;
-            margin: 10px 0;
-            border-radius: 2px;
-            border-left: 4px solid;
-        }}
-        .alert-warning {{ background: #fff3cd; border-color: #ffc107; }}
-        .alert-info {{ background: #d1ecf1; border-color: #17a2b8; }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 15px 0;
-        }}
-        th, td {{
-            padding: 10px;
-            text-align: left;
-            border-bottom: 1px solid #ddd;
-        }}
-        th {{ background: #f8f9fa; font-weight: 600; }}
-        img.chart {{ max-width: 100%; width: 800px; border-radius: 2px; margin: 10px 0; }}
-        .forecast-grid {{
-            display: grid;
-            grid-template-columns: repeat(2, 1fr);
-            gap: 15px;
-        }}
-        .forecast-card {{
-            background: #f8f9fa;
-            padding: 15px;
-            border-radius: 2px;
-            border-left: 4px solid {primary_color};
-        }}
-        .forecast-card h4 {{ margin: 0 0 10px 0; color: {primary_color}; }}
-        .cpc-highlight {{
-            font-size: 18px;
-            font-weight: bold;
-            color: #dc3545;
-        }}
-        .footer {{
-            text-align: center;
-            padding: 20px;
-            color: #666;
-            font-size: 12px;
-        }}
-        .footer a {{ color: {primary_color}; }}
-        .insight {{
-            background: #e8f4f8;
-            padding: 12px 15px;
-            border-radius: 2px;
-            border-left: 4px solid {primary_color};
-            margin: 15px 0;
-            font-size: 14px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <div>
-            <h1>Account Audit - {account_name}</h1>
-            <p style="margin:5px 0 0 0;color:#666;">Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
-            <p style="margin:3px 0 0 0;color:#666;font-size:12px;">
-                <strong>Current:</strong> {insights.get('current_period', 'N/A')} ({days} days) |
-                <strong>Previous:</strong> {insights.get('previous_period', 'N/A')}
-            </p>
-        </div>
-        {f'<img src="{logo_url}" alt="Logo">' if logo_url else ''}
-    </div>
-
-    <div class="container">
-        <h2>Performance Summary</h2>
-        <div class="insight">{auto_insights.get('performance', '')}</div>
-        <table>
-            <tr>
-                <th>Metric</th>
-                <th>Spend</th>
-                <th>Conversions</th>
-                <th>Value</th>
-                <th>ROAS</th>
-                <th>Clicks</th>
-                <th>Impressions</th>
-                <th>CTR</th>
-                <th>CPA</th>
-            </tr>
-            <tr>
-                <td><strong>Current</strong></td>
-                <td>{cs}{insights.get('total_cost', 0):,.0f}</td>
-                <td>{insights.get('total_conversions', 0):,.0f}</td>
-                <td>{cs}{insights.get('total_value', 0):,.0f}</td>
-                <td>{insights.get('roas', 0):.1f}x</td>
-                <td>{insights.get('total_clicks', 0):,}</td>
-                <td>{insights.get('total_impressions', 0):,}</td>
-                <td>{insights.get('ctr', 0):.2f}%</td>
-                <td>{cs}{insights.get('cpa', 0):.2f}</td>
-            </tr>
-            <tr>
-                <td><strong>Change</strong></td>
-                <td>{format_delta(insights.get('cost_delta'))}</td>
-                <td>{format_delta(insights.get('conv_delta'))}</td>
-                <td>{format_delta(insights.get('value_delta'))}</td>
-                <td>{format_delta(insights.get('roas_delta'))}</td>
-                <td>{format_delta(insights.get('clicks_delta'))}</td>
-                <td>{format_delta(insights.get('impressions_delta'))}</td>
-                <td>{format_delta(insights.get('ctr_delta'))}</td>
-                <td>{format_delta(insights.get('cpa_delta'), invert=True)}</td>
-            </tr>
-        </table>
-        {'<img class="chart" src="data:image/png;base64,' + charts_html.get('period-comparison', '') + '">' if 'period-comparison' in charts_html else ''}
-    </div>
-
-    <div class="container">
-        <h2>Budget Pacing & Forecast</h2>
-        <div class="insight">{auto_insights.get('budget', '')}</div>
-        <div class="forecast-grid">
-            <div class="forecast-card">
-                <h4>Next 30 Days Projection</h4>
-                <p><strong>Spend:</strong> {cs}{insights.get('forecast_30d_cost', 0):,.0f}</p>
-                <p><strong>Conversions:</strong> {insights.get('forecast_30d_conv', 0):,.0f}</p>
-                <p><strong>Value:</strong> {cs}{insights.get('forecast_30d_value', 0):,.0f}</p>
-            </div>
-            <div class="forecast-card">
-                <h4>Rest of Month ({insights.get('days_remaining', 0)} days)</h4>
-                <p><strong>Spend:</strong> {cs}{insights.get('forecast_month_cost', 0):,.0f}</p>
-                <p><strong>Conversions:</strong> {insights.get('forecast_month_conv', 0):,.0f}</p>
-                <p><strong>Value:</strong> {cs}{insights.get('forecast_month_value', 0):,.0f}</p>
-            </div>
-        </div>
-        {'<img class="chart" src="data:image/png;base64,' + charts_html.get('forecast', '') + '">' if 'forecast' in charts_html else ''}
-    </div>
-
-    <div class="container">
-        <h2>Bid Management Insights</h2>
-        <div class="insight">{auto_insights.get('cpc', '')}</div>
-        <h3>Highest CPC Analysis</h3>
-        <table>
-            <tr>
-                <th>Period</th>
-                <th>Highest CPC Keyword</th>
-                <th>Highest CPC Search Term</th>
-            </tr>
-            <tr>
-                <td><strong>Last 7 Days</strong></td>
-                <td>
-                    <span class="cpc-highlight">{cs}{insights.get('highest_cpc_kw_7d_value', 0):.2f}</span><br>
-                    <small>{str(insights.get('highest_cpc_kw_7d', 'N/A'))[:40]}</small><br>
-                    <small style="color:#666">Campaign: {str(insights.get('highest_cpc_kw_7d_campaign', 'N/A'))[:30]}</small>
-                </td>
-                <td>
-                    <span class="cpc-highlight">{cs}{insights.get('highest_cpc_st_7d_value', 0):.2f}</span><br>
-                    <small>{str(insights.get('highest_cpc_st_7d', 'N/A'))[:40]}</small><br>
-                    <small style="color:#666">Campaign: {str(insights.get('highest_cpc_st_7d_campaign', 'N/A'))[:30]}</small>
-                </td>
-            </tr>
-            <tr>
-                <td><strong>Last 30 Days</strong></td>
-                <td>
-                    <span class="cpc-highlight">{cs}{insights.get('highest_cpc_kw_30d_value', 0):.2f}</span><br>
-                    <small>{str(insights.get('highest_cpc_kw_30d', 'N/A'))[:40]}</small><br>
-                    <small style="color:#666">Campaign: {str(insights.get('highest_cpc_kw_30d_campaign', 'N/A'))[:30]}</small>
-                </td>
-                <td>
-                    <span class="cpc-highlight">{cs}{insights.get('highest_cpc_st_30d_value', 0):.2f}</span><br>
-                    <small>{str(insights.get('highest_cpc_st_30d', 'N/A'))[:40]}</small><br>
-                    <small style="color:#666">Campaign: {str(insights.get('highest_cpc_st_30d_campaign', 'N/A'))[:30]}</small>
-                </td>
-            </tr>
-        </table>
-    </div>
-
-    <div class="container">
-        <h2>Conversion Tracking Health</h2>
-        <div class="insight">{auto_insights.get('tracking', '')}</div>
-        {'<img class="chart" src="data:image/png;base64,' + charts_html.get('conversion-actions', '') + '">' if 'conversion-actions' in charts_html else '<p>Chart not available</p>'}
-        <p><small>Look for lines that suddenly drop to zero - this indicates broken conversion tracking.</small></p>
-    </div>
-
-    <div class="container">
-        <h2>Zero-Conversion Search Terms</h2>
-        <div class="insight">{auto_insights.get('wasted', '')}</div>
-        <div class="alert alert-warning">
-            <strong>{insights.get('zero_conv_terms', 0):,} search terms</strong> with {cs}{insights.get('zero_conv_cost', 0):,.0f} spend and zero conversions
-            ({insights.get('zero_conv_pct', 0):.1f}% of total spend).
-        </div>
-        <h4>Top 5 by Spend</h4>
-        <table>
-            <tr><th>Search Term</th><th>Cost</th><th>Clicks</th><th>Campaign</th></tr>
-            {zero_conv_html}
-        </table>
-    </div>
-
-    <div class="container">
-        <h2>Daily Performance Trend</h2>
-        {'<img class="chart" src="data:image/png;base64,' + charts_html.get('daily-conversions', '') + '">' if 'daily-conversions' in charts_html else '<p>Chart not available</p>'}
-    </div>
-
-    <div class="container">
-        <h2>Campaign Performance</h2>
-        <div class="insight">{auto_insights.get('campaigns', '')}</div>
-        <p><small>Target ROAS: {target_roas}x (green ≥ target, yellow ≥ 70% target, red &lt; 70% target)</small></p>
-        {'<img class="chart" src="data:image/png;base64,' + charts_html.get('campaign-spend', '') + '">' if 'campaign-spend' in charts_html else ''}
-        {'<img class="chart" src="data:image/png;base64,' + charts_html.get('roas-by-campaign', '') + '">' if 'roas-by-campaign' in charts_html else ''}
-    </div>
-
-    <div class="container">
-        <h2>Top Products</h2>
-        <div class="insight">{auto_insights.get('products', '')}</div>
-        <p><small>Top 5 products by spend with period comparison</small></p>
-        <table>
-            <tr><th>Product</th><th>Cost</th><th>Conversions</th><th>ROAS</th></tr>
-            {products_html if products_html else '<tr><td colspan="4">No product data available</td></tr>'}
-        </table>
-    </div>
-
-    <div class="container">
-        <h2>Top Non-Brand Keywords</h2>
-        <div class="insight">{auto_insights.get('keywords', '')}</div>
-        <p><small>Sorted by cost descending, excluding keywords containing brand terms</small></p>
-        <table>
-            <tr><th>Keyword</th><th>Conversions</th><th>Cost</th><th>ROAS</th></tr>
-            {nonbrand_kw_html}
-        </table>
-    </div>
-
-    <div class="container">
-        <h2>Asset Performance</h2>
-        <div class="insight">{auto_insights.get('assets', '')}</div>
-        <div class="summary-grid" style="grid-template-columns: repeat(3, 1fr);">
-            <div class="summary-card" style="background: #d4edda;">
-                <label>Best Performing</label>
-                <div class="value" style="color: #5cb85c;">{insights.get('assets_best', 0)}</div>
-            </div>
-            <div class="summary-card" style="background: #fcf8e3;">
-                <label>Good Performing</label>
-                <div class="value" style="color: #f0ad4e;">{insights.get('assets_good', 0)}</div>
-            </div>
-            <div class="summary-card" style="background: #f8d7da;">
-                <label>Low Performing</label>
-                <div class="value" style="color: #d9534f;">{insights.get('assets_low', 0)}</div>
-            </div>
-        </div>
-
-        <h4 style="color:#dc3545;margin-top:20px;">LOW Performers - Replace These</h4>
-        <table>
-            <tr><th>Asset Text</th><th>Campaign</th></tr>
-            {low_assets_html if low_assets_html else '<tr><td colspan="2">No LOW performing assets</td></tr>'}
-        </table>
-
-        <h4 style="color:#28a745;margin-top:20px;">BEST Performers - Replicate These</h4>
-        <table>
-            <tr><th>Asset Text</th><th>Campaign</th></tr>
-            {best_assets_html if best_assets_html else '<tr><td colspan="2">No BEST performing assets yet</td></tr>'}
-        </table>
-    </div>
-
-    <div class="footer">
-        This report was generated by <strong>Mike Rhodes</strong>, 8020 Brain.<br>
-        For more details, visit <a href="https://adstoai.com">adstoai.com</a>
-    </div>
-
-</body>
-</html>
-"""
-
-    with open(audit_dir / 'report.html', 'w') as f:
-        f.write(html)
+    with profile_stage(metrics, 'report', 'report.html') as stage:
+        write_report(audit_dir / 'report.html', 'report.html.j2', {
+            'account_name': account_name,
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M'),
+            'days': days,
+            'cs': cs,
+            'primary_color': primary_color,
+            'logo_url': logo_url,
+            'target_roas': target_roas,
+            'insights': insights,
+            'auto_insights': auto_insights,
+            'charts_html': charts_html,
+            'format_delta': format_delta,
+            'roas_color': roas_color,
+            'pacing': [c for c in insights.get('campaign_pacing', []) if c['forecast_30d_cost'] > 0],
+            'pacing_labels': pacing_labels,
+            'pacing_limited_pct': PACING_LIMITED_PCT,
+            'pacing_underspend_pct': PACING_UNDERSPEND_PCT,
+            'full_tables': full_tables or [],
+            'data_tables': data_tables or [],
+        })
+        stage['bytes'] = (audit_dir / 'report.html').stat().st_size
 
     # Generate PDF using headless Chrome
-    try:
-        pdf_path = audit_dir / 'report.pdf'
-        html_path = audit_dir / 'report.html'
-        chrome_path = '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'
-        cmd = [
-            chrome_path,
-            '--headless',
-            '--disable-gpu',
-            '--no-pdf-header-footer',
-            f'--print-to-pdf={pdf_path}',
-            f'file://{html_path}'
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode == 0 or pdf_path.exists():
-            print(f"  - report.pdf")
-        else:
-            print(f"  - report.pdf (failed)")
-    except Exception as e:
-        print(f"  - report.pdf (failed: {e})")
+    with profile_stage(metrics, 'report', 'report.pdf'):
+        try:
+            pdf_path = audit_dir / 'report.pdf'
+            html_path = audit_dir / 'report.html'
+            chrome_path = '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'
+            cmd = [
+                chrome_path,
+                '--headless',
+                '--disable-gpu',
+                '--no-pdf-header-footer',
+                f'--print-to-pdf={pdf_path}',
+                f'file://{html_path}'
+            ]
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            if result.returncode == 0 or pdf_path.exists():
+                print(f"  - report.pdf")
+            else:
+                print(f"  - report.pdf (failed)")
+        except Exception as e:
+            print(f"  - report.pdf (failed: {e})")
 
     return audit_dir / 'report.html'
 
@@ -1434,7 +1921,17 @@ def generate_json_output(audit_dir, account_name, account_config, days, insights
             "projected_30d_spend": insights.get('forecast_30d_cost', 0),
             "projected_month_end_spend": insights.get('forecast_month_cost', 0),
             "daily_average": insights.get('daily_avg_cost', 0),
-            "budget_limited_campaigns": []  # TODO: Parse from budgets.csv
+            "budget_limited_campaigns": [
+                {
+                    "campaign": campaign['campaign'],
+                    "daily_budget": campaign['daily_budget'],
+                    "forecast_daily_spend": campaign['forecast_daily_spend'],
+                    "budget_used_pct": campaign['budget_used_pct']
+                }
+                for campaign in insights.get('campaign_pacing', [])
+                if campaign['status'] == 'budget_limited'
+            ],
+            "campaigns": insights.get('campaign_pacing', [])
         },
         "bid_management": {
             "highest_cpc_keywords_7d": [
@@ -1483,6 +1980,8 @@ def generate_json_output(audit_dir, account_name, account_config, days, insights
             ],
             "zero_conversion": []
         },
+        "brand_split": insights.get('brand_split', {}),
+        "period_comparison": insights.get('period_comparison', {}),
         "search_terms": {
             "wasted_spend": [
                 {
@@ -1496,17 +1995,28 @@ def generate_json_output(audit_dir, account_name, account_config, days, insights
                 for term in insights.get('top5_zero_conv', [])
             ],
             "total_wasted": insights.get('zero_conv_cost', 0),
-            "opportunities": []
+            "opportunities": [
+                {
+                    "ngram": ngram.get('ngram', ''),
+                    "words": ngram.get('words', 0),
+                    "search_terms": ngram.get('terms', 0),
+                    "spend": ngram.get('cost', 0),
+                    "clicks": ngram.get('clicks', 0),
+                    "conversions": 0,
+                    "action": "add as phrase negative"
+                }
+                for ngram in insights.get('wasted_ngrams', [])
+            ]
         },
         "conversion_tracking": {
-            "actions": [],  # TODO: Parse from conv-actions-daily.csv
+            "actions": insights.get('conversion_tracking', []),
             "total_actions": insights.get('conv_action_count', 0),
-            "healthy": insights.get('conv_action_count', 0),
-            "warnings": 0
+            "healthy": sum(1 for action in insights.get('conversion_tracking', []) if action['status'] == 'healthy'),
+            "warnings": sum(1 for action in insights.get('conversion_tracking', []) if action['status'] != 'healthy')
         },
         "daily_trends": {
             "data": [],  # TODO: Parse from daily-conv.csv
-            "anomalies": []
+            "anomalies": insights.get('conversion_anomalies', [])
         },
         "asset_performance": {
             "summary": {
@@ -1542,39 +2052,85 @@ def generate_json_output(audit_dir, account_name, account_config, days, insights
         }
     }
 
-    # Write JSON file
+    # Write JSON file (NumPy numbers as numbers, so a run using checkpointed insights writes the same file)
     json_path = audit_dir / 'audit-data.json'
     with open(json_path, 'w') as f:
-        json.dump(output, f, indent=2, default=str)
+        json.dump(output, f, indent=2, default=lambda value: value.item() if isinstance(value, np.generic) else str(value))
 
     print(f"  - audit-data.json")
     return json_path
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Run Google Ads account audit')
-    parser.add_argument('--account', required=True, help='Account name or alias from accounts.json')
-    parser.add_argument('--account-name', dest='account_name', help='Folder name in data/google-ads/ (auto-detected if not provided)')
-    parser.add_argument('--days', type=int, default=30, help='Number of days (default: 30)')
-    args = parser.parse_args()
+def make_query_cache(args):
+    """
+    The shared on-disk query cache for this run, or None with --no-cache.
 
-    accounts = load_accounts()
-    account_key, account_config = resolve_account(args.account, accounts)
+    Replay and synthetic results are cached apart from live ones, so they can
+    never be served to a live run. Recording always calls the API.
+    """
+    if args.no_cache:
+        return None
+    cache_dir = QUERY_CACHE_DIR
+    if args.query_backend in ('replay', 'synthetic'):
+        cache_dir = QUERY_CACHE_DIR.with_name(f'queries-{args.query_backend}')
+    return ResultCache(cache_dir, ttl_hours=args.cache_ttl, max_mb=args.cache_max_mb,
+                       read=not args.refresh and args.query_backend != 'record')
+
+
+def gaql_literal_dates():
+    """Dates written literally in the audit's .gaql files (fixed ranges, not audit windows)."""
+    dates = set()
+    for query_name in AUDIT_QUERIES:
+        try:
+            dates.update(DATE_PATTERN.findall(load_gaql(query_name)))
+        except OSError:
+            pass  # the query itself fails and is reported when it runs
+    return dates
 
-    if not account_config:
-        print(f"Error: Account '{args.account}' not found in accounts.json")
-        print(f"Available accounts: {', '.join(accounts.keys())}")
-        sys.exit(1)
 
+def make_query_worker(args):
+    """
+    What run_gaql sends queries to: the persistent node worker (None with
+    --no-query-worker), or an offline backend for --query-backend.
+    """
+    network = SimulatedNetwork(args.simulated_latency, args.failure_rate, args.fail_match)
+    fixed_dates = gaql_literal_dates()
+    if args.query_backend == 'replay':
+        return ReplayBackend(args.fixtures_dir, network, fixed_dates)
+    if args.query_backend == 'synthetic':
+        return SyntheticBackend(args.synthetic_rows, network=network)
+
+    worker = None if args.no_query_worker else QueryWorker(QUERY_SCRIPT)
+    if args.query_backend == 'record':
+        if worker is not None:
+            return RecordingBackend(args.fixtures_dir, worker.run, worker.close, fixed_dates)
+
+        def run_process(customer_id, login_customer_id, query, output_path, timeout=120):
+            account = {'id': customer_id, 'login_customer_id': login_customer_id}
+            return query_reply(query, account, output_path)
+        return RecordingBackend(args.fixtures_dir, run_process, fixed_dates=fixed_dates)
+    return worker
+
+
+def make_chart_cache(args):
+    """The shared on-disk cache of rendered charts, or None with --no-chart-cache."""
+    if args.no_chart_cache:
+        return None
+    return ResultCache(CHART_CACHE_DIR / args.chart_format, ttl_hours=CHART_CACHE_TTL_HOURS, max_mb=CHART_CACHE_MAX_MB,
+                       suffix=f'.{args.chart_format}')
+
+
+def audit_account(account_key, account_config, folder_name, args, evict_cache=True):
+    """
+    Run the full audit for one account: queries, insights, charts, reports.
+
+    Returns a summary dict (spend, conversions, ROAS, deltas, failed queries)
+    used for the portfolio summary.
+    """
+    started = time.monotonic()
     account_name = account_config.get('name', account_key)
     timezone = account_config.get('timezone', 'Australia/Sydney')
 
-    # Determine folder name: explicit --account-name, or auto-detect from aliases
-    if args.account_name:
-        folder_name = args.account_name
-    else:
-        folder_name = find_account_folder(args.account, account_config, DATA_BASE)
-
     print(f"\n{'='*60}")
     print(f"Google Ads Account Audit v1.1")
     print(f"{'='*60}")
@@ -1595,56 +2151,453 @@ def main():
 
     print(f"Output: {audit_dir}\n")
 
-    # Run queries
-    print("Running queries...")
-    for query_name in AUDIT_QUERIES:
-        print(f"  - {query_name}...", end=' ')
-        output_path = data_dir / f"{query_name}.csv"
-
-        success = run_query(query_name, account_config, args.days, output_path)
+    metrics = RunMetrics(account_key, trace_memory=args.profile == 'memory') if args.profile else None
+    manifest = AuditManifest(audit_dir, args.resume, args.only)
+    dataset = AuditDataset(data_dir, args.data_format, args.export_csv, metrics, args.chunk_rows, CHUNKED_QUERIES)
+    if args.resume or args.only:
+        print(f"Stages: {', '.join(group for group in STAGE_GROUPS if manifest.selected(group))}"
+              f"{' (resuming)' if args.resume else ''}\n")
+
+    # Run queries (each query is a stage keyed by its final GAQL)
+    query_inputs = {name: query_fingerprint(name, account_config, args.days) for name in AUDIT_QUERIES}
+    # With --pipeline, insights and charts run as their query results arrive
+    pipeline = None
+    chart_cache = make_chart_cache(args)
+    if args.pipeline and all(manifest.selected(group) for group in ('queries', 'insights', 'charts')):
+        insights = {}
+        pipeline = audit_pipeline(audit_dir, account_name, account_config, args.days, dataset, insights, chart_cache,
+                                  args.chart_format, metrics, manifest)
+        pipeline.arrive()
+    elif args.pipeline:
+        print("--pipeline needs the queries, insights and charts stages; running stages in order\n")
+
+    if manifest.selected('queries'):
+        warehouse = None
+        if args.incremental:
+            # Offline backends keep their own store, so their days never stand in for real ones
+            store = 'warehouse' if args.query_backend in ('live', 'record') else f'warehouse-{args.query_backend}'
+            warehouse = DailyWarehouse(account_folder / store, args.data_format, args.conversion_lag_days)
+        skip = {name: manifest.entry(f'queries/{name}').get('rows') for name in AUDIT_QUERIES
+                if not manifest.should_run(f'queries/{name}', query_inputs[name], dataset.path(name))}
+
+        print(f"Running queries (up to {args.max_parallel_queries} at once)"
+              f"{', with insights and charts as results arrive' if pipeline is not None else ''}...")
+        queries_started = time.monotonic()
+        worker = None if len(skip) == len(AUDIT_QUERIES) else make_query_worker(args)
+        cache = make_query_cache(args)
+        try:
+            on_result = (lambda query_name, result: pipeline.arrive(query_name)) if pipeline is not None else None
+            query_results = run_queries(account_config, args.days, dataset, args.max_parallel_queries,
+                                        worker, cache, args.derive_windows, warehouse, metrics, skip, on_result)
+        finally:
+            if worker is not None:
+                worker.close()
+            if cache is not None and evict_cache:
+                cache.evict()
+
+        for name, result in query_results.items():
+            if result.get('resumed'):
+                continue
+            if result['status'] == 'ok':
+                manifest.record(f'queries/{name}', 'done', query_inputs[name], file_digest(dataset.path(name)),
+                                rows=result['rows'])
+            else:
+                manifest.record(f'queries/{name}', 'failed', query_inputs[name])
 
-        if success:
-            try:
-                df = pd.read_csv(output_path, low_memory=False)
-                if query_name not in ['budgets', 'campaigns-prev']:
-                    df = filter_zero_impressions(df)
-                    df.to_csv(output_path, index=False)
-                print(f"{len(df)} rows")
-            except:
-                print("done")
-        else:
-            print("failed")
+        failed = [name for name, result in query_results.items() if result['status'] == 'failed']
+        cached = sum(1 for result in query_results.values() if result['cached'])
+        print(f"  {len(query_results) - len(failed)}/{len(query_results)} queries completed "
+              f"in {time.monotonic() - queries_started:.1f}s ({cached} from cache, {len(skip)} resumed)")
+    else:
+        failed = [name for name in AUDIT_QUERIES if manifest.output(f'queries/{name}') is None]
+        print(f"Using query results from the previous run ({len(AUDIT_QUERIES) - len(failed)}/{len(AUDIT_QUERIES)} available)")
+    if failed:
+        print(f"  Failed: {', '.join(failed)}")
+    query_digests = {name: manifest.output(f'queries/{name}') for name in AUDIT_QUERIES}
 
     # Calculate insights first (needed for charts)
-    print("\nCalculating insights...")
-    insights = calculate_insights(audit_dir, account_config, args.days)
+    insights_inputs = fingerprint(args.days, account_config, query_digests, args.chunk_rows)
+    if pipeline is not None:
+        if pipeline.pending():
+            print(f"  Not run (missing inputs): {', '.join(pipeline.pending())}")
+        manifest.record('insights', 'done', insights_inputs, manifest.save_insights(insights))
+    elif manifest.should_run('insights', insights_inputs, audit_dir / INSIGHTS_CHECKPOINT):
+        print("\nCalculating insights...")
+        with profile_stage(metrics, 'insights', 'calculate_insights'):
+            insights = calculate_insights(dataset, account_config, args.days)
+        manifest.record('insights', 'done', insights_inputs, manifest.save_insights(insights))
+    elif not any(manifest.selected(group) for group in ('insights', 'charts', 'report')):
+        insights = None  # --only queries: nothing after the queries runs, so no insights are needed
+    else:
+        insights = manifest.load_insights()
+        print("\nUsing insights from the previous run")
 
     # Generate charts
-    print("\nGenerating charts...")
-    generate_charts(audit_dir, account_name, account_config, insights)
+    if manifest.selected('charts') and pipeline is None:
+        print("\nGenerating charts...")
+        with profile_stage(metrics, 'charts', 'generate_charts', parent=True):
+            generate_charts(audit_dir, account_name, account_config, insights, dataset, args.chart_workers,
+                            chart_cache, args.chart_format, metrics, manifest)
+    if chart_cache is not None and evict_cache and manifest.selected('charts'):
+        chart_cache.evict()
 
     # Generate report
-    print("\nGenerating report...")
-    html_path = generate_html_report(audit_dir, account_name, account_config, args.days, insights)
-    print(f"  - report.html")
+    html_path = audit_dir / 'report.html'
+    chart_files = sorted((audit_dir / 'charts').glob(f'*.{args.chart_format}'))
+    report_inputs = fingerprint(manifest.output('insights'), {path.name: file_digest(path) for path in chart_files},
+                                args.chart_format, args.chart_embed, args.full_tables, args.data_tables,
+                                query_digests if args.full_tables or args.data_tables else None)
+    if manifest.should_run('report/report.html', report_inputs, html_path):
+        print("\nGenerating report...")
+        full_tables = full_report_tables(dataset, insights) if args.full_tables else None
+        data_tables = report_data_tables(dataset, insights) if args.data_tables else None
+        html_path = generate_html_report(audit_dir, account_name, account_config, args.days, insights,
+                                         args.chart_format, args.chart_embed, full_tables, data_tables, metrics)
+        manifest.record('report/report.html', 'done', report_inputs, file_digest(html_path))
+        print(f"  - report.html")
+    elif manifest.selected('report'):
+        print("\nReport unchanged")
 
     # Generate JSON for slides
-    json_path = generate_json_output(audit_dir, account_name, account_config, args.days, insights)
+    json_path = audit_dir / 'audit-data.json'
+    json_inputs = fingerprint(manifest.output('insights'))
+    if manifest.should_run('report/audit-data.json', json_inputs, json_path):
+        with profile_stage(metrics, 'report', 'audit-data.json'):
+            json_path = generate_json_output(audit_dir, account_name, account_config, args.days, insights)
+        manifest.record('report/audit-data.json', 'done', json_inputs, file_digest(json_path))
 
-    # Summary
-    cs = insights.get('currency_symbol', '$')
+    # Summary (not with --only queries, which has no insights to summarize)
     print(f"\n{'='*60}")
     print("Audit Complete!")
     print(f"{'='*60}")
-    print(f"\nSummary:")
-    print(f"  Spend: {cs}{insights.get('total_cost', 0):,.2f}")
-    print(f"  Conversions: {insights.get('total_conversions', 0):,.0f}")
-    print(f"  ROAS: {insights.get('roas', 0):.1f}x")
-    if 'cost_delta' in insights:
-        print(f"  vs Previous: Cost {insights['cost_delta']:+.1f}%, Conv {insights.get('conv_delta', 0):+.1f}%")
+    if insights is not None:
+        cs = insights.get('currency_symbol', '$')
+        print(f"\nSummary:")
+        print(f"  Spend: {cs}{insights.get('total_cost', 0):,.2f}")
+        print(f"  Conversions: {insights.get('total_conversions', 0):,.0f}")
+        print(f"  ROAS: {insights.get('roas', 0):.1f}x")
+        if 'cost_delta' in insights:
+            print(f"  vs Previous: Cost {insights['cost_delta']:+.1f}%, Conv {insights.get('conv_delta', 0):+.1f}%")
+    else:
+        insights, cs = {}, '$'
+    if metrics is not None:
+        metrics.write(audit_dir / 'run-metrics.json', days=args.days, failed_queries=failed,
+                      options={key: value for key, value in vars(args).items() if key not in ('account', 'accounts')})
+        metrics.print_summary()
+        print(f"  Details: {audit_dir / 'run-metrics.json'}")
     print(f"\nFiles: {audit_dir}")
-    print(f"\nOpen report: file://{html_path}\n")
+    if html_path.exists():
+        print(f"\nOpen report: file://{html_path}\n")
+
+    def number(key):
+        return float(insights[key]) if key in insights else None
+
+    return {
+        'account': account_key,
+        'name': account_name,
+        'folder': folder_name,
+        'status': 'ok',
+        'currency_symbol': cs,
+        'spend': number('total_cost'),
+        'conversions': number('total_conversions'),
+        'value': number('total_value'),
+        'roas': number('roas'),
+        'cost_delta': number('cost_delta'),
+        'conv_delta': number('conv_delta'),
+        'roas_delta': number('roas_delta'),
+        'failed_queries': failed,
+        'error': None,
+        'audit_dir': str(audit_dir),
+        'seconds': round(time.monotonic() - started, 1),
+    }
+
+
+def audit_portfolio_account(account_key, account_config, folder_name, args):
+    """
+    Process pool entry point for one portfolio account. The audit's console
+    output goes to audit.log in its audit folder; errors become a failed summary.
+    """
+    started = time.monotonic()
+    audit_dir = DATA_BASE / folder_name / f"{datetime.now().strftime('%Y%m%d')}-audit"
+    audit_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(audit_dir / 'audit.log', 'w') as log, contextlib.redirect_stdout(log):
+        try:
+            return audit_account(account_key, account_config, folder_name, args, evict_cache=False)
+        except Exception as e:
+            traceback.print_exc(file=log)
+            return {
+                'account': account_key,
+                'name': account_config.get('name', account_key),
+                'folder': folder_name,
+                'status': 'failed',
+                'failed_queries': [],
+                'error': str(e) or type(e).__name__,
+                'audit_dir': str(audit_dir),
+                'seconds': round(time.monotonic() - started, 1),
+            }
+
+
+def write_portfolio_summary(summaries, days):
+    """
+    Write the portfolio summary to data/google-ads/audits/{date}-portfolio.json
+    (plus a .csv with one row per account). Returns the JSON path.
+    """
+    audits_dir = DATA_BASE / 'audits'
+    audits_dir.mkdir(parents=True, exist_ok=True)
+    base_path = audits_dir / f"{datetime.now().strftime('%Y%m%d')}-portfolio"
+
+    # Accounts can bill in different currencies, so totals are per currency
+    totals = {}
+    for summary in summaries:
+        if summary['status'] != 'ok':
+            continue
+        total = totals.setdefault(summary['currency_symbol'], {'accounts': 0, 'spend': 0.0, 'value': 0.0,
+                                                               'conversions': 0.0})
+        total['accounts'] += 1
+        total['spend'] += summary['spend'] or 0
+        total['value'] += summary['value'] or 0
+        total['conversions'] += summary['conversions'] or 0
+    for total in totals.values():
+        total['roas'] = total['value'] / total['spend'] if total['spend'] > 0 else 0
+
+    output = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'days': days,
+        'accounts': summaries,
+        'totals': totals,
+        'failed': [summary['account'] for summary in summaries if summary['status'] != 'ok'],
+    }
+    json_path = base_path.with_suffix('.json')
+    with open(json_path, 'w') as f:
+        json.dump(output, f, indent=2)
+
+    table = pd.DataFrame(summaries)
+    table['failed_queries'] = table['failed_queries'].map(lambda names: ','.join(names or []))
+    table.to_csv(base_path.with_suffix('.csv'), index=False)
+    return json_path
+
+
+def run_portfolio(targets, args):
+    """
+    Audit several accounts in a process pool (one full audit per process at a
+    time), then write and print the portfolio summary.
+
+    targets: [(account_key, account_config, folder_name), ...]
+    """
+    print(f"\n{'='*60}")
+    print(f"Google Ads Portfolio Audit v1.1")
+    print(f"{'='*60}")
+    print(f"Accounts: {len(targets)} (up to {args.max_parallel_accounts} at once)")
+    print(f"Period: {args.days} days")
+    print(f"{'='*60}\n")
+
+    # Share the CPUs between concurrent audits rather than one chart pool per CPU each
+    if args.chart_workers is None:
+        args.chart_workers = max(1, (os.cpu_count() or 1) // args.max_parallel_accounts)
+
+    started = time.monotonic()
+    results = {}
+    with ProcessPoolExecutor(max_workers=args.max_parallel_accounts) as pool:
+        futures = {
+            pool.submit(audit_portfolio_account, account_key, account_config, folder_name, args): account_key
+            for account_key, account_config, folder_name in targets
+        }
+        for future in as_completed(futures):
+            account_key = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. out of memory)
+                account_config, folder_name = next((config, folder) for key, config, folder in targets
+                                                   if key == account_key)
+                summary = {'account': account_key, 'name': account_config.get('name', account_key),
+                           'folder': folder_name, 'status': 'failed', 'failed_queries': [],
+                           'error': str(e) or type(e).__name__, 'audit_dir': None, 'seconds': None}
+            results[account_key] = summary
+
+            if summary['status'] == 'ok':
+                line = (f"{summary['currency_symbol']}{summary['spend'] or 0:,.2f} spend, "
+                        f"ROAS {summary['roas'] or 0:.1f}x")
+                if summary['failed_queries']:
+                    line += f", {len(summary['failed_queries'])} queries failed"
+            else:
+                line = f"failed: {summary['error']}"
+            if summary['seconds'] is not None:
+                line += f" ({summary['seconds']}s)"
+            print(f"  - {summary['name']}... {line}")
+
+    for cache in (make_query_cache(args), make_chart_cache(args)):
+        if cache is not None:
+            cache.evict()
+
+    summaries = [results[account_key] for account_key, _, _ in targets]
+    summary_path = write_portfolio_summary(summaries, args.days)
+    failed = [summary for summary in summaries if summary['status'] != 'ok']
+
+    print(f"\n{'='*60}")
+    print("Portfolio Audit Complete!")
+    print(f"{'='*60}")
+    print(f"\n{len(summaries) - len(failed)}/{len(summaries)} accounts audited "
+          f"in {time.monotonic() - started:.1f}s\n")
+    print(f"  {'Account':<30} {'Spend':>14} {'ROAS':>7} {'Cost Δ':>8} {'Conv Δ':>8}")
+    for summary in summaries:
+        if summary['status'] != 'ok':
+            continue
+        spend = f"{summary['currency_symbol']}{summary['spend'] or 0:,.2f}"
+        cost_delta = f"{summary['cost_delta']:+.1f}%" if summary['cost_delta'] is not None else '-'
+        conv_delta = f"{summary['conv_delta']:+.1f}%" if summary['conv_delta'] is not None else '-'
+        print(f"  {summary['name'][:30]:<30} {spend:>14} {summary['roas'] or 0:>6.1f}x {cost_delta:>8} {conv_delta:>8}")
+    incomplete = [summary for summary in summaries if summary['status'] == 'ok' and summary['failed_queries']]
+    if incomplete:
+        print(f"\n  Incomplete: " + ', '.join(f"{summary['name']} ({len(summary['failed_queries'])} queries failed)"
+                                          for summary in incomplete))
+    if failed:
+        print(f"\n  Failed: {', '.join(summary['name'] for summary in failed)}")
+    print(f"\nSummary: {summary_path}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run Google Ads account audit')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--account', help='Account name or alias from accounts.json')
+    target.add_argument('--accounts', help='Comma-separated accounts to audit as a portfolio (e.g. swg,mpm)')
+    target.add_argument('--all-accounts', dest='all_accounts', action='store_true',
+                        help='Audit every account in accounts.json as a portfolio')
+    parser.add_argument('--account-name', dest='account_name', help='Folder name in data/google-ads/ (auto-detected if not provided)')
+    parser.add_argument('--days', type=int, default=30, help='Number of days (default: 30)')
+    parser.add_argument('--max-parallel-queries', dest='max_parallel_queries', type=int, default=4,
+                        help='Maximum number of queries to run at once (default: 4, use 1 for sequential)')
+    parser.add_argument('--max-parallel-accounts', dest='max_parallel_accounts', type=int, default=2,
+                        help='With --accounts/--all-accounts, how many account audits run at once (default: 2)')
+    parser.add_argument('--chart-workers', dest='chart_workers', type=int,
+                        help='Processes used to render charts (default: one per CPU, use 1 to render in-process)')
+    parser.add_argument('--chart-format', dest='chart_format', choices=list(CHART_FORMATS), default='png',
+                        help='Chart image format (default: png; svg is vector and much smaller)')
+    parser.add_argument('--chart-embed', dest='chart_embed', choices=['inline', 'external'], default='inline',
+                        help='Embed charts in report.html (default) or link the files in charts/')
+    parser.add_argument('--full-tables', dest='full_tables', action='store_true',
+                        help='Append every zero-conversion search term and every keyword to report.html')
+    parser.add_argument('--data-tables', dest='data_tables', action='store_true',
+                        help='Embed the full search-term, keyword and product tables in report.html as '
+                             'scrollable, sortable and filterable tables')
+    parser.add_argument('--profile', nargs='?', const='time', choices=['time', 'memory'],
+                        help='Record wall time, CPU time, peak RSS and row/byte counts for each stage in '
+                             'run-metrics.json and print a summary; "memory" also traces Python allocations '
+                             '(slower)')
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue today's audit: skip stages that already finished and whose inputs are "
+                             'unchanged (see audit-manifest.json), and rerun failed or stale ones')
+    parser.add_argument('--only', type=parse_stage_groups,
+                        help=f"Run only these stages, using the previous run's results for the rest "
+                             f"(comma-separated: {', '.join(STAGE_GROUPS)})")
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Compute each insight and render each chart as soon as the query results it needs '
+                             'arrive, while the other queries are still running')
+    parser.add_argument('--query-backend', dest='query_backend', choices=QUERY_BACKENDS, default='live',
+                        help='live (default): the Google Ads API; record: live, and save every result as a fixture; '
+                             'replay: serve recorded fixtures offline; synthetic: generate data offline')
+    parser.add_argument('--fixtures-dir', dest='fixtures_dir', type=Path, default=QUERY_FIXTURES_DIR,
+                        help=f'Where record/replay keep fixtures (default: {QUERY_FIXTURES_DIR})')
+    parser.add_argument('--synthetic-rows', dest='synthetic_rows', type=parse_scale, default=10_000,
+                        help='With --query-backend synthetic, search-term rows per account; other queries scale '
+                             'from it, k/m suffixes allowed (default: 10k)')
+    parser.add_argument('--simulated-latency', dest='simulated_latency', type=float, default=0.0,
+                        help='With replay/synthetic, typical seconds per query (log-normal spread; default: 0)')
+    parser.add_argument('--failure-rate', dest='failure_rate', type=float, default=0.0,
+                        help='With replay/synthetic, share of queries that fail at random (default: 0)')
+    parser.add_argument('--fail-match', dest='fail_match',
+                        help='With replay/synthetic, fail every query whose GAQL contains this text '
+                             '(e.g. search_term_view)')
+    parser.add_argument('--no-query-worker', dest='no_query_worker', action='store_true',
+                        help='Start a separate node process per query instead of one persistent worker')
+    parser.add_argument('--derive-windows', dest='derive_windows', action='store_true',
+                        help='Fetch queries that differ only by date window once, segmented by day, '
+                             'and build each window locally')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Keep a per-account daily store and fetch only days it does not already have '
+                             '(implies --derive-windows)')
+    parser.add_argument('--conversion-lag-days', dest='conversion_lag_days', type=int, default=DEFAULT_LAG_DAYS,
+                        help=f'With --incremental, always re-fetch this many most recent days (default: {DEFAULT_LAG_DAYS})')
+    parser.add_argument('--data-format', dest='data_format', choices=list(DATA_FORMATS), default='csv',
+                        help='Storage format for data/ (default: csv; parquet/feather are typed, compressed '
+                             'and much faster to load, and need pyarrow)')
+    parser.add_argument('--export-csv', dest='export_csv', action='store_true',
+                        help='With --data-format parquet/feather, also write a CSV copy of each result')
+    parser.add_argument('--chunk-rows', dest='chunk_rows', type=parse_scale, default=None,
+                        help='Process search-term and keyword results in chunks of this many rows (e.g. 200k) '
+                             'instead of loading them whole, so memory stays flat however large they are')
+    parser.add_argument('--no-cache', dest='no_cache', action='store_true',
+                        help='Do not read or write the query result cache')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Ignore cached results but store the fresh ones')
+    parser.add_argument('--no-chart-cache', dest='no_chart_cache', action='store_true',
+                        help='Render every chart even if its data and styling are unchanged')
+    parser.add_argument('--cache-ttl', dest='cache_ttl', type=float, default=DEFAULT_TTL_HOURS,
+                        help=f'Hours a cached query result stays valid (default: {DEFAULT_TTL_HOURS})')
+    parser.add_argument('--cache-max-mb', dest='cache_max_mb', type=float, default=DEFAULT_MAX_MB,
+                        help=f'Cache size limit in MB, least recently used results are evicted first (default: {DEFAULT_MAX_MB})')
+    args = parser.parse_args()
+
+    if args.data_format != 'csv' and not columnar_available():
+        print(f"Error: --data-format {args.data_format} needs pyarrow (pip3 install pyarrow)")
+        sys.exit(1)
+
+    if args.chunk_rows is not None:
+        # These hold whole search-term/keyword tables: the report tables sort every row by cost, and
+        # derived windows are built in memory from the full daily pull
+        whole = [flag for flag, used in [('--full-tables', args.full_tables), ('--data-tables', args.data_tables),
+                                         ('--derive-windows', args.derive_windows),
+                                         ('--incremental', args.incremental)] if used]
+        if whole:
+            print(f"Warning: with {', '.join(whole)}, search-term and keyword results are still loaded whole, "
+                  f"so --chunk-rows does not limit memory")
+
+    accounts = load_accounts()
+
+    if args.account:
+        account_key, account_config = resolve_account(args.account, accounts)
+        if not account_config:
+            print(f"Error: Account '{args.account}' not found in accounts.json")
+            print(f"Available accounts: {', '.join(accounts.keys())}")
+            sys.exit(1)
+
+        # Determine folder name: explicit --account-name, or auto-detect from aliases
+        if args.account_name:
+            folder_name = args.account_name
+        else:
+            folder_name = find_account_folder(args.account, account_config, DATA_BASE)
+
+        try:
+            audit_account(account_key, account_config, folder_name, args)
+        except MissingCheckpoint as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+
+    if args.account_name:
+        print("Error: --account-name only applies to a single --account")
+        sys.exit(1)
+
+    account_inputs = list(accounts) if args.all_accounts else [
+        name.strip() for name in args.accounts.split(',') if name.strip()
+    ]
+    targets = []
+    unknown = []
+    for account_input in account_inputs:
+        account_key, account_config = resolve_account(account_input, accounts)
+        if not account_config:
+            unknown.append(account_input)
+        elif account_key not in {key for key, _, _ in targets}:
+            folder_name = find_account_folder(account_input, account_config, DATA_BASE)
+            targets.append((account_key, account_config, folder_name))
+
+    if unknown:
+        print(f"Error: Account(s) not found in accounts.json: {', '.join(unknown)}")
+        print(f"Available accounts: {', '.join(accounts.keys())}")
+        sys.exit(1)
 
+    run_portfolio(targets, args)
 
 if __name__ == '__main__':
     main()
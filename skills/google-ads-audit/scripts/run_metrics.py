@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Per-stage run metrics for `run_audit.py --profile`.
+
+Each stage (a query, a file load, calculate_insights, a chart, a report
+writer) records wall time, CPU time of the thread that ran it and the process
+RSS high-water mark after it. Stages can add their own fields, such as row and
+byte counts. Charts rendered in worker processes are measured in the worker
+with measure(). A stage that only wraps others (generate_charts around its
+charts) is recorded with parent=True: its wall time is kept in the stage
+list, but totals() and the slowest stages leave it out, so the time is not
+counted twice.
+
+Each stage also records when it started and ended, in seconds from the start
+of the run. Stages of one kind can overlap (parallel queries, charts in a
+process pool), so a kind's wall_seconds is the time during which at least one
+of its stages was running, and stage_seconds is the sum of its stages' wall
+times. stage_seconds / wall_seconds is how many ran at once on average.
+
+With trace_memory (--profile memory), each stage also records the Python
+allocation peak seen by tracemalloc while it ran. Stages that overlap
+(parallel queries) share one peak, so their peaks describe the whole
+overlapping period rather than one stage. tracemalloc makes allocation-heavy
+code such as CSV parsing several times slower, so compare memory-profiled
+timings only with each other.
+"""
+
+import contextlib
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+
+def rss_peak_mb():
+    """Process RSS high-water mark in MB (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return round(peak / MB if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+class _Sampler:
+    """Start/stop measurements for one stage; tracemalloc is reset only when no other stage is active."""
+
+    _active = 0
+    _lock = threading.Lock()
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+
+    def __enter__(self):
+        if self.trace_memory:
+            with _Sampler._lock:
+                self.started_tracing = not tracemalloc.is_tracing()
+                if self.started_tracing:
+                    tracemalloc.start()
+                if _Sampler._active == 0:
+                    tracemalloc.reset_peak()
+                _Sampler._active += 1
+                self.traced_start = tracemalloc.get_traced_memory()[0]
+        self.start_time = time.time()
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        traced_peak_mb = None
+        if self.trace_memory:
+            with _Sampler._lock:
+                peak = tracemalloc.get_traced_memory()[1]
+                _Sampler._active -= 1
+                if self.started_tracing and _Sampler._active == 0:
+                    tracemalloc.stop()
+            traced_peak_mb = round(max(peak - self.traced_start, 0) / MB, 2)
+        self.sample = {
+            # Epoch times, so stages measured in worker processes line up with the run
+            'start_time': self.start_time,
+            'end_time': self.start_time + wall,
+            'wall_seconds': round(wall, 4),
+            'cpu_seconds': round(cpu, 4),
+            'traced_peak_mb': traced_peak_mb,
+            'rss_peak_mb': rss_peak_mb(),
+        }
+        return False
+
+
+def covered_seconds(spans):
+    """Length of the union of (start, end) spans, so overlapping time is counted once."""
+    covered = 0.0
+    reached = None
+    for start, end in sorted(spans):
+        if reached is not None and start < reached:
+            start = reached
+        if end > start:
+            covered += end - start
+        reached = end if reached is None else max(reached, end)
+    return covered
+
+
+def measure(trace_memory, fn, *args):
+    """
+    Call fn(*args) and return (result, sample). Module level, so it can be
+    submitted to a process pool and measure the call inside the worker.
+    """
+    with _Sampler(trace_memory) as sampler:
+        result = fn(*args)
+    return result, sampler.sample
+
+
+class RunMetrics:
+    def __init__(self, account=None, trace_memory=False):
+        self.account = account
+        self.trace_memory = trace_memory
+        self.started = time.perf_counter()
+        self.start_time = time.time()
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.stages = []
+        self._lock = threading.Lock()
+        # Trace for the whole run so stage baselines are comparable
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, kind, name, **fields):
+        """
+        Measure the enclosed block as one stage. Yields the stage's field dict,
+        so the block can add counts (e.g. fields['rows'] = len(df)).
+        """
+        with _Sampler(self.trace_memory) as sampler:
+            yield fields
+        self.record(kind, name, sampler.sample, **fields)
+
+    def record(self, kind, name, sample, **fields):
+        """Add a stage measured elsewhere (e.g. by measure() in a worker process)."""
+        sample = dict(sample)
+        start_seconds = round(sample.pop('start_time') - self.start_time, 4)
+        end_seconds = round(sample.pop('end_time') - self.start_time, 4)
+        entry = {'kind': kind, 'name': name, 'start_seconds': start_seconds, 'end_seconds': end_seconds,
+                 **sample, **fields}
+        with self._lock:
+            self.stages.append(entry)
+
+    def totals(self):
+        """
+        {kind: {'stages', 'wall_seconds', 'stage_seconds', 'cpu_seconds', 'traced_peak_mb'}}
+        in first-seen order, parents left out. wall_seconds counts overlapping
+        stages once; stage_seconds adds up each stage's wall time.
+        """
+        totals = {}
+        spans = {}
+        for entry in self.stages:
+            if entry.get('parent'):
+                continue
+            kind = totals.setdefault(entry['kind'], {'stages': 0, 'wall_seconds': 0.0, 'stage_seconds': 0.0,
+                                                     'cpu_seconds': 0.0, 'traced_peak_mb': None})
+            kind['stages'] += 1
+            kind['stage_seconds'] = round(kind['stage_seconds'] + entry['wall_seconds'], 4)
+            kind['cpu_seconds'] = round(kind['cpu_seconds'] + entry['cpu_seconds'], 4)
+            if entry['traced_peak_mb'] is not None:
+                kind['traced_peak_mb'] = max(kind['traced_peak_mb'] or 0.0, entry['traced_peak_mb'])
+            spans.setdefault(entry['kind'], []).append((entry['start_seconds'], entry['end_seconds']))
+        for kind, kind_spans in spans.items():
+            totals[kind]['wall_seconds'] = round(covered_seconds(kind_spans), 4)
+        return totals
+
+    def write(self, path, **extra):
+        """Write run-metrics.json: run info, per-kind totals and every stage."""
+        output = {
+            'account': self.account,
+            'started_at': self.started_at,
+            'total_seconds': round(time.perf_counter() - self.started, 3),
+            'rss_peak_mb': rss_peak_mb(),
+            'python': sys.version.split()[0],
+            'trace_memory': self.trace_memory,
+            **extra,
+            'totals': self.totals(),
+            'stages': self.stages,
+        }
+        with open(path, 'w') as f:
+            json.dump(output, f, indent=2, default=str)
+        return path
+
+    def print_summary(self, slowest=5):
+        print(f"\nProfile ({time.perf_counter() - self.started:.1f}s total, peak RSS {rss_peak_mb()} MB):")
+        for kind, total in self.totals().items():
+            peak = f"  {total['traced_peak_mb']:>8.1f} MB peak" if total['traced_peak_mb'] is not None else ''
+            print(f"  {kind:<8} {total['stages']:>3} stages  {total['wall_seconds']:>8.2f}s wall  "
+                  f"{total['stage_seconds']:>8.2f}s summed  {total['cpu_seconds']:>8.2f}s CPU{peak}")
+        print(f"  Slowest:")
+        stages = [entry for entry in self.stages if not entry.get('parent')]
+        for entry in sorted(stages, key=lambda e: e['wall_seconds'], reverse=True)[:slowest]:
+            print(f"    {entry['kind']}/{entry['name']}: {entry['wall_seconds']:.2f}s")
+
+
+def profile_stage(metrics, kind, name, **fields):
+    """metrics.stage(...), or a no-op context yielding a plain dict when metrics is None."""
+    if metrics is None:
+        return contextlib.nullcontext(fields)
+    return metrics.stage(kind, name, **fields)
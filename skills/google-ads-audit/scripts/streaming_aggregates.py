@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Aggregates that are fed one chunk of rows at a time.
+
+Insight blocks read large query results through AuditDataset.chunks(), which
+yields the whole frame once normally and fixed-size chunks with
+--chunk-rows. These accumulators give the same answers either way while
+holding only their result: TopRows keeps n rows, RunningTotals a count and a
+sum per column, so memory does not grow with the file.
+"""
+
+import heapq
+
+import pandas as pd
+
+
+class TopRows:
+    """
+    The n rows with the largest `column`, as DataFrame.nlargest(n, column)
+    would return them from all chunks together (ties keep the earliest row).
+
+    Rows are held in a min-heap bounded at n entries. Only each chunk's own
+    top n can enter it, so a chunk costs one vectorized nlargest plus at most
+    n heap operations.
+    """
+
+    def __init__(self, n, column):
+        self.n = n
+        self.column = column
+        self.columns = None
+        self._heap = []  # (value, -row number, row): the root is the row to drop first
+        self._seen = 0
+
+    def add(self, chunk):
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        chunk = chunk.reset_index(drop=True)
+        if self.n > 0 and len(chunk) > 0:
+            candidates = chunk.nlargest(self.n, self.column)
+            for position, row in zip(candidates.index, candidates.to_dict('records')):
+                item = (row[self.column], -(self._seen + position), row)
+                if len(self._heap) < self.n:
+                    heapq.heappush(self._heap, item)
+                elif item[:2] > self._heap[0][:2]:
+                    heapq.heapreplace(self._heap, item)
+        self._seen += len(chunk)
+
+    def result(self):
+        """The rows, largest first, as a DataFrame."""
+        items = sorted(self._heap, key=lambda item: (-item[0], -item[1]))
+        return pd.DataFrame([row for _, _, row in items], columns=self.columns)
+
+
+class RunningTotals:
+    """Row count and per-column sums over chunks, optionally of masked rows only."""
+
+    def __init__(self, columns):
+        self.count = 0
+        self.sums = dict.fromkeys(columns, 0)
+
+    def add(self, chunk, mask=None):
+        rows = chunk if mask is None else chunk[mask]
+        self.count += len(rows)
+        for column in self.sums:
+            self.sums[column] += rows[column].sum()
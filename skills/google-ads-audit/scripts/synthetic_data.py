@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Synthetic Google Ads query results for benchmarks and offline runs.
+
+synthetic_result() reads the SELECT fields, FROM resource and date window of
+a final GAQL query and returns a frame shaped like the query.js CSV for it:
+the selected columns, enums as numbers, cost in micros. Volume is set by one
+scale, the number of search-term rows; other resources scale from it
+(keywords 1/10, products 1/5, campaigns 1/2000, ...).
+
+Entities and their daily rates depend only on the resource and the seed, and
+per-day noise comes from a hash of (entity, day), so different windows of the
+same query (7 vs 30 days, the previous period) describe the same account and
+agree wherever they overlap. Distributions are heavy-tailed like real
+accounts: a few terms take most of the spend and most terms never convert.
+"""
+
+import re
+import zlib
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+BRAND = 'acme'
+
+MODIFIERS = ['buy', 'cheap', 'best', 'sale', 'online', 'near me', 'discount', 'kids', 'womens', 'mens',
+             'free shipping', 'review', 'how to clean', 'what size', 'waterproof', 'wide fit']
+COLORS = ['red', 'blue', 'black', 'white', 'green', 'pink', 'navy', 'grey']
+PRODUCTS = ['running shoes', 'sneakers', 'boots', 'sandals', 'slippers', 'trail shoes', 'heels', 'loafers',
+            'socks', 'insoles']
+CONVERSION_ACTIONS = ['Purchase', 'Add to cart', 'Lead form', 'Phone call', 'Newsletter signup', 'Store visit',
+                      'Begin checkout', 'Contact us']
+DEVICE_SHARES = {2: 0.6, 4: 0.3, 3: 0.1}  # MOBILE, DESKTOP, TABLET
+PERFORMANCE_LABELS = ([2, 3, 4, 5, 6], [0.45, 0.1, 0.05, 0.3, 0.1])  # GOOD, BEST, EXCELLENT, UNSPECIFIED, LOW
+
+# Share of account impressions seen by each resource
+RESOURCE_SHARE = {
+    'search_term_view': 0.7,
+    'keyword_view': 0.7,
+    'shopping_performance_view': 0.3,
+    'ad_group_ad_asset_view': 3.0,  # every ad impression counts for each of its assets
+}
+
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(z):
+    """splitmix64 finalizer on uint64 arrays."""
+    z = (z ^ (z >> np.uint64(30))) * _M1
+    z = (z ^ (z >> np.uint64(27))) * _M2
+    return z ^ (z >> np.uint64(31))
+
+
+def hashed_uniform(*keys):
+    """Deterministic uniforms in [0, 1) from broadcastable non-negative integer keys."""
+    h = np.uint64(0x9E3779B97F4A7C15)
+    with np.errstate(over='ignore'):
+        for key in keys:
+            h = _mix(h ^ np.asarray(key, dtype=np.uint64))
+    return (h >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def parse_scale(text):
+    """'250', '100k' or '1m' -> row count."""
+    text = text.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+def entity_counts(rows):
+    return {
+        'search_term_view': rows,
+        'keyword_view': max(rows // 10, 50),
+        'shopping_performance_view': max(rows // 5, 20),
+        'ad_group_ad_asset_view': int(np.clip(rows // 100, 60, 5000)),
+        'campaign': int(np.clip(rows // 2000, 8, 300)),
+        'ad_group': int(np.clip(rows // 200, 20, 5000)),
+        'conversion_action': int(np.clip(rows // 20000, 3, 60)),
+    }
+
+
+def parse_gaql(gaql):
+    """(fields, resource, (start, end) or None, [(order field, descending)]) of a final GAQL query."""
+    gaql = re.sub(r'--[^\n]*', '', gaql)
+    match = re.search(r'SELECT\s+(.*?)\s+FROM\s+(\w+)', gaql, re.IGNORECASE | re.DOTALL)
+    fields = [field.strip() for field in match.group(1).split(',') if field.strip()]
+    window = re.search(r'BETWEEN\s+[\'"](\d{4}-\d{2}-\d{2})[\'"]\s+AND\s+[\'"](\d{4}-\d{2}-\d{2})[\'"]', gaql,
+                       re.IGNORECASE)
+    order = re.search(r'ORDER\s+BY\s+(.+?)(?:\s+LIMIT\s+\d+)?\s*$', gaql, re.IGNORECASE | re.DOTALL)
+    order_by = []
+    if order:
+        for part in order.group(1).split(','):
+            tokens = part.split()
+            if tokens:
+                order_by.append((tokens[0], len(tokens) > 1 and tokens[1].upper() == 'DESC'))
+    return fields, match.group(2), window.groups() if window else None, order_by
+
+
+def _pick(rng, words, n):
+    return np.asarray(words, dtype=object)[rng.integers(0, len(words), n)]
+
+
+def _join(*parts):
+    """Join equal-length arrays of strings with spaces, skipping empty parts."""
+    return pd.Series([' '.join(p for p in row if p) for row in zip(*parts)], dtype=object).to_numpy()
+
+
+def _campaigns(counts, rng):
+    n = counts['campaign']
+    names = np.array([f'Search - {PRODUCTS[i % len(PRODUCTS)].title()} {i}' for i in range(n)], dtype=object)
+    names[0] = f'Brand - {BRAND.title()}'
+    shopping = np.arange(n) % 4 == 3
+    names[shopping] = [f'Shopping - All Products {i}' for i in np.flatnonzero(shopping)]
+    return {
+        'campaign.id': (1000 + np.arange(n)).astype(str),
+        'campaign.name': names,
+        'campaign.status': np.where(np.arange(n) % 10 == 9, 3, 2),  # some PAUSED
+        'campaign.advertising_channel_type': np.where(shopping, 4, 2),
+        'campaign.bidding_strategy_type': np.where(shopping, 12, 10),
+        'campaign.target_roas.target_roas': np.where(shopping, 4.0, 0.0),
+        'campaign.target_cpa.target_cpa_micros': np.zeros(n, dtype=np.int64),
+        'campaign.maximize_conversions.target_cpa_micros': np.zeros(n, dtype=np.int64),
+        'campaign.maximize_conversion_value.target_roas': np.where(shopping, 0.0, rng.choice([0.0, 3.5], n)),
+        '_brand': np.arange(n) == 0,
+    }
+
+
+def _entities(resource, fields, counts, rng):
+    """Attribute columns for every entity of a resource (plus a '_brand' flag and '_campaign' index)."""
+    n_campaigns = counts['campaign']
+
+    if 'segments.conversion_action_name' in fields:
+        n = counts['conversion_action']
+        names = [CONVERSION_ACTIONS[i] if i < len(CONVERSION_ACTIONS) else f'Conversion action {i}'
+                 for i in range(n)]
+        return {'segments.conversion_action_name': np.array(names, dtype=object), '_brand': np.zeros(n, bool)}
+
+    if resource == 'customer':
+        return {'_brand': np.zeros(1, bool)}
+
+    if resource == 'campaign':
+        entities = _campaigns(counts, rng)
+        if 'segments.device' in fields:
+            devices = np.array(list(DEVICE_SHARES))
+            entities = {key: np.repeat(values, len(devices)) for key, values in entities.items()}
+            entities['segments.device'] = np.tile(devices, n_campaigns)
+            entities['_share'] = np.tile(np.array(list(DEVICE_SHARES.values())), n_campaigns)
+        entities['_campaign'] = np.repeat(np.arange(n_campaigns), len(DEVICE_SHARES)) \
+            if 'segments.device' in fields else np.arange(n_campaigns)
+        return entities
+
+    n = counts[resource]
+    campaign = rng.integers(0, n_campaigns, n)
+    brand = rng.random(n) < 0.06
+    campaign[brand] = 0
+    campaign_names = _campaigns(counts, rng)['campaign.name']
+    entities = {
+        '_brand': brand,
+        '_campaign': campaign,
+        'campaign.name': campaign_names[campaign],
+        'ad_group.name': np.array([f'Ad group {i}' for i in range(counts['ad_group'])], dtype=object)[
+            rng.integers(0, counts['ad_group'], n)],
+    }
+    brand_word = np.where(brand, BRAND, '')
+
+    if resource == 'search_term_view':
+        detail = np.where(rng.random(n) < 0.5, [f'size {s}' for s in rng.integers(4, 14, n)],
+                          [f'model {m}' for m in rng.integers(1, max(n // 4, 2), n)])
+        entities['search_term_view.search_term'] = _join(
+            brand_word, np.where(rng.random(n) < 0.6, _pick(rng, MODIFIERS, n), ''),
+            _pick(rng, COLORS, n), _pick(rng, PRODUCTS, n), detail)
+        entities['segments.search_term_match_type'] = rng.choice([2, 3, 4], n)
+    elif resource == 'keyword_view':
+        entities['ad_group_criterion.keyword.text'] = _join(
+            brand_word, np.where(rng.random(n) < 0.4, _pick(rng, MODIFIERS, n), ''),
+            np.where(rng.random(n) < 0.5, _pick(rng, COLORS, n), ''), _pick(rng, PRODUCTS, n),
+            [f'{i}' if i >= 1000 else '' for i in range(n)])
+        entities['ad_group_criterion.keyword.match_type'] = rng.choice([2, 3, 4], n, p=[0.4, 0.35, 0.25])
+    elif resource == 'shopping_performance_view':
+        ids = np.arange(n)
+        entities['segments.product_item_id'] = np.array([f'sku-{i:07d}' for i in ids], dtype=object)
+        entities['segments.product_title'] = _join(
+            np.full(n, BRAND.title(), dtype=object), _pick(rng, COLORS, n), _pick(rng, PRODUCTS, n),
+            [f'#{i}' for i in ids])
+        entities['segments.product_image_url'] = np.where(
+            rng.random(n) < 0.8, [f'https://img.example.com/products/{i}.jpg' for i in ids], '')
+    elif resource == 'ad_group_ad_asset_view':
+        entities['asset.text_asset.text'] = _join(
+            np.where(brand, BRAND.title(), ''), _pick(rng, [m.title() for m in MODIFIERS], n),
+            _pick(rng, [p.title() for p in PRODUCTS], n))
+        entities['asset.name'] = np.full(n, '', dtype=object)
+        entities['asset.type'] = np.full(n, 5)  # TEXT
+        entities['ad_group_ad_asset_view.performance_label'] = rng.choice(
+            PERFORMANCE_LABELS[0], n, p=PERFORMANCE_LABELS[1]).astype(float)
+        entities['ad_group_ad_asset_view.pinned_field'] = np.zeros(n, dtype=np.int64)
+    return entities
+
+
+def _rates(resource, entities, rows, rng):
+    """Per-entity daily impressions, CTR, CPC (micros), conversion rate and value per conversion."""
+    n = len(entities['_brand'])
+    brand = entities['_brand']
+    account_impressions = rows * 3.0  # per day
+
+    if 'segments.conversion_action_name' in entities:
+        weights = np.sort(rng.dirichlet(np.full(n, 0.7)))[::-1]
+    elif '_share' in entities:
+        campaign_weights = rng.dirichlet(np.full(entities['_campaign'].max() + 1, 1.0))
+        weights = campaign_weights[entities['_campaign']] * entities['_share']
+    else:
+        weights = rng.lognormal(0.0, 1.6, n)
+        weights /= weights.sum()
+    impressions = account_impressions * RESOURCE_SHARE.get(resource, 1.0) * weights
+
+    ctr = np.clip(rng.lognormal(np.log(0.06), 0.5, n) * np.where(brand, 3.0, 1.0), 0.005, 0.6)
+    cpc = rng.lognormal(np.log(1.5e6), 0.5, n) * np.where(brand, 0.4, 1.0)
+    cvr = np.clip(rng.lognormal(np.log(0.05), 0.8, n) * np.where(brand, 2.5, 1.0), 0.0, 0.5)
+    cvr[rng.random(n) < 0.25] = 0.0  # terms that never convert
+    if resource in ('customer', 'campaign') or 'segments.conversion_action_name' in entities:
+        cvr = np.maximum(cvr, 0.02)
+    value = rng.lognormal(np.log(80.0), 0.4, n)
+    return impressions, ctr, cpc, cvr, value
+
+
+def _metrics(impressions_rate, ctr, cpc, cvr, value, entity_ids, days, day_keys, salt):
+    """
+    Metrics for entities (broadcast against day_keys): expected volume over
+    `days` days with hashed multiplicative noise and random rounding.
+    """
+    u = [hashed_uniform(entity_ids, day_keys, salt, k) for k in range(4)]
+    impressions = np.floor(impressions_rate * days * (0.5 + u[0]) + u[1]).astype(np.int64)
+    clicks = np.floor(impressions * ctr * (0.6 + 0.8 * u[2]) + u[3]).astype(np.int64)
+    cost = np.round(clicks * cpc * (0.85 + 0.3 * u[1])).astype(np.int64)
+    # Whole conversions by random rounding, then fractional credit from data-driven attribution
+    conversions = np.floor(clicks * cvr * (0.4 + 1.2 * u[2]) + u[0])
+    conversions = np.round(conversions * (0.8 + 0.4 * u[3]), 2)
+    return {
+        'metrics.impressions': impressions,
+        'metrics.clicks': clicks,
+        'metrics.cost_micros': cost,
+        'metrics.conversions': conversions,
+        'metrics.conversions_value': np.round(conversions * value * (0.7 + 0.6 * u[0]), 2),
+    }
+
+
+def synthetic_result(gaql, rows=1000, seed=0):
+    """A query.js-shaped DataFrame for a final GAQL query at the given search-term scale."""
+    fields, resource, window, order_by = parse_gaql(gaql)
+    counts = entity_counts(rows)
+    entity_seed = zlib.crc32(f'{resource}|{"segments.device" in fields}|'
+                             f'{"segments.conversion_action_name" in fields}'.encode())
+    rng = np.random.default_rng([seed, entity_seed])
+    entities = _entities(resource, fields, counts, rng)
+    rates = _rates(resource, entities, rows, rng)
+    n = len(entities['_brand'])
+    ids = np.arange(n, dtype=np.int64)
+
+    columns = {}
+    if window is None:
+        metrics = _metrics(*rates, ids, 1, 0, seed) if any(f.startswith('metrics.') for f in fields) else {}
+        columns.update(entities)
+    elif 'segments.date' in fields:
+        start, end = (date.fromisoformat(d) for d in window)
+        days = np.arange((end - start).days + 1)
+        ordinals = start.toordinal() + days
+        weekday = np.array([date.fromordinal(int(o)).weekday() for o in ordinals])
+        weekday_factor = np.where(weekday >= 5, 0.8, 1.05)
+        grid = [rate[:, None] * (weekday_factor[None, :] if i == 0 else 1) for i, rate in enumerate(rates)]
+        metrics = {key: values.ravel() for key, values in
+                   _metrics(*grid, ids[:, None], 1, ordinals[None, :], seed).items()}
+        columns.update({key: np.repeat(values, len(days)) for key, values in entities.items()})
+        columns['segments.date'] = np.tile([(start + timedelta(days=int(d))).isoformat() for d in days], n)
+    else:
+        start, end = (date.fromisoformat(d) for d in window)
+        window_key = start.toordinal() * 100_000 + end.toordinal() % 100_000
+        metrics = _metrics(*rates, ids, (end - start).days + 1, window_key, seed)
+        columns.update(entities)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if metrics:
+            metrics['metrics.ctr'] = np.where(metrics['metrics.impressions'] > 0,
+                                              metrics['metrics.clicks'] / metrics['metrics.impressions'], 0.0)
+            metrics['metrics.average_cpc'] = np.where(metrics['metrics.clicks'] > 0,
+                                                      metrics['metrics.cost_micros'] / metrics['metrics.clicks'], 0.0)
+            metrics['metrics.cost_per_conversion'] = np.where(
+                metrics['metrics.conversions'] > 0, metrics['metrics.cost_micros'] / metrics['metrics.conversions'], 0.0)
+    columns.update(metrics)
+    if 'campaign_budget.amount_micros' in fields:
+        budget = rates[0] * rates[1] * rates[2] * rng.choice([0.9, 1.3, 2.0], n)
+        columns['campaign_budget.amount_micros'] = (np.round(budget / 1e6) * 1e6).astype(np.int64)
+
+    length = len(next(iter(columns.values()))) if columns else n
+    df = pd.DataFrame({field: columns[field] if field in columns else np.full(length, '', dtype=object)
+                       for field in fields})
+    if 'search_term_view' == resource and 'metrics.impressions' in df.columns:
+        df = df[df['metrics.impressions'] > 0]
+    order_by = [(field, descending) for field, descending in order_by if field in df.columns]
+    if order_by:
+        df = df.sort_values([f for f, _ in order_by], ascending=[not d for _, d in order_by], kind='stable')
+    return df.reset_index(drop=True)
@@ -0,0 +1,171 @@
+// Virtual-scrolling data tables for report.html.
+//
+// Each .data-table carries its column metadata in data-meta, and its rows
+// follow it as <script type="application/octet-stream" class="dt-chunk">
+// blocks: base64-encoded, gzip-compressed JSON arrays of rows. Only the rows
+// in view are turned into DOM nodes, so tables with hundreds of thousands of
+// rows open instantly. Header clicks sort, the filter box matches text columns.
+(function () {
+    const ROW_HEIGHT = 28;
+    const OVERSCAN = 10;
+    const FILTER_DELAY_MS = 150;
+
+    function escapeHtml(text) {
+        return text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+    }
+
+    async function decodeChunk(text) {
+        const binary = atob(text.trim());
+        const bytes = new Uint8Array(binary.length);
+        for (let i = 0; i < binary.length; i++) {
+            bytes[i] = binary.charCodeAt(i);
+        }
+        const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+        return JSON.parse(await new Response(stream).text());
+    }
+
+    function isText(column) {
+        return column.decimals === null || column.decimals === undefined;
+    }
+
+    function formatter(column) {
+        if (isText(column)) {
+            return value => (value === null ? '' : String(value));
+        }
+        const number = new Intl.NumberFormat(undefined, {
+            minimumFractionDigits: column.decimals,
+            maximumFractionDigits: column.decimals,
+        });
+        return value => (value === null ? '' : number.format(value));
+    }
+
+    async function initTable(root) {
+        const meta = JSON.parse(root.dataset.meta);
+        const columns = meta.columns;
+        const formats = columns.map(formatter);
+        const textColumns = columns.map((column, i) => (isText(column) ? i : -1)).filter(i => i >= 0);
+
+        const filterInput = root.querySelector('.dt-filter');
+        const status = root.querySelector('.dt-status');
+        const header = root.querySelector('.dt-header');
+        const viewport = root.querySelector('.dt-viewport');
+        const spacer = root.querySelector('.dt-spacer');
+        const body = root.querySelector('.dt-body');
+
+        root.style.setProperty('--dt-columns', columns.map(
+            column => (isText(column) ? 'minmax(0, 2fr)' : 'minmax(0, 1fr)')).join(' '));
+
+        const rows = [];
+        const haystack = [];
+        let view = [];
+        let sortIndex = null;
+        let descending = false;
+        let filterText = '';
+        let loading = true;
+
+        function renderHeader() {
+            header.innerHTML = columns.map((column, i) => {
+                const arrow = i === sortIndex ? (descending ? ' ▼' : ' ▲') : '';
+                const align = isText(column) ? 'dt-text' : 'dt-num';
+                return '<div class="' + align + '" data-index="' + i + '">' + escapeHtml(column.label) + arrow + '</div>';
+            }).join('');
+        }
+
+        function renderRows() {
+            const first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+            const last = Math.min(view.length, first + Math.ceil(viewport.clientHeight / ROW_HEIGHT) + 2 * OVERSCAN);
+            const html = [];
+            for (let r = first; r < last; r++) {
+                const row = rows[view[r]];
+                html.push('<div class="dt-row">');
+                for (let i = 0; i < columns.length; i++) {
+                    html.push('<div class="' + (isText(columns[i]) ? 'dt-text' : 'dt-num') + '">' +
+                              escapeHtml(formats[i](row[i])) + '</div>');
+                }
+                html.push('</div>');
+            }
+            body.style.transform = 'translateY(' + (first * ROW_HEIGHT) + 'px)';
+            body.innerHTML = html.join('');
+        }
+
+        function updateView() {
+            const needle = filterText.toLowerCase();
+            view = [];
+            for (let r = 0; r < rows.length; r++) {
+                if (!needle || haystack[r].includes(needle)) {
+                    view.push(r);
+                }
+            }
+            if (sortIndex !== null) {
+                const i = sortIndex;
+                const sign = descending ? -1 : 1;
+                const text = isText(columns[i]);
+                view.sort((a, b) => {
+                    const x = rows[a][i];
+                    const y = rows[b][i];
+                    if (x === y) return 0;
+                    if (x === null) return 1;
+                    if (y === null) return -1;
+                    return sign * (text ? String(x).localeCompare(String(y)) : x - y);
+                });
+            }
+            spacer.style.height = (view.length * ROW_HEIGHT) + 'px';
+            status.textContent = view.length.toLocaleString() + ' of ' + meta.count.toLocaleString() + ' rows' +
+                                 (loading ? ' (loading…)' : '');
+            renderRows();
+        }
+
+        header.addEventListener('click', event => {
+            const cell = event.target.closest('[data-index]');
+            if (!cell) return;
+            const i = Number(cell.dataset.index);
+            if (i === sortIndex) {
+                descending = !descending;
+            } else {
+                sortIndex = i;
+                descending = !isText(columns[i]);
+            }
+            renderHeader();
+            updateView();
+        });
+
+        let filterTimer = null;
+        filterInput.addEventListener('input', () => {
+            clearTimeout(filterTimer);
+            filterTimer = setTimeout(() => {
+                filterText = filterInput.value.trim();
+                viewport.scrollTop = 0;
+                updateView();
+            }, FILTER_DELAY_MS);
+        });
+
+        let frame = null;
+        viewport.addEventListener('scroll', () => {
+            if (frame === null) {
+                frame = requestAnimationFrame(() => {
+                    frame = null;
+                    renderRows();
+                });
+            }
+        });
+
+        renderHeader();
+        if (typeof DecompressionStream === 'undefined') {
+            status.textContent = 'This browser cannot read the embedded table data.';
+            return;
+        }
+        const chunks = document.querySelectorAll('script.dt-chunk[data-table="' + root.id + '"]');
+        for (const chunk of chunks) {
+            for (const row of await decodeChunk(chunk.textContent)) {
+                rows.push(row);
+                haystack.push(textColumns.map(i => (row[i] === null ? '' : String(row[i]))).join('\u0001').toLowerCase());
+            }
+            loading = rows.length < meta.count;
+            updateView();
+        }
+        loading = false;
+        updateView();
+    }
+
+    document.querySelectorAll('.data-table').forEach(initTable);
+})();
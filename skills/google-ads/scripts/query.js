@@ -16,18 +16,31 @@
  *
  *   ./google-ads-query.js --list-accounts  (show available accounts from .claude/accounts.json)
  *
+ *   ./google-ads-query.js --worker  (long-lived worker, see Worker Mode below)
+ *
  * Date Handling:
  *   - If --days provided: Calculates BETWEEN dates using account timezone
  *   - If no --days: Uses LAST_30_DAYS as fallback
  *   - Replaces "LAST_30_DAYS" in query with calculated date range
  *
  * Returns: File path and row count only
+ *
+ * Worker Mode:
+ *   With --worker the process stays alive and reads one JSON job per line
+ *   from stdin, reusing a single authenticated client for every job:
+ *     {"id": 1, "customer_id": "...", "login_customer_id": "...",
+ *      "query": "SELECT ...", "output": "/path/to/output.csv", "days": 30}
+ *   Each job is answered with one JSON line on stdout (jobs may finish out of order):
+ *     {"id": 1, "ok": true, "output": "/path/to/output.csv", "rows": 123}
+ *     {"id": 1, "ok": false, "error": "..."}
+ *   The worker exits once stdin is closed and all in-flight jobs are done.
  */
 
 import { GoogleAdsApi } from 'google-ads-api';
 import { readFileSync, writeFileSync } from 'fs';
 import { parse as parseYaml } from 'yaml';
 import { resolve } from 'path';
+import { createInterface } from 'readline';
 
 // Parse command line arguments
 const args = process.argv.slice(2).reduce((acc, arg) => {
@@ -84,14 +97,15 @@ if (args['list-accounts']) {
     }
 }
 
+const workerMode = Boolean(args['worker']);
 const customerId = args['customer-id'];
 const loginCustomerId = args['login-customer-id'];
-let query = args['query'];
+const query = args['query'];
 const outputPath = args['output'];
 const days = args['days'] ? parseInt(args['days']) : null;
 
 // Validate arguments
-if (!customerId || !query || !outputPath) {
+if (!workerMode && (!customerId || !query || !outputPath)) {
     console.error('Error: Missing required arguments');
     console.error('');
     console.error('Usage:');
@@ -103,6 +117,7 @@ if (!customerId || !query || !outputPath) {
     console.error('    --output=/path/to/output.csv');
     console.error('');
     console.error('  ./google-ads-query.js --list-accounts  (show available accounts)');
+    console.error('  ./google-ads-query.js --worker  (read JSON-lines jobs from stdin)');
     process.exit(1);
 }
 
@@ -126,14 +141,23 @@ const client = new GoogleAdsApi({
     developer_token: credentials.developer_token,
 });
 
-const customer = client.Customer({
-    customer_id: customerId,
-    login_customer_id: loginCustomerId || customerId,
-    refresh_token: credentials.refresh_token,
-});
+// One Customer per account, reused across jobs in worker mode
+const customers = new Map();
+
+function getCustomer(customerId, loginCustomerId) {
+    const key = `${customerId}:${loginCustomerId || customerId}`;
+    if (!customers.has(key)) {
+        customers.set(key, client.Customer({
+            customer_id: customerId,
+            login_customer_id: loginCustomerId || customerId,
+            refresh_token: credentials.refresh_token,
+        }));
+    }
+    return customers.get(key);
+}
 
 // Get account timezone and calculate date range if --days provided
-async function getAccountTimezone() {
+async function getAccountTimezone(customer) {
     const timezoneQuery = 'SELECT customer.time_zone FROM customer LIMIT 1';
     const results = await customer.query(timezoneQuery);
     return results[0]?.customer?.time_zone || 'America/Los_Angeles';
@@ -162,93 +186,117 @@ function calculateDateRange(numDays, timezone) {
     };
 }
 
-// Execute query and stream to CSV
-async function executeQuery() {
-    try {
-        // Handle date range calculation if --days provided
-        if (days) {
-            const timezone = await getAccountTimezone();
-            const dateRange = calculateDateRange(days, timezone);
-
-            // Replace LAST_30_DAYS with calculated BETWEEN dates
-            query = query.replace(
-                /DURING\s+LAST_\d+_DAYS/gi,
-                `BETWEEN '${dateRange.start}' AND '${dateRange.end}'`
-            );
-        } else if (!query.match(/DURING\s+LAST_\d+_DAYS/i) && !query.match(/BETWEEN/i)) {
-            // If no date range specified at all, add LAST_30_DAYS as default
-            if (query.match(/WHERE/i)) {
-                query = query.replace(/WHERE/i, 'WHERE segments.date DURING LAST_30_DAYS AND');
-            }
-        }
-
-        // Execute the query
-        const results = await customer.query(query);
-
-        if (!results || results.length === 0) {
-            console.error('Error: Query returned no results');
-            process.exit(1);
+// Flatten nested objects to get all field names
+function flattenRow(obj, prefix = '') {
+    const flattened = {};
+    for (const [key, value] of Object.entries(obj)) {
+        const newKey = prefix ? `${prefix}.${key}` : key;
+        if (value && typeof value === 'object' && !Array.isArray(value)) {
+            Object.assign(flattened, flattenRow(value, newKey));
+        } else {
+            flattened[newKey] = value;
         }
+    }
+    return flattened;
+}
 
-        // Flatten nested objects to get all field names
-        function flattenRow(obj, prefix = '') {
-            const flattened = {};
-            for (const [key, value] of Object.entries(obj)) {
-                const newKey = prefix ? `${prefix}.${key}` : key;
-                if (value && typeof value === 'object' && !Array.isArray(value)) {
-                    Object.assign(flattened, flattenRow(value, newKey));
-                } else {
-                    flattened[newKey] = value;
+function writeResultsCsv(results, outputPath) {
+    // Flatten all rows and collect all unique headers
+    const flattenedResults = results.map(row => flattenRow(row));
+    const headersSet = new Set();
+    flattenedResults.forEach(row => {
+        Object.keys(row).forEach(key => headersSet.add(key));
+    });
+    const headers = Array.from(headersSet).sort();
+
+    // Convert to CSV format
+    const csvRows = [];
+
+    // Add header row
+    csvRows.push(headers.join(','));
+
+    // Add data rows
+    for (const row of flattenedResults) {
+        const values = headers.map(header => {
+            let value = row[header];
+
+            // Escape CSV values
+            if (value !== null && value !== undefined) {
+                value = String(value);
+                // Quote if contains comma, quote, or newline
+                if (value.includes(',') || value.includes('"') || value.includes('\n')) {
+                    value = `"${value.replace(/"/g, '""')}"`;
                 }
+            } else {
+                value = '';
             }
-            return flattened;
-        }
 
-        // Flatten all rows and collect all unique headers
-        const flattenedResults = results.map(row => flattenRow(row));
-        const headersSet = new Set();
-        flattenedResults.forEach(row => {
-            Object.keys(row).forEach(key => headersSet.add(key));
+            return value;
         });
-        const headers = Array.from(headersSet).sort();
-
-        // Convert to CSV format
-        const csvRows = [];
-
-        // Add header row
-        csvRows.push(headers.join(','));
-
-        // Add data rows
-        for (const row of flattenedResults) {
-            const values = headers.map(header => {
-                let value = row[header];
-
-                // Escape CSV values
-                if (value !== null && value !== undefined) {
-                    value = String(value);
-                    // Quote if contains comma, quote, or newline
-                    if (value.includes(',') || value.includes('"') || value.includes('\n')) {
-                        value = `"${value.replace(/"/g, '""')}"`;
-                    }
-                } else {
-                    value = '';
-                }
 
-                return value;
-            });
+        csvRows.push(values.join(','));
+    }
+
+    // Write to file
+    const csvContent = csvRows.join('\n');
+    writeFileSync(outputPath, csvContent, 'utf8');
+}
 
-            csvRows.push(values.join(','));
+const NO_RESULTS = 'Query returned no results';
+
+function describeError(error) {
+    const details = (error.errors || []).map(err =>
+        `${err.error_code?.request_error || 'Unknown error'}: ${err.message}`
+    );
+    return [error.message, ...details].join('; ');
+}
+
+// Run one query and write it to CSV, returning the row count
+async function runQuery({ customerId, loginCustomerId, query, days, outputPath }) {
+    const customer = getCustomer(customerId, loginCustomerId);
+
+    // Handle date range calculation if days provided
+    if (days) {
+        const timezone = await getAccountTimezone(customer);
+        const dateRange = calculateDateRange(days, timezone);
+
+        // Replace LAST_30_DAYS with calculated BETWEEN dates
+        query = query.replace(
+            /DURING\s+LAST_\d+_DAYS/gi,
+            `BETWEEN '${dateRange.start}' AND '${dateRange.end}'`
+        );
+    } else if (!query.match(/DURING\s+LAST_\d+_DAYS/i) && !query.match(/BETWEEN/i)) {
+        // If no date range specified at all, add LAST_30_DAYS as default
+        if (query.match(/WHERE/i)) {
+            query = query.replace(/WHERE/i, 'WHERE segments.date DURING LAST_30_DAYS AND');
         }
+    }
+
+    // Execute the query
+    const results = await customer.query(query);
 
-        // Write to file
-        const csvContent = csvRows.join('\n');
-        writeFileSync(outputPath, csvContent, 'utf8');
+    if (!results || results.length === 0) {
+        throw new Error(NO_RESULTS);
+    }
+
+    writeResultsCsv(results, outputPath);
+    return results.length;
+}
+
+// Execute a single query from the command line
+async function executeQuery() {
+    try {
+        const rows = await runQuery({ customerId, loginCustomerId, query, days, outputPath });
 
         // Return minimal output (file path + row count)
         console.log(`File: ${outputPath}`);
-        console.log(`Rows: ${results.length}`);
+        console.log(`Rows: ${rows}`);
 
     } catch (error) {
+        if (error.message === NO_RESULTS) {
+            console.error(`Error: ${NO_RESULTS}`);
+            process.exit(1);
+        }
         console.error('Error executing query:', error.message);
         if (error.errors) {
             error.errors.forEach(err => {
@@ -259,5 +307,47 @@ async function executeQuery() {
     }
 }
 
-// Run the query
-executeQuery();
+// Serve JSON-lines jobs from stdin until it closes
+function runWorker() {
+    const inFlight = new Set();
+    const reply = (message) => process.stdout.write(JSON.stringify(message) + '\n');
+
+    const lines = createInterface({ input: process.stdin, terminal: false });
+
+    lines.on('line', (line) => {
+        if (!line.trim()) {
+            return;
+        }
+
+        let job;
+        try {
+            job = JSON.parse(line);
+        } catch (error) {
+            reply({ id: null, ok: false, error: `Invalid job: ${error.message}` });
+            return;
+        }
+
+        const task = runQuery({
+            customerId: job.customer_id,
+            loginCustomerId: job.login_customer_id,
+            query: job.query,
+            days: job.days ? parseInt(job.days) : null,
+            outputPath: job.output,
+        })
+            .then(rows => reply({ id: job.id, ok: true, output: job.output, rows }))
+            .catch(error => reply({ id: job.id, ok: false, error: describeError(error) }))
+            .finally(() => inFlight.delete(task));
+        inFlight.add(task);
+    });
+
+    lines.on('close', async () => {
+        await Promise.allSettled([...inFlight]);
+        process.exit(0);
+    });
+}
+
+if (workerMode) {
+    runWorker();
+} else {
+    executeQuery();
+}